@@ -1,9 +1,25 @@
 # app.py
 
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, render_template, request, jsonify, send_file, send_from_directory, Response, stream_with_context
+import datetime
+import gzip
+import io
 import json
-from tasks import start_scrape_process, celery_app
+import uuid
+import task_events
+from cache import JobCache, LevelCheckpoint, job_fingerprint
+from history import HistoryStore, parse_time
+from metrics import MetricsStore
+from report_store import XLSX_MIMETYPE, ReportNotFound, ReportStore, create_excel_report
+from report_writer import write_trend_workbook
+from scheduler import JobScheduler
+from pipeline import aggregate_doyk
+from snapshots import SnapshotNotFound, compose_courses, diff_snapshots, latest_snapshots, load_snapshot, save_snapshot
+# Görev kodu (Selenium, HTTP motoru) web sürecine yüklenmez; görevler adla gönderilir
+from task_signatures import celery_app, submit_job
 from celery.result import AsyncResult
+from celery import states
+from zoneinfo import ZoneInfo
 import os
 
 app = Flask(__name__)
@@ -20,20 +36,215 @@ def start_scrape():
     password = request.form['password']
     minimum_values = json.loads(request.form['minimum_values'])
     selected_languages = json.loads(request.form.get('selected_languages', '[]'))
+    # İşaretlenirse önbellekteki dil/seviye link haritası yerine sitedeki güncel hali çekilir.
+    refresh_links = request.form.get('refresh_links') in ('1', 'true', 'on')
+    # İşaretlenirse Excel'e kurs bazında detay sayfası eklenir.
+    include_course_details = request.form.get('course_details') in ('1', 'true', 'on')
 
-    # Celery görevini başlat ve hemen bir görev ID'si al.
-    task = start_scrape_process.delay(username, password, minimum_values, selected_languages)
-    return jsonify({"task_id": task.id})
+    # Sadece önbellekteki sonucu iste (katılınan iş bittiğinde kendi minimum değerleriyle Excel almak için)
+    cached_only = request.form.get('cached_only') in ('1', 'true', 'on')
+    # İşaretlenirse taze anlık görüntüsü olan diller kazınmaz (önceden kazıma ya da yakın zamanlı başka bir iş)
+    use_snapshot = request.form.get('use_snapshot') in ('1', 'true', 'on')
+
+    # 0) Tüm diller tazeyse sonuç hemen anlık görüntülerden; değilse sadece eskimiş diller kazınır
+    merge_snapshots = None
+    if use_snapshot and not cached_only:
+        fresh, stale = latest_snapshots(selected_languages)
+        if fresh and not stale:
+            try:
+                return jsonify({"task_id": None, "snapshot": True,
+                                "result": _render_snapshot_result(fresh, minimum_values, include_course_details)})
+            except SnapshotNotFound:
+                stale = selected_languages
+        if fresh and stale:
+            merge_snapshots, selected_languages = fresh, stale
+
+    fingerprint = job_fingerprint(username, selected_languages)
+    job_cache = JobCache()
+
+    # 1) Aynı iş yakın zamanda bittiyse kazıma yapmadan, bu isteğin minimum değerleriyle Excel üret
+    if not refresh_links or cached_only:
+        cached = job_cache.load_result(fingerprint, password)
+        if cached:
+            return jsonify({"task_id": None, "cached": True,
+                            "result": _render_cached_result(cached, minimum_values, include_course_details)})
+    if cached_only:
+        return jsonify({"error": "Önbellekte sonuç bulunamadı."}), 404
+
+    # 2) Aynı iş şu an çalışıyorsa ona katıl
+    running = job_cache.running(fingerprint)
+    if running and AsyncResult(running['task_id'], app=celery_app).state in states.READY_STATES:
+        # Görev bitmiş ama kaydı silinememiş (worker düşmüş olabilir)
+        job_cache.release(fingerprint, running['task_id'])
+        running = None
+    if running and job_cache.verify(running, password):
+        return jsonify({"task_id": running['task_id'], "attached": True})
+
+    # 3) Yeni görev: ID önceden alınır ki kayıt görev kuyruğa girmeden yapılabilsin
+    task_id = str(uuid.uuid4())
+    if not running and not job_cache.claim(fingerprint, password, task_id):
+        # Aynı anda gelen başka bir istek işi bizden önce kaydetmiş olabilir
+        running = job_cache.running(fingerprint)
+        if running and job_cache.verify(running, password):
+            return jsonify({"task_id": running['task_id'], "attached": True})
+    # İş zamanlayıcıya girer; sınırlar doluysa sırada bekler (yeri /task-status'ta görünür)
+    queue = submit_job(
+        task_id, username,
+        (username, password, minimum_values, selected_languages, refresh_links, include_course_details),
+        {'merge_snapshots': merge_snapshots},
+    )
+    response = {"task_id": task_id}
+    if queue:
+        response['queue'] = queue
+    if merge_snapshots:
+        response.update(reused_languages=sorted(merge_snapshots), scraped_languages=selected_languages)
+    return jsonify(response)
+
+
+# Yarıda kalmış bir görevi aynı ID ile yeniden başlatır; kontrol noktasındaki seviyeler yeniden kazınmaz.
+# Şifre kontrol noktasında saklanmadığı için kullanıcıdan yeniden istenir (yalnızca doğrulayıcı tutulur).
+@app.route('/resume-scrape', methods=['POST'])
+def resume_scrape():
+    task_id = request.form['task_id']
+    username = request.form['username']
+    password = request.form['password']
+
+    checkpoint = LevelCheckpoint(task_id)
+    params = checkpoint.load_meta(username, password)
+    if params is None:
+        return jsonify({"error": "Devam ettirilecek görev bulunamadı ya da bilgiler eşleşmiyor."}), 404
+    if AsyncResult(task_id, app=celery_app).state in ('PROGRESS', 'RETRY') or JobScheduler().position(task_id):
+        return jsonify({"task_id": task_id, "attached": True})
+
+    fingerprint = job_fingerprint(username, params['selected_languages'])
+    job_cache = JobCache()
+    running = job_cache.running(fingerprint)
+    if running and running['task_id'] != task_id:
+        if job_cache.verify(running, password):
+            return jsonify({"task_id": running['task_id'], "attached": True})
+    elif not running:
+        job_cache.claim(fingerprint, password, task_id)
+
+    # Önceki sonuç silinmeli: Celery SUCCESS kaydedilmiş bir görev ID'sinin durumunu bir daha güncellemez.
+    # Önceki çalıştırmanın 'end' olayı da yeni dinleyicileri hemen kapatmasın.
+    AsyncResult(task_id, app=celery_app).forget()
+    task_events.reset(task_id)
+    queue = submit_job(
+        task_id, username,
+        (username, password, params['minimum_values'], params['selected_languages'], False,
+         params['include_course_details']),
+        {'merge_snapshots': params.get('merge_snapshots')},
+    )
+    response = {"task_id": task_id, "resumed": True, "levels_done": checkpoint.count_levels()}
+    if queue:
+        response['queue'] = queue
+    return jsonify(response)
+
+
+def _render_cached_result(cached, minimum_values, include_course_details):
+    """Önbellekteki sonuçtan görev sonucuyla aynı biçimde yanıt üretir; Excel bu isteğin ayarlarıyla yazılır."""
+    report_id = uuid.uuid4().hex
+    excel_file_path = create_excel_report(cached['data'], minimum_values, report_id,
+                                          cached.get('courses') if include_course_details else None)
+    return {
+        'status': 'SUCCESS',
+        'data': cached['data'],
+        'excel_filename': os.path.basename(excel_file_path),
+        'report_id': report_id,
+        'cached': True,
+        'finished_at': cached.get('finished_at'),
+        'snapshot_id': cached.get('snapshot_id'),
+    }
+
+
+def _render_snapshot_result(language_snapshots, minimum_values, include_course_details):
+    """
+    Dillerin son anlık görüntülerinden görev sonucuyla aynı biçimde yanıt üretir. Diller farklı görüntülerden
+    geliyorsa birleşimi yeni bir görüntü olarak kaydedilir (rapor /render-report ile yeniden üretilebilsin);
+    bu görüntü kazıma olmadığından dillerin "son" kaydını değiştirmez.
+    """
+    courses, created_at = compose_courses(language_snapshots)
+    snapshot_ids = set(language_snapshots.values())
+    if len(snapshot_ids) == 1 and set(load_snapshot(next(iter(snapshot_ids)))['courses']) == set(courses):
+        snapshot_id = next(iter(snapshot_ids))
+    else:
+        snapshot_id = save_snapshot(uuid.uuid4().hex, None, list(courses), courses, scraped_languages=())
+    data = aggregate_doyk(courses)
+    report_id = uuid.uuid4().hex
+    excel_file_path = create_excel_report(data, minimum_values, report_id,
+                                          courses if include_course_details else None)
+    return {
+        'status': 'SUCCESS',
+        'data': data,
+        'excel_filename': os.path.basename(excel_file_path),
+        'report_id': report_id,
+        'snapshot': True,
+        'finished_at': created_at,
+        'snapshot_id': snapshot_id,
+    }
+
+
+# Kayıtlı bir anlık görüntüden (görev sonucundaki snapshot_id) kazıma yapmadan Excel üretir.
+# Form/JSON alanları: snapshot_id, minimum_values, course_details, compare_to (karşılaştırılacak eski snapshot_id).
+@app.route('/render-report', methods=['POST'])
+def render_report():
+    params = request.get_json(silent=True) or request.form
+    minimum_values = params.get('minimum_values') or {}
+    if isinstance(minimum_values, str):
+        minimum_values = json.loads(minimum_values)
+    include_course_details = str(params.get('course_details', '')).lower() in ('1', 'true', 'on')
+
+    try:
+        snapshot = load_snapshot(params.get('snapshot_id'))
+        diff = None
+        if params.get('compare_to'):
+            diff = diff_snapshots(load_snapshot(params['compare_to']), snapshot)
+    except SnapshotNotFound as e:
+        return jsonify({"error": str(e)}), 404
+
+    report_id = uuid.uuid4().hex
+    excel_file_path = create_excel_report(snapshot['data'], minimum_values, report_id,
+                                          snapshot['courses'] if include_course_details else None, diff=diff)
+    response = {
+        'status': 'SUCCESS',
+        'data': snapshot['data'],
+        'excel_filename': os.path.basename(excel_file_path),
+        'report_id': report_id,
+        'snapshot_id': snapshot['id'],
+        'created_at': snapshot['created_at'],
+    }
+    if diff:
+        response['diff'] = diff
+    return jsonify(response)
 
 # Görevin durumunu sorgulayan endpoint.
+# ?since=N verilirse sadece N. satırdan sonraki log satırları döner (arayüz kaldığı yerden devam eder).
+# Zamanlayıcı sırasında bekleyen görev için 'queue' alanı sıradaki yeri ve tahmini beklemeyi (saniye) verir.
 @app.route('/task-status/<task_id>', methods=['GET'])
 def task_status(task_id):
     task = AsyncResult(task_id, app=celery_app)
     
     if task.state == 'PENDING':
         response = {'state': task.state, 'progress': 0, 'log_message': 'Görev kuyrukta bekliyor...'}
+        queue = JobScheduler().position(task_id)
+        if queue:
+            response['queue'] = queue
+            response['log_message'] = f"Görev sırada bekliyor ({queue['position']}. sıra)..."
     elif task.state == 'PROGRESS':
-        response = {'state': task.state, 'progress': task.info.get('progress', 0), 'log_message': task.info.get('log_message', '')}
+        logs = task.info.get('logs', [])
+        since = request.args.get('since', 0, type=int)
+        response = {
+            'state': task.state,
+            'progress': task.info.get('progress', 0),
+            'log_message': task.info.get('log_message', ''),
+            'logs': logs[since:],
+            'log_count': len(logs),
+        }
+    elif task.state == 'RETRY':
+        # Geçici hata sonrası görev yeniden kuyrukta; biten seviyeler korunur.
+        # Yeni çalıştırmanın log satırları 0'dan başlar, arayüz sayacı sıfırlansın
+        response = {'state': 'PROGRESS', 'progress': 0, 'log_message': 'Görev yeniden deneniyor...',
+                    'logs': [], 'log_count': 0}
     elif task.state == 'SUCCESS':
         response = {'state': task.state, 'result': task.get()}
     else: # FAILURE
@@ -41,7 +252,113 @@ def task_status(task_id):
         
     return jsonify(response)
 
-# Oluşturulan Excel dosyasını indirme endpoint'i.
+# Görev ilerlemesini Server-Sent Events olarak akıtan endpoint.
+# Yeniden bağlanan tarayıcı Last-Event-ID başlığını gönderir; ?offset=N ile de kaldığı yer verilebilir.
+@app.route('/task-events/<task_id>', methods=['GET'])
+def task_events_stream(task_id):
+    offset = request.args.get('offset', type=int)
+    if offset is None:
+        last_event_id = request.headers.get('Last-Event-ID', '')
+        offset = int(last_event_id) + 1 if last_event_id.isdigit() else 0
+
+    return Response(
+        stream_with_context(task_events.stream(task_id, offset)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+# Görevler arası toplam metrikler (Prometheus metin biçimi). Worker'lar her görev sonunda Redis'e yazar.
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(MetricsStore().render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+# Görev ID'siyle saklanan raporu indirir. ?format=xlsx (varsayılan) | json | csv
+# ETag/Last-Modified ile koşullu istek (304) ve Range (206) desteklenir. JSON/CSV diskte gzip'lidir;
+# istemci gzip kabul ediyorsa Content-Encoding: gzip ile olduğu gibi, etmiyorsa açılarak akıtılır.
+@app.route('/reports/<report_id>', methods=['GET'])
+def report_download(report_id):
+    try:
+        path, mimetype, download_name, gzipped = ReportStore().file(report_id, request.args.get('format', 'xlsx'))
+    except ReportNotFound as e:
+        return jsonify({"error": str(e)}), 404
+
+    if gzipped and 'gzip' not in request.headers.get('Accept-Encoding', ''):
+        def chunks():
+            with gzip.open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(64 * 1024), b''):
+                    yield chunk
+        response = Response(chunks(), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+        # Açılmış içeriğin boyutu bilinmediğinden Range yok; ETag sıkıştırılmış halinkinden ayrılır
+        response.set_etag(f'{os.path.getmtime(path)}-{os.path.getsize(path)}-identity')
+        response.make_conditional(request)
+    else:
+        response = send_file(path, mimetype=mimetype, as_attachment=True, download_name=download_name,
+                             conditional=True, etag=True, max_age=0)
+        if gzipped:
+            response.headers['Content-Encoding'] = 'gzip'
+    if gzipped:
+        response.vary.add('Accept-Encoding')
+    return response
+
+def _history_filters():
+    # language/level/skill tekrarlanabilir: ?language=Almanca&language=İngilizce
+    return {name: request.args.getlist(name) for name in ('language', 'level', 'skill')}
+
+# DOYK geçmişi (biten işlerin sayıları): ?language=&level=&skill=&since=&until= (ISO tarih ya da tarih/zaman).
+# ?format=xlsx ile seri başına satır, gün başına sütun içeren trend Excel'i döner; since ve until birlikte
+# verilirse Excel'e iki an arasındaki karşılaştırma sayfaları da eklenir.
+@app.route('/history', methods=['GET'])
+def history():
+    try:
+        since = parse_time(request.args.get('since'))
+        until = parse_time(request.args.get('until'), end=True)
+    except ValueError:
+        return jsonify({"error": "Geçersiz tarih; ISO biçimi (YYYY-AA-GG) bekleniyor."}), 400
+
+    store = HistoryStore()
+    filters = _history_filters()
+    series = store.series(since=since, until=until, **filters)
+    if request.args.get('format') != 'xlsx':
+        return jsonify({'series': series})
+
+    diff = store.compare(since, until, **filters) if since is not None and until is not None else None
+    buffer = io.BytesIO()
+    write_trend_workbook(buffer, series, diff)
+    buffer.seek(0)
+    timestamp = datetime.datetime.now(ZoneInfo("Europe/Istanbul")).strftime("%d-%m-%Y_%H-%M")
+    return send_file(buffer, mimetype=XLSX_MIMETYPE, as_attachment=True,
+                     download_name=f'UZEM_DOYK_Trend_{timestamp}.xlsx')
+
+# İki an arasındaki değişim: ?start=&end= (end boşsa şimdi) + /history ile aynı filtreler.
+# Her seri için o ana kadarki son değer karşılaştırılır; kurslarda sadece değişenler döner.
+@app.route('/history/compare', methods=['GET'])
+def history_compare():
+    try:
+        start = parse_time(request.args.get('start'), end=True)
+        end = parse_time(request.args.get('end'), end=True)
+    except ValueError:
+        return jsonify({"error": "Geçersiz tarih; ISO biçimi (YYYY-AA-GG) bekleniyor."}), 400
+    if start is None:
+        return jsonify({"error": "Başlangıç (start) gerekli."}), 400
+    if end is None:
+        end = datetime.datetime.now(ZoneInfo("Europe/Istanbul")).timestamp()
+    return jsonify(HistoryStore().compare(start, end, **_history_filters()))
+
+# Kurs bazında geçmiş: ?url= ya da ?language=&level=, ?since=&until=
+@app.route('/history/courses', methods=['GET'])
+def history_courses():
+    try:
+        since = parse_time(request.args.get('since'))
+        until = parse_time(request.args.get('until'), end=True)
+    except ValueError:
+        return jsonify({"error": "Geçersiz tarih; ISO biçimi (YYYY-AA-GG) bekleniyor."}), 400
+    filters = _history_filters()
+    courses = HistoryStore().course_series(url=request.args.get('url'), language=filters['language'],
+                                           level=filters['level'], since=since, until=until)
+    return jsonify({'courses': courses})
+
+# Eski (klasörlemeden önce üretilmiş) Excel dosyalarını indirme endpoint'i.
 @app.route('/download/<filename>', methods=['GET'])
 def download(filename):
     # Güvenlik için dosya yolunu temizle
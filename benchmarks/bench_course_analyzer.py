@@ -0,0 +1,72 @@
+# benchmarks/bench_course_analyzer.py
+# Kurs sayfası sayacı için örnek sayfa (beklenen dağılımla) ve eski ağaç tabanlı sayaçla hız karşılaştırması.
+# Çalıştırma (repo kökünden): python benchmarks/bench_course_analyzer.py [--repeat N] [--scale K]
+
+import argparse
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from course_analyzer import CourseCounts, analyze_course_html  # noqa: E402
+from http_scraper import parse_html  # noqa: E402
+
+FIXTURE = os.path.join(ROOT, 'benchmarks', 'fixtures', 'course_page.html')
+
+# Sayfa tarayıcıda querySelectorAll ile sayıldığında beklenen dağılım
+EXPECTED = CourseCounts(h5p_placeholders=2, resources=5, h5p_activities=4, assignments=3, videos=2)
+
+
+def legacy_count(html):
+    """Eski uygulama: tüm sayfayı ağaca çevirip her seçici için alt ağacı yeniden tarar."""
+    def has(node, pred):
+        return node.find(pred) is not None
+
+    def hidden_div(n):
+        return n.tag == 'div' and n.has_class('hiddenactivity')
+
+    total = 0
+    for n in parse_html(html).iter():
+        if n.tag == 'div' and n.has_class('h5p-placeholder'):
+            total += not has(n, hidden_div)
+        if n.tag == 'li' and (n.has_class('resource') or n.has_class('h5pactivity') or n.has_class('modtype_assign')):
+            visible = not has(n, hidden_div)
+            total += visible * sum(n.has_class(c) for c in ('resource', 'h5pactivity', 'modtype_assign'))
+        if n.tag == 'div' and n.has_class('video-js'):
+            if (has(n, lambda d: d.tag == 'video') and not has(n, lambda d: d.tag == 'audio')
+                    and not has(n, lambda d: d.has_class('hiddenactivity'))):
+                total += 1
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--scale', type=int, default=1, help="Sayfadaki bölümleri K kez çoğalt (büyük kurslar için)")
+    args = parser.parse_args()
+
+    with open(FIXTURE, encoding='utf-8') as f:
+        html = f.read()
+
+    counts = analyze_course_html(html)
+    ok = counts == EXPECTED and legacy_count(html) == EXPECTED.total
+    print(f"Örnek sayfa: {counts.as_dict()} toplam={counts.total} "
+          f"(beklenen {EXPECTED.total}, eski sayaç {legacy_count(html)}) -> {'OK' if ok else 'HATALI'}")
+
+    if args.scale > 1:
+        start = html.index('<ul class="topics">') + len('<ul class="topics">')
+        end = html.rindex('</ul>', start, html.index('</section>'))
+        html = html[:start] + html[start:end] * args.scale + html[end:]
+
+    legacy = timeit.timeit(lambda: legacy_count(html), number=args.repeat) / args.repeat
+    new = timeit.timeit(lambda: analyze_course_html(html), number=args.repeat) / args.repeat
+    size_kb = len(html.encode('utf-8')) / 1024
+    print(f"{size_kb:.0f} KB sayfa: eski {legacy * 1e3:.2f} ms/sayfa, yeni {new * 1e3:.2f} ms/sayfa "
+          f"({legacy / new:.1f}x), yeni {size_kb / new / 1024:.1f} MB/s")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
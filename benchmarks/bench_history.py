@@ -0,0 +1,74 @@
+# benchmarks/bench_history.py
+# DOYK geçmişi (history.HistoryStore) için yazım ve sorgu süreleri; geçici bir SQLite dosyasına
+# rastgele (tekrarlanabilir) çalıştırmalar eklenir.
+# Çalıştırma (repo kökünden): python benchmarks/bench_history.py [--runs 730] [--repeat 20]
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history import HistoryStore  # noqa: E402
+
+LANGUAGES = ['İngilizce', 'Almanca', 'Arapça', 'Fransızca', 'Rusça', 'İspanyolca']
+LEVELS = ['A1', 'A2', 'B1', 'B2', 'C1']
+TITLES = ['Reading Skills', 'Listening', 'Writing', 'Speaking Practice']
+
+
+def fake_run(rng):
+    data, courses = {}, {}
+    for lang_index, lang in enumerate(LANGUAGES):
+        data[lang] = {level: {skill: rng.randint(30, 60) for skill in 'DOYK'} for level in LEVELS}
+        courses[lang] = {level: [{
+            'title': f'{level} {title}',
+            'url': f'https://uzem.example/course/view.php?id={lang_index * 1000 + level_index * 10 + i}',
+            'total_resources_from_js': rng.randint(5, 20),
+            'counts': {'h5p_placeholders': 1, 'resources': 2, 'h5p_activities': 3, 'assignments': 0, 'videos': 1},
+        } for i, title in enumerate(TITLES)] for level_index, level in enumerate(LEVELS)}
+    return data, courses
+
+
+def timed(label, fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    print(f"  {label}: {(time.perf_counter() - start) / repeat * 1000:.2f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=730, help='eklenecek çalıştırma sayısı (varsayılan: 1 yıl, günde 2)')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(os.path.join(tmp, 'doyk.sqlite3'))
+        first = time.time() - args.runs * 43200
+        start = time.perf_counter()
+        for i in range(args.runs):
+            data, courses = fake_run(rng)
+            store.record(f'bench-{i}', 'bench', data, courses, finished_at=first + i * 43200)
+        elapsed = time.perf_counter() - start
+        print(f"{args.runs} çalıştırma: {elapsed / args.runs * 1000:.2f} ms/çalıştırma, "
+              f"dosya {os.path.getsize(store.path) // 1024} KB")
+
+        month_ago = time.time() - 30 * 24 * 3600
+        timed('tek seri (İngilizce B1 O), son 30 gün', lambda: store.series('İngilizce', 'B1', 'O', month_ago), args.repeat)
+        timed('tek seri, tüm zamanlar', lambda: store.series('İngilizce', 'B1', 'O'), args.repeat)
+        timed('bir dilin tüm serileri, son 30 gün', lambda: store.series('İngilizce', since=month_ago), args.repeat)
+        timed('karşılaştırma (30 gün önce - şimdi, bir dil)',
+              lambda: store.compare(month_ago, time.time(), language='İngilizce'), args.repeat)
+        timed('kurs serisi (URL)', lambda: store.course_series(url='https://uzem.example/course/view.php?id=20'),
+              args.repeat)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
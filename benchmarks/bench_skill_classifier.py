@@ -0,0 +1,93 @@
+# benchmarks/bench_skill_classifier.py
+# Beceri sınıflandırıcısı için örnek başlık kümesi (beklenen sonuçlarla) ve mikro-benchmark.
+# Çalıştırma (repo kökünden): python benchmarks/bench_skill_classifier.py [--repeat N]
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from skill_classifier import classify_title, classify_titles  # noqa: E402
+
+# (başlık, beklenen kod)
+CORPUS = [
+    ("A1 Reading Skills", 'O'),
+    ("A1 READING", 'O'),
+    ("B1 Okuma Becerileri", 'O'),
+    ("OKUMA - B2", 'O'),
+    ("A2 Listening", 'D'),
+    ("A1 Dinleme", 'D'),
+    ("A1 DİNLEME", 'D'),
+    ("dinleme ve anlama", 'D'),
+    ("Writing Skills B2", 'Y'),
+    ("Yazma Çalışmaları", 'Y'),
+    ("YAZMA", 'Y'),
+    ("Speaking Practice", 'K'),
+    ("Konuşma Pratiği", 'K'),
+    ("KONUŞMA A2", 'K'),
+    ("Konusma (A1)", 'K'),
+    ("Listening & Speaking", 'D'),   # öncelik: D > O > Y > K
+    ("Speaking and Reading", 'O'),
+    ("Okuma-Yazma", 'O'),
+    ("Konuşma ve Dinleme", 'D'),
+    ("Grammar A1", None),
+    ("Kelime Bilgisi", None),
+    ("Readings in Literature", None),  # kelime sınırı: 'readings' eşleşmez
+    ("Yazmaca", None),
+    ("", None),
+    (None, None),
+]
+
+# Eski (görev içinde tanımlı) uygulama; karşılaştırma için
+LEGACY_PATTERNS = {
+    'D': [r'\bdinleme\b', r'\blistening\b'],
+    'O': [r'\bokuma\b', r'\breading\b'],
+    'Y': [r'\byazma\b', r'\bwriting\b'],
+    'K': [r'\bkonuşma\b', r'\bkonusma\b', r'\bspeaking\b'],
+}
+
+
+def legacy_detect(title):
+    t = (title or '').lower()
+    for code, pats in LEGACY_PATTERNS.items():
+        for p in pats:
+            if re.search(p, t, re.IGNORECASE):
+                return code
+    return None
+
+
+def check_corpus():
+    failures = [(t, exp, classify_title(t or '')) for t, exp in CORPUS if classify_title(t or '') != exp]
+    for t, exp, got in failures:
+        print(f"  HATALI: {t!r}: beklenen={exp} bulunan={got}")
+    legacy_diffs = [t for t, exp in CORPUS if legacy_detect(t) != exp]
+    print(f"Örnek küme: {len(CORPUS)} başlık, {len(failures)} hata "
+          f"(eski uygulama {len(legacy_diffs)} başlıkta yanlış: {legacy_diffs})")
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+
+    ok = check_corpus()
+
+    # Önbellek etkisini ayırmak için benzersiz başlıklar üret
+    titles = [f"{t or ''} #{i}" for i in range(args.repeat) for t, _ in CORPUS]
+    legacy = timeit.timeit(lambda: [legacy_detect(t) for t in titles], number=3) / 3
+    classify_title.cache_clear()
+    cold = timeit.timeit(lambda: (classify_title.cache_clear(), classify_titles(titles)), number=3) / 3
+    warm = timeit.timeit(lambda: classify_titles(titles), number=3) / 3
+
+    n = len(titles)
+    print(f"{n} başlık: eski {legacy * 1e6 / n:.2f} µs/başlık, "
+          f"yeni (soğuk) {cold * 1e6 / n:.2f} µs/başlık, yeni (önbellekli) {warm * 1e6 / n:.2f} µs/başlık")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+# benchmarks/bench_startup.py
+# Süreç türlerinin açılış maliyeti: her profil yeni bir yorumlayıcıda içe aktarılır; içe aktarma süresi,
+# yerleşik bellek (RSS) ve yüklenen ağır bağımlılıklar (Selenium, requests, openpyxl) ölçülür.
+# Çalıştırma (repo kökünden):
+#   python benchmarks/bench_startup.py [--repeat 5] [--output startup.json] [--compare onceki.json]
+# Redis/Selenium gerekmez; modüller içe aktarılırken bağlantı açılmaz.
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Profil -> yeni süreçte çalıştırılacak kod
+PROFILES = {
+    'python': 'pass',                                  # boş yorumlayıcı (taban)
+    'web': 'import app',                               # Flask (gunicorn/flask run)
+    'beat': 'import task_signatures',                  # celery -A task_signatures.celery_app beat
+    'worker': 'import tasks',                          # celery -A tasks.celery_app worker (açılış)
+    # İlk görevden sonraki worker: kazıma yığını ve rapor yazıcı yüklenmiş
+    'worker_warm': 'import tasks, engines, fetch_pool, report_writer; report_writer._new_workbook()',
+}
+HEAVY_MODULES = ('selenium', 'requests', 'openpyxl', 'engines', 'scraper_refactored', 'http_scraper', 'tasks')
+
+_CHILD = r'''
+import json, sys, time
+start = time.perf_counter()
+exec(sys.argv[1])
+elapsed = time.perf_counter() - start
+rss_kb = 0
+with open('/proc/self/status') as f:
+    for line in f:
+        if line.startswith('VmRSS:'):
+            rss_kb = int(line.split()[1])
+print(json.dumps({'import_ms': elapsed * 1000, 'rss_mb': rss_kb / 1024, 'modules': len(sys.modules),
+                  'heavy': [m for m in json.loads(sys.argv[2]) if m in sys.modules]}))
+'''
+
+
+def measure(code, repeat):
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', _CHILD, code, json.dumps(HEAVY_MODULES)], cwd=ROOT,
+                             capture_output=True, text=True, check=True, env=dict(os.environ, PYTHONPATH=ROOT))
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        'import_ms': round(statistics.median(s['import_ms'] for s in samples), 1),
+        'rss_mb': round(statistics.median(s['rss_mb'] for s in samples), 1),
+        'modules': samples[-1]['modules'],
+        'heavy': samples[-1]['heavy'],
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5, help="Profil başına süreç sayısı (medyan alınır)")
+    parser.add_argument('--profiles', default=','.join(PROFILES), help="Virgülle ayrılmış profil listesi")
+    parser.add_argument('--output', help="Sonuç JSON dosyası")
+    parser.add_argument('--compare', help="Karşılaştırılacak önceki sonuç JSON dosyası")
+    args = parser.parse_args()
+
+    run = {
+        'started_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'results': {},
+    }
+    for name in args.profiles.split(','):
+        try:
+            entry = measure(PROFILES[name], args.repeat)
+        except subprocess.CalledProcessError as e:
+            print(f"{name}: HATA - {e.stderr.strip().splitlines()[-1] if e.stderr else e}")
+            continue
+        run['results'][name] = entry
+        print(f"{name}: içe aktarma {entry['import_ms']} ms, RSS {entry['rss_mb']} MB, {entry['modules']} modül, "
+              f"ağır: {', '.join(entry['heavy']) or '-'}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(run, f, ensure_ascii=False, indent=2)
+        print(f"Sonuçlar yazıldı: {args.output}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f).get('results', {})
+        print("Karşılaştırma:")
+        for name, entry in run['results'].items():
+            old = previous.get(name)
+            if old:
+                print(f"  {name}: içe aktarma {old['import_ms']} -> {entry['import_ms']} ms, "
+                      f"RSS {old['rss_mb']} -> {entry['rss_mb']} MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,280 @@
+# benchmarks/run_benchmark.py
+# Kazıma akışını (giriş -> linkler -> seviyeler -> kurs sayımı -> gruplama -> Excel) yerel stub sunucusuna
+# karşı farklı ölçeklerde çalıştırır; verim, p50/p95 gecikme ve tepe bellek (RSS) ölçer, sonucu JSON'a yazar.
+# Çalıştırma (repo kökünden):
+#   python benchmarks/run_benchmark.py --scales 1x3x10,2x5x40 --latency-ms 30 --jitter-ms 20 \
+#       --error-rate 0.02 --output bench.json [--compare onceki.json]
+# Ölçek: DİLxSEVİYExKURS (seviye başına kurs). Redis gerekmez; kurs önbelleği kapalı çalışılır.
+# --engine selenium için SELENIUM_URL'deki tarayıcının stub'a erişebilmesi gerekir (--host 0.0.0.0 ve
+# --public-url ile konteynerden görünen adres).
+
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from stub_server import add_stub_arguments, start_stub_server, stub_config_from_args  # noqa: E402
+
+
+def parse_scale(text):
+    languages, levels, courses = (int(x) for x in text.lower().split('x'))
+    return {'languages': languages, 'levels': levels, 'courses': courses}
+
+
+def percentile(values, p):
+    """En yakın sıra yöntemiyle yüzdelik (değer yoksa None)."""
+    if not values:
+        return None
+    values = sorted(values)
+    rank = max(1, -(-len(values) * p // 100))
+    return values[int(rank) - 1]
+
+
+def latency_ms(values):
+    return {
+        'count': len(values),
+        'p50': _ms(percentile(values, 50)),
+        'p95': _ms(percentile(values, 95)),
+        'max': _ms(max(values) if values else None),
+    }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def _peak_rss_mb(who):
+    # Linux'ta ru_maxrss KB cinsindendir
+    return round(resource.getrusage(who).ru_maxrss / 1024, 1)
+
+
+def run_scale(base_url, engine, expected_total, results):
+    """
+    Tek ölçeği ayrı (spawn) süreçte çalıştırır; böylece tepe RSS ölçeğe özgü olur.
+    Akış tasks.start_scrape_process ile aynıdır, ancak Redis'e bağlı önbellek/ilerleme adımları yoktur.
+    """
+    try:
+        results.put(_run_scale(base_url, engine, expected_total))
+    except Exception as e:
+        results.put({'error': f"{type(e).__name__}: {e}"})
+
+
+def _run_scale(base_url, engine, expected_total):
+    import config
+    from engines import create_scraper, open_session_pool
+    from fetch_pool import bounded_map
+    from metrics import Tracer
+    from pipeline import StageStats, aggregate_doyk, get_process_pool
+    from rate_control import get_limiter
+    from skill_classifier import detect_level_code
+    from report_store import create_excel_report
+
+    tracer = Tracer()
+    stage_stats = StageStats()
+    phases = {}
+
+    def phase(name, func, *args):
+        start = time.perf_counter()
+        with tracer.span(name):
+            value = func(*args)
+        phases[name] = round(time.perf_counter() - start, 3)
+        return value
+
+    started = time.perf_counter()
+    scraper = create_scraper('bench', 'bench', engine=engine, base_url=base_url)
+    scraper.tracer = tracer
+    sessions = [scraper]
+    try:
+        if not phase('connect', scraper.connect_driver):
+            raise RuntimeError("Motor başlatılamadı.")
+        if not phase('login', scraper.login):
+            raise RuntimeError("Stub sunucusuna giriş yapılamadı.")
+        language_data = phase('links', scraper.get_language_level_links)
+        levels = [(lang, detect_level_code(name) or name, url)
+                  for lang, lv in language_data.items() for name, url in lv.items()]
+
+        sessions = open_session_pool(scraper, 'bench', 'bench', min(config.LEVEL_WORKERS, len(levels)),
+                                     engine=engine, base_url=base_url)
+        idle = queue.Queue()
+        for s in sessions:
+            s.tracer = tracer
+            idle.put(s)
+
+        def scrape_level(item):
+            session = idle.get()
+            try:
+                with tracer.span('level'):
+                    return session.scrape_doyk_content(item[2]) or []
+            finally:
+                idle.put(session)
+
+        level_results = phase('levels', bounded_map, scrape_level, levels, len(sessions))
+        all_courses = {}
+        for (lang, level_code, _), courses in zip(levels, level_results):
+            all_courses.setdefault(lang, {}).setdefault(level_code, []).extend(courses)
+
+        grouped = phase('aggregate', aggregate_doyk, all_courses, stage_stats)
+        phase('report', create_excel_report, grouped, {}, 'benchmark', all_courses, stage_stats)
+        wall = time.perf_counter() - started
+    finally:
+        for s in sessions:
+            if s.driver:
+                s.close_driver()
+
+    courses = [c for lv in all_courses.values() for cs in lv.values() for c in cs]
+    failed = sum(1 for c in courses if c.get('counts') is None)
+    counted = [c['total_resources_from_js'] for c in courses if c.get('counts') is not None]
+    summary = tracer.summary()
+
+    limiter = get_limiter(base_url)
+    pool = get_process_pool()
+    if pool is not None:
+        # Alt süreçler beklenirse RUSAGE_CHILDREN onların tepe RSS'ini de içerir
+        pool.shutdown(wait=True)
+
+    return {
+        'courses': len(courses),
+        'wall_seconds': round(wall, 3),
+        'throughput_courses_per_s': round(len(courses) / wall, 2) if wall else None,
+        'course_latency_ms': latency_ms(tracer.durations('course')),
+        'level_page_latency_ms': latency_ms(tracer.durations('level_page')),
+        'parse_ms': latency_ms(tracer.durations('parse')),
+        'phases_seconds': phases,
+        'stages': stage_stats.as_dict(),
+        'retries': summary.get('course', {}).get('retries', 0),
+        'ajax_batches': summary.get('ajax_batch', {}).get('count', 0),
+        'failed_courses': failed,
+        'rate_limit': limiter.snapshot() if limiter else None,
+        'bytes': sum(e['bytes'] for e in summary.values()),
+        'counts_ok': expected_total is None or all(t == expected_total for t in counted),
+        'peak_rss_mb': _peak_rss_mb(resource.RUSAGE_SELF),
+        'children_peak_rss_mb': _peak_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _pct(new, before):
+    return f"{(new - before) / before * 100:+.1f}%" if new is not None and before else 'n/a'
+
+
+def compare(previous, current):
+    """Aynı ölçekteki koşuların verim ve p95 farkını yazdırır."""
+    old = {r['scale_label']: r for r in previous.get('results', [])}
+    for r in current['results']:
+        o = old.get(r['scale_label'])
+        if not o or 'error' in o or 'error' in r:
+            continue
+        print(f"  {r['scale_label']}: verim {o['throughput_courses_per_s']} -> {r['throughput_courses_per_s']} kurs/s "
+              f"({_pct(r['throughput_courses_per_s'], o['throughput_courses_per_s'])}), "
+              f"p95 {o['course_latency_ms']['p95']} -> {r['course_latency_ms']['p95']} ms "
+              f"({_pct(r['course_latency_ms']['p95'], o['course_latency_ms']['p95'])}), "
+              f"RSS {o['peak_rss_mb']} -> {r['peak_rss_mb']} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scales', default='1x3x10,2x5x40', help="Virgülle ayrılmış DİLxSEVİYExKURS listesi")
+    parser.add_argument('--engine', default='http', choices=['http', 'selenium'])
+    parser.add_argument('--host', default='127.0.0.1', help="Stub sunucusunun dinleyeceği adres")
+    parser.add_argument('--public-url', help="Kazıyıcının stub'a erişeceği adres (ör. konteynerden)")
+    parser.add_argument('--output', help="Sonuç JSON dosyası")
+    parser.add_argument('--compare', help="Karşılaştırılacak önceki sonuç JSON dosyası")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    # Göreli yollar çalışma klasörü değişmeden çözülür
+    for name in ('output', 'compare', 'pages_dir'):
+        if getattr(args, name):
+            setattr(args, name, os.path.abspath(getattr(args, name)))
+
+    # Her koşu aynı koşullarda ölçülsün: kurs önbelleği kapalı, rapor geçici klasöre
+    os.environ['COURSE_CACHE_ENABLED'] = '0'
+    workdir = tempfile.mkdtemp(prefix='uzem-bench-')
+    os.chdir(workdir)
+
+    from course_analyzer import analyze_course_html
+    from stub_server import StubSite
+    ctx = multiprocessing.get_context('spawn')
+
+    run = {
+        'started_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'engine': args.engine,
+        'stub': {k: getattr(args, k) for k in ('latency_ms', 'jitter_ms', 'course_scale', 'error_rate',
+                                                'throttle_above', 'retry_after', 'seed', 'pages_dir', 'ajax')},
+        'env': {k: os.environ[k] for k in ('COURSE_FETCH_CONCURRENCY', 'LEVEL_WORKERS', 'PARSE_PROCESSES',
+                                            'PARSE_QUEUE_SIZE', 'HTTP_POOL_SIZE', 'RATE_CONTROL_ENABLED',
+                                            'RATE_LIMIT_INITIAL', 'RATE_LIMIT_MAX', 'MOODLE_AJAX_ENABLED',
+                                            'MOODLE_AJAX_BATCH_SIZE') if k in os.environ},
+        'results': [],
+    }
+
+    for label in args.scales.split(','):
+        scale = parse_scale(label)
+        stub_config = stub_config_from_args(args, **scale)
+        server = start_stub_server(stub_config, host=args.host)
+        # Kaydedilmiş kurs sayfasında beklenen sayım bilinmez; sentetik sayfada fixture'dan hesaplanır
+        expected = None if stub_config.pages_dir else analyze_course_html(StubSite(stub_config).course_html).total
+        base_url = args.public_url or server.base_url
+
+        results = ctx.Queue()
+        proc = ctx.Process(target=run_scale, args=(base_url, args.engine, expected, results))
+        proc.start()
+        entry = None
+        while entry is None:
+            try:
+                entry = results.get(timeout=1)
+            except queue.Empty:
+                if not proc.is_alive():
+                    entry = {'error': f"alt süreç beklenmedik şekilde sonlandı (çıkış kodu {proc.exitcode})"}
+        proc.join()
+        server.shutdown()
+        server.server_close()
+
+        entry = dict({'scale_label': label, 'scale': scale, 'stub_stats': dict(server.stats)}, **entry)
+        run['results'].append(entry)
+        if 'error' in entry:
+            print(f"{label}: HATA - {entry['error']}")
+            continue
+        print(f"{label}: {entry['courses']} kurs, {entry['wall_seconds']} s, "
+              f"{entry['throughput_courses_per_s']} kurs/s, kurs p50/p95 "
+              f"{entry['course_latency_ms']['p50']}/{entry['course_latency_ms']['p95']} ms, "
+              f"tekrar {entry['retries']}, başarısız {entry['failed_courses']}, "
+              f"sınır {(entry['rate_limit'] or {}).get('limit', '-')}, "
+              f"RSS {entry['peak_rss_mb']} MB (+alt süreçler {entry['children_peak_rss_mb']} MB), "
+              f"sayım {'OK' if entry['counts_ok'] else 'HATALI'}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(run, f, ensure_ascii=False, indent=2)
+        print(f"Sonuçlar yazıldı: {args.output}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            print("Karşılaştırma:")
+            compare(json.load(f), run)
+    return 0 if all('error' not in r and r['counts_ok'] for r in run['results']) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
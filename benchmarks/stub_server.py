@@ -0,0 +1,347 @@
+# benchmarks/stub_server.py
+# UZEM (Moodle) sayfalarını taklit eden yerel sunucu: giriş, dashboard, seviye listesi ve kurs sayfaları.
+# Gecikme, sayfa boyutu ve hata oranı ayarlanabilir; gerçek sisteme istek atmadan kazıyıcı ölçülür.
+# Tek başına çalıştırma (repo kökünden):
+#   python benchmarks/stub_server.py --port 8099 --languages 2 --levels 3 --courses 20 --latency-ms 50
+# ve worker'ı UZEM_BASE_URL=http://<host>:8099 ile başlatın. --pages-dir ile kaydedilmiş sayfalar sunulur.
+# lib/ajax/service.php (core_course_get_contents) kurs sayfasıyla aynı sayımı veren modül listesi döner;
+# --no-ajax ile servis kapatılır (HTML'e dönüş denenir).
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from course_analyzer import analyze_course_html  # noqa: E402
+
+COURSE_FIXTURE = os.path.join(ROOT, 'benchmarks', 'fixtures', 'course_page.html')
+
+LANGUAGES = ['İngilizce', 'Almanca', 'Fransızca', 'Rusça', 'Arapça', 'İspanyolca', 'İtalyanca', 'Japonca']
+LEVEL_CODES = ['A1', 'A2', 'B1', 'B2', 'C1']
+SKILLS = ['Reading', 'Listening', 'Writing', 'Speaking']
+
+SESSION_COOKIE = 'MoodleSession=bench'
+LOGIN_TOKEN = 'bench-token'
+SESSKEY = 'benchsesskey'
+SESSKEY_SCRIPT = f'<script>M.cfg = {{"wwwroot":"","sesskey":"{SESSKEY}"}};</script>'
+
+
+@dataclass
+class StubConfig:
+    languages: int = 1
+    levels: int = 3
+    courses: int = 10
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    # Kurs sayfasındaki etkinlik bölümlerinin kaç kez çoğaltılacağı (sayfa boyutu ve beklenen sayım bununla büyür)
+    course_scale: int = 1
+    # Kurs sayfası isteklerinin bu oranı 503 ile yanıtlanır
+    error_rate: float = 0.0
+    # Aynı anda bundan fazla kurs isteği işlenirken 429 + Retry-After döner (0: kapalı)
+    throttle_above: int = 0
+    retry_after: int = 1
+    seed: int = 1
+    # login.html / dashboard.html / level.html / course.html içeren klasör; olan dosya sentetik sayfanın yerine geçer
+    pages_dir: str = None
+    # Kaydedilmiş sayfalardaki asıl site adresi; sunulurken stub adresiyle değiştirilir
+    recorded_base: str = 'https://uzem.msu.edu.tr'
+    # lib/ajax/service.php açık mı (kapalıysa Moodle'daki gibi servicenotavailable döner)
+    ajax: bool = True
+
+
+def scale_course_page(html, scale):
+    """Kurs sayfasındaki etkinlik listesini `scale` kez tekrarlar (bench_course_analyzer --scale ile aynı)."""
+    if scale <= 1:
+        return html
+    start = html.index('<ul class="topics">') + len('<ul class="topics">')
+    end = html.rindex('</ul>', start, html.index('</section>'))
+    return html[:start] + html[start:end] * scale + html[end:]
+
+
+def course_contents(counts):
+    """
+    core_course_get_contents yanıtı: sayfadaki kurallarla sayıldığında `counts` (CourseCounts) veren modüller.
+    Sayılmaması gerekenler de eklenir (gizli kaynak, forum, sesli oynatıcı).
+    """
+    def module(modname, visible=1, description=''):
+        return {'id': 0, 'modname': modname, 'visible': visible, 'visibleoncoursepage': 1,
+                'uservisible': True, 'description': description}
+
+    label = (''.join('<div class="h5p-placeholder" contenteditable="false">H5P</div>'
+                     for _ in range(counts.h5p_placeholders))
+             + ''.join('<div class="video-js"><video><source src="v.mp4"></video></div>' for _ in range(counts.videos))
+             + '<div class="video-js"><audio><source src="a.mp3"></audio></div>')
+    modules = ([module('resource') for _ in range(counts.resources)]
+               + [module('h5pactivity') for _ in range(counts.h5p_activities)]
+               + [module('assign') for _ in range(counts.assignments)]
+               + [module('resource', visible=0), module('forum'), module('label', description=label)])
+    for i, m in enumerate(modules):
+        m['id'] = i + 1
+    return [{'id': 1, 'section': 0, 'name': 'Genel', 'summary': '', 'modules': modules}]
+
+
+class StubSite:
+    """Sentetik site içeriği: dil i, seviye j -> categoryid = i * 100 + j; kurs id'leri seviyeye göre ardışık."""
+
+    def __init__(self, config):
+        self.config = config
+        with open(COURSE_FIXTURE, encoding='utf-8') as f:
+            self.course_html = scale_course_page(f.read(), config.course_scale)
+        self.contents = course_contents(analyze_course_html(self.course_html))
+        self.recorded = {}
+        if config.pages_dir:
+            for name in ('login', 'dashboard', 'level', 'course'):
+                path = os.path.join(config.pages_dir, f'{name}.html')
+                if os.path.exists(path):
+                    with open(path, encoding='utf-8') as f:
+                        self.recorded[name] = f.read()
+
+    def language_names(self):
+        names = LANGUAGES[:self.config.languages]
+        return names + [f'Dil {i + 1}' for i in range(len(names), self.config.languages)]
+
+    def level_names(self):
+        names = LEVEL_CODES[:self.config.levels]
+        return names + [f'C{i - len(LEVEL_CODES) + 2}' for i in range(len(names), self.config.levels)]
+
+    def login_page(self):
+        return ('<html><body><form action="/login/index.php" method="post">'
+                f'<input type="hidden" name="logintoken" value="{LOGIN_TOKEN}">'
+                '<input name="username"><input name="password" type="password">'
+                '<button id="loginbtn">Giriş</button></form></body></html>')
+
+    def dashboard_page(self):
+        cards = []
+        for i, lang in enumerate(self.language_names()):
+            items = ''.join(f'<li><a href="/course/index.php?categoryid={i * 100 + j}">{lang} {code}</a></li>'
+                            for j, code in enumerate(self.level_names()))
+            cards.append(f'<div class="faq-card"><div class="card-heading"><span><a href="#c{i}">{lang}</a></span></div>'
+                         f'<div class="faq-card-body collapse"><ul>{items}</ul></div></div>')
+        return (f'<html><head>{SESSKEY_SCRIPT}</head><body>'
+                '<ul class="nav"><li><a id="activates-tab" class="active" href="#activates" '
+                'aria-controls="activates">LİSAN EĞİTİM PORTALI</a></li></ul>'
+                f'<div class="tab-content"><div class="tab-pane active" id="activates">{"".join(cards)}</div></div>'
+                '</body></html>')
+
+    def level_page(self, category_id):
+        code = self.level_names()[category_id % 100] if category_id % 100 < self.config.levels else 'A1'
+        first = category_id * 1000
+        cards = ''.join(f'<div class="card-wrapper"><a class="coursename" href="/course/view.php?id={first + k}">'
+                        f'{code} {SKILLS[k % len(SKILLS)]} {k // len(SKILLS) + 1}</a></div>'
+                        for k in range(self.config.courses))
+        return f'<html><head>{SESSKEY_SCRIPT}</head><body><div class="course-cards">{cards}</div></body></html>'
+
+    def page(self, name, default, base_url):
+        html = self.recorded.get(name)
+        if html is None:
+            return default()
+        return html.replace(self.config.recorded_base.rstrip('/'), base_url)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config):
+        super().__init__(address, _Handler)
+        self.config = config
+        self.site = StubSite(config)
+        self.random = random.Random(config.seed)
+        self.stats = {'requests': 0, 'course_requests': 0, 'ajax_requests': 0, 'ajax_calls': 0,
+                      'injected_errors': 0, 'throttled': 0, 'max_in_flight': 0, 'bytes_sent': 0}
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{"127.0.0.1" if host in ("0.0.0.0", "") else host}:{port}'
+
+    def count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def delay(self):
+        with self._lock:
+            jitter = self.random.uniform(0, self.config.jitter_ms) if self.config.jitter_ms else 0.0
+        seconds = (self.config.latency_ms + jitter) / 1000
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def enter_course(self):
+        """Kurs isteğini sayar; eşzamanlı istek sınırı aşıldıysa True (429 dönülmeli)."""
+        with self._lock:
+            self.in_flight += 1
+            self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.in_flight)
+            throttled = 0 < self.config.throttle_above < self.in_flight
+            if throttled:
+                self.stats['throttled'] += 1
+        return throttled
+
+    def leave_course(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def inject_error(self):
+        if self.config.error_rate <= 0:
+            return False
+        with self._lock:
+            failed = self.random.random() < self.config.error_rate
+            if failed:
+                self.stats['injected_errors'] += 1
+        return failed
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body, status=200, location=None, cookie=None, retry_after=None, content_type='text/html'):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        if retry_after is not None:
+            self.send_header('Retry-After', str(retry_after))
+        if location:
+            self.send_header('Location', location)
+        if cookie:
+            self.send_header('Set-Cookie', f'{cookie}; Path=/')
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        self.server.count('bytes_sent', len(data))
+
+    def do_GET(self):
+        server, site = self.server, self.server.site
+        server.count('requests')
+        url = urlparse(self.path)
+        if url.path == '/course/view.php':
+            throttled = server.enter_course()
+            try:
+                server.delay()
+                if throttled:
+                    return self._send('Too Many Requests', 429, retry_after=server.config.retry_after)
+                return self._get(url)
+            finally:
+                server.leave_course()
+        server.delay()
+        self._get(url)
+
+    def _get(self, url):
+        server, site = self.server, self.server.site
+        if url.path == '/login/index.php':
+            return self._send(site.page('login', site.login_page, server.base_url))
+        if SESSION_COOKIE not in (self.headers.get('Cookie') or ''):
+            return self._send('', 303, '/login/index.php')
+        if url.path in ('/', '/my/'):
+            return self._send(site.page('dashboard', site.dashboard_page, server.base_url))
+        if url.path == '/course/index.php':
+            category_id = int(parse_qs(url.query).get('categoryid', ['0'])[0])
+            return self._send(site.page('level', lambda: site.level_page(category_id), server.base_url))
+        if url.path == '/course/view.php':
+            server.count('course_requests')
+            if server.inject_error():
+                return self._send('Service Unavailable', 503)
+            return self._send(site.page('course', lambda: site.course_html, server.base_url))
+        self._send('Not found', 404)
+
+    def do_POST(self):
+        self.server.count('requests')
+        self.server.delay()
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode('utf-8')
+        url = urlparse(self.path)
+        if url.path == '/lib/ajax/service.php':
+            return self._ajax(url, body)
+        form = parse_qs(body)
+        if form.get('logintoken') == [LOGIN_TOKEN] and form.get('username') and form.get('password'):
+            return self._send('', 303, '/my/', cookie=SESSION_COOKIE)
+        self._send('', 303, '/login/index.php')
+
+
+    def _ajax(self, url, body):
+        """Moodle lib/ajax/service.php: [{'index', 'methodname', 'args'}, ...] -> [{'error', 'data'}, ...]"""
+        server = self.server
+        server.count('ajax_requests')
+
+        def reply(value):
+            return self._send(json.dumps(value), content_type='application/json')
+
+        if not server.config.ajax:
+            return reply({'error': 'Bu servis kullanılamıyor.', 'errorcode': 'servicenotavailable'})
+        if (SESSION_COOKIE not in (self.headers.get('Cookie') or '')
+                or parse_qs(url.query).get('sesskey') != [SESSKEY]):
+            return reply({'error': 'Oturum anahtarı geçersiz.', 'errorcode': 'invalidsesskey'})
+        replies = []
+        for call in json.loads(body or '[]'):
+            server.count('ajax_calls')
+            if call.get('methodname') != 'core_course_get_contents':
+                replies.append({'error': True, 'exception': {'errorcode': 'servicenotavailable'}})
+            elif server.inject_error():
+                replies.append({'error': True, 'exception': {'errorcode': 'dmlreadexception'}})
+            else:
+                replies.append({'error': False, 'data': server.site.contents})
+        reply(replies)
+
+
+def start_stub_server(config, host='127.0.0.1', port=0):
+    """Sunucuyu arka plan thread'inde başlatır; server.base_url ile adresi, server.stats ile sayaçları verir."""
+    server = StubServer((host, port), config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_stub_arguments(parser):
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Her isteğe eklenen gecikme")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="Gecikmeye eklenen rastgele 0..N ms")
+    parser.add_argument('--course-scale', type=int, default=1, help="Kurs sayfası boyutu çarpanı")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Kurs sayfalarında 503 oranı (0..1)")
+    parser.add_argument('--throttle-above', type=int, default=0,
+                        help="Eşzamanlı kurs isteği bunu aşınca 429 + Retry-After (0: kapalı)")
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--pages-dir', help="Kaydedilmiş sayfalar (login/dashboard/level/course.html)")
+    parser.add_argument('--recorded-base', default='https://uzem.msu.edu.tr')
+    parser.add_argument('--no-ajax', dest='ajax', action='store_false',
+                        help="lib/ajax/service.php kapalı (servicenotavailable)")
+
+
+def stub_config_from_args(args, languages, levels, courses):
+    return StubConfig(languages=languages, levels=levels, courses=courses,
+                      latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, course_scale=args.course_scale,
+                      error_rate=args.error_rate, throttle_above=args.throttle_above,
+                      retry_after=args.retry_after, seed=args.seed, pages_dir=args.pages_dir,
+                      recorded_base=args.recorded_base, ajax=args.ajax)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--languages', type=int, default=2)
+    parser.add_argument('--levels', type=int, default=3)
+    parser.add_argument('--courses', type=int, default=10)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    server = StubServer((args.host, args.port), stub_config_from_args(args, args.languages, args.levels, args.courses))
+    print(f"Stub UZEM sunucusu: {server.base_url} (kullanıcı adı/şifre: herhangi)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"İstatistikler: {server.stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,305 @@
+# cache.py
+# Redis üzerinde tutulan önbellekler. Redis'e ulaşılamazsa önbellek yokmuş gibi davranılır; iş durmaz.
+
+import hashlib
+import hmac
+import json
+import os
+
+import redis
+
+import config
+
+_client = None
+
+
+def get_redis():
+    """Süreç başına tek Redis istemcisi (bağlantı havuzu redis-py içinde)."""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(config.REDIS_URL)
+    return _client
+
+
+def account_key(username):
+    """Kullanıcı adını anahtarlarda açık yazmamak için hash'ler."""
+    return hashlib.sha256((username or '').strip().lower().encode('utf-8')).hexdigest()
+
+
+def _password_digest(password, salt):
+    return hashlib.pbkdf2_hmac('sha256', (password or '').encode('utf-8'), salt, 100_000).hex()
+
+
+def _password_verifier(password):
+    salt = os.urandom(16)
+    return {'salt': salt.hex(), 'digest': _password_digest(password, salt)}
+
+
+def _verify_password(entry, password):
+    expected = _password_digest(password, bytes.fromhex(entry['salt']))
+    return hmac.compare_digest(expected, entry['digest'])
+
+
+def job_fingerprint(username, selected_languages, allowed_levels=None):
+    """
+    Aynı sonucu üretecek işlerin ortak anahtarı: site + hesap + seçilen diller + izinli seviyeler.
+    minimum_values ve Excel seçenekleri sadece biçimlendirmeyi etkilediği için dahil değildir.
+    """
+    payload = json.dumps({
+        'site': config.UZEM_BASE_URL,
+        'account': account_key(username),
+        'languages': sorted(set(selected_languages or [])),
+        'allowed_levels': allowed_levels or config.ALLOWED_LEVELS,
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class SessionCache:
+    """
+    Giriş yapılmış Moodle oturumunun çerezlerini ve dashboard_url'ini saklar.
+    Kayıt yalnızca aynı şifreyle gelen isteğe verilir (şifrenin tuzlu PBKDF2 özeti karşılaştırılır).
+    """
+
+    prefix = 'uzem:session:'
+
+    def __init__(self, client=None, ttl=None):
+        self.client = client or get_redis()
+        self.ttl = ttl or config.SESSION_CACHE_TTL
+
+    def _key(self, username):
+        return self.prefix + account_key(username)
+
+    def load(self, username, password):
+        try:
+            raw = self.client.get(self._key(username))
+        except redis.RedisError as e:
+            print(f"Oturum önbelleği okunamadı: {e}")
+            return None
+        if not raw:
+            return None
+
+        entry = json.loads(raw)
+        if not _verify_password(entry, password):
+            return None
+        return {'cookies': entry['cookies'], 'dashboard_url': entry['dashboard_url']}
+
+    def save(self, username, password, cookies, dashboard_url):
+        entry = dict(_password_verifier(password), cookies=cookies, dashboard_url=dashboard_url)
+        try:
+            self.client.set(self._key(username), json.dumps(entry), ex=self.ttl)
+        except redis.RedisError as e:
+            print(f"Oturum önbelleğe yazılamadı: {e}")
+
+    def touch(self, username):
+        """Başarıyla yeniden kullanılan oturumun ömrünü uzatır."""
+        try:
+            self.client.expire(self._key(username), self.ttl)
+        except redis.RedisError:
+            pass
+
+    def invalidate(self, username):
+        try:
+            self.client.delete(self._key(username))
+        except redis.RedisError:
+            pass
+
+
+class CourseCache:
+    """
+    Kurs sayfası başına koşullu istek bilgisi (ETag/Last-Modified), ilgili HTML bölümünün hash'i
+    ve hesaplanmış sayımı saklar. İçerik değişmemişse sayfa yeniden ayrıştırılmaz.
+    """
+
+    prefix = 'uzem:course:'
+
+    def __init__(self, client=None, ttl=None):
+        self.client = client or get_redis()
+        self.ttl = ttl or config.COURSE_CACHE_TTL
+
+    def _key(self, url):
+        return self.prefix + hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def get(self, url):
+        try:
+            raw = self.client.get(self._key(url))
+        except redis.RedisError as e:
+            print(f"Kurs önbelleği okunamadı: {e}")
+            return None
+        return json.loads(raw) if raw else None
+
+    def set(self, url, entry):
+        try:
+            self.client.set(self._key(url), json.dumps(entry), ex=self.ttl)
+        except redis.RedisError as e:
+            print(f"Kurs önbelleğe yazılamadı: {e}")
+
+
+class LinkMapCache:
+    """get_language_level_links'in {dil: {seviye_adı: url}} haritasını hesap + site başına saklar."""
+
+    prefix = 'uzem:links:'
+
+    def __init__(self, client=None, ttl=None):
+        self.client = client or get_redis()
+        self.ttl = ttl or config.LINK_MAP_CACHE_TTL
+
+    def _key(self, username):
+        return self.prefix + account_key(f"{config.UZEM_BASE_URL}|{username}")
+
+    def get(self, username):
+        try:
+            raw = self.client.get(self._key(username))
+        except redis.RedisError as e:
+            print(f"Link önbelleği okunamadı: {e}")
+            return None
+        return json.loads(raw) if raw else None
+
+    def set(self, username, language_levels):
+        try:
+            self.client.set(self._key(username), json.dumps(language_levels), ex=self.ttl)
+        except redis.RedisError as e:
+            print(f"Link önbelleğe yazılamadı: {e}")
+
+
+class JobCache:
+    """
+    job_fingerprint başına çalışan işin görev ID'si ve son başarılı işin sonucu.
+    Aynı iş tekrar istendiğinde yeni kazıma başlatmak yerine çalışana katılınır ya da taze sonuç verilir.
+    Her iki kayıt da yalnızca aynı şifreyle gelen isteğe açılır (SessionCache ile aynı doğrulama).
+    """
+
+    prefix = 'uzem:job:'
+
+    def __init__(self, client=None, result_ttl=None, running_ttl=None):
+        self.client = client or get_redis()
+        self.result_ttl = result_ttl or config.JOB_RESULT_TTL
+        self.running_ttl = running_ttl or config.JOB_RUNNING_TTL
+
+    def _running_key(self, fingerprint):
+        return f"{self.prefix}running:{fingerprint}"
+
+    def _result_key(self, fingerprint):
+        return f"{self.prefix}result:{fingerprint}"
+
+    def _get(self, key):
+        try:
+            raw = self.client.get(key)
+        except redis.RedisError as e:
+            print(f"İş önbelleği okunamadı: {e}")
+            return None
+        return json.loads(raw) if raw else None
+
+    def running(self, fingerprint):
+        """Çalışan iş kaydı ({'task_id', 'salt', 'digest'}) ya da None. Şifre kontrolü verify() ile yapılır."""
+        return self._get(self._running_key(fingerprint))
+
+    @staticmethod
+    def verify(entry, password):
+        return bool(entry) and _verify_password(entry, password)
+
+    def claim(self, fingerprint, password, task_id):
+        """İşi bu görev adına kaydeder; aynı parmak izli başka iş kayıtlıysa False."""
+        entry = dict(_password_verifier(password), task_id=task_id)
+        try:
+            return bool(self.client.set(self._running_key(fingerprint), json.dumps(entry), nx=True, ex=self.running_ttl))
+        except redis.RedisError as e:
+            print(f"İş önbelleğe yazılamadı: {e}")
+            return False
+
+    def release(self, fingerprint, task_id):
+        """Kayıt bu göreve aitse siler (başka görevin kaydına dokunulmaz)."""
+        entry = self.running(fingerprint)
+        if entry and entry.get('task_id') == task_id:
+            try:
+                self.client.delete(self._running_key(fingerprint))
+            except redis.RedisError:
+                pass
+
+    def load_result(self, fingerprint, password):
+        entry = self._get(self._result_key(fingerprint))
+        if not entry or not _verify_password(entry, password):
+            return None
+        return entry['result']
+
+    def save_result(self, fingerprint, password, result):
+        entry = dict(_password_verifier(password), result=result)
+        try:
+            self.client.set(self._result_key(fingerprint), json.dumps(entry), ex=self.result_ttl)
+        except redis.RedisError as e:
+            print(f"İş sonucu önbelleğe yazılamadı: {e}")
+
+
+class LevelCheckpoint:
+    """
+    Görev ID'si başına biten seviyelerin kurs listeleri ve görevi aynı parametrelerle yeniden başlatmak için
+    gereken bilgiler (şifre hariç; şifre yalnızca doğrulama özeti olarak tutulur).
+    Worker düşer ya da tarayıcı kapanırsa görev aynı ID ile yeniden çalıştığında biten seviyeler atlanır.
+    """
+
+    prefix = 'uzem:checkpoint:'
+
+    def __init__(self, task_id, client=None, ttl=None):
+        self.task_id = task_id
+        self.client = client or get_redis()
+        self.ttl = ttl or config.CHECKPOINT_TTL
+
+    @property
+    def _levels_key(self):
+        return f"{self.prefix}{self.task_id}:levels"
+
+    @property
+    def _meta_key(self):
+        return f"{self.prefix}{self.task_id}:meta"
+
+    def save_meta(self, username, password, params):
+        """Görev parametrelerini ilk çalıştırmada kaydeder (yeniden denemelerde mevcut kayıt korunur)."""
+        entry = dict(_password_verifier(password), account=account_key(username), params=params)
+        try:
+            self.client.set(self._meta_key, json.dumps(entry), nx=True, ex=self.ttl)
+        except redis.RedisError as e:
+            print(f"Kontrol noktası yazılamadı: {e}")
+
+    def load_meta(self, username, password):
+        """Aynı hesap ve şifreyle gelen isteğe görev parametrelerini verir; aksi halde None."""
+        try:
+            raw = self.client.get(self._meta_key)
+        except redis.RedisError as e:
+            print(f"Kontrol noktası okunamadı: {e}")
+            return None
+        if not raw:
+            return None
+        entry = json.loads(raw)
+        if entry['account'] != account_key(username) or not _verify_password(entry, password):
+            return None
+        return entry['params']
+
+    def save_level(self, level_key, courses):
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.hset(self._levels_key, level_key, json.dumps(courses))
+            pipe.expire(self._levels_key, self.ttl)
+            pipe.expire(self._meta_key, self.ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            print(f"Seviye kontrol noktası yazılamadı: {e}")
+
+    def load_levels(self):
+        """{seviye_anahtarı: [kurs, ...]}; kayıt yoksa boş sözlük."""
+        try:
+            raw = self.client.hgetall(self._levels_key)
+        except redis.RedisError as e:
+            print(f"Seviye kontrol noktaları okunamadı: {e}")
+            return {}
+        return {k.decode('utf-8'): json.loads(v) for k, v in raw.items()}
+
+    def count_levels(self):
+        try:
+            return self.client.hlen(self._levels_key)
+        except redis.RedisError:
+            return 0
+
+    def clear(self):
+        try:
+            self.client.delete(self._levels_key, self._meta_key)
+        except redis.RedisError:
+            pass
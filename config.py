@@ -0,0 +1,150 @@
+# config.py
+# Ortam değişkenleriyle ezilebilen ortak ayarlar (web, worker ve scraper aynı değerleri kullanır).
+
+import json
+import os
+
+# UZEM (Moodle) kök adresi. Yerel stub sunucusuna karşı çalışmak için ezilebilir.
+UZEM_BASE_URL = os.environ.get('UZEM_BASE_URL', 'https://uzem.msu.edu.tr')
+
+# Selenium standalone-chrome konteynerinin adresi
+SELENIUM_URL = os.environ.get('SELENIUM_URL', 'http://selenium_chrome:4444/wd/hub')
+
+# Celery broker/backend ve önbellekler için Redis
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://redis:6379/0')
+
+# Kazıma motoru:
+#   'http'     -> önce tarayıcısız HTTP motoru, işleyemediği sayfada Selenium'a düşer
+#   'selenium' -> her zaman uzak Chrome (eski davranış)
+SCRAPER_ENGINE = os.environ.get('SCRAPER_ENGINE', 'http').lower()
+
+# HTTP motorunun bağlantı havuzu boyutu (aynı host için açık tutulacak bağlantı sayısı)
+HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', '10'))
+
+# Tek bir HTTP isteği için zaman aşımı (saniye)
+HTTP_TIMEOUT = float(os.environ.get('HTTP_TIMEOUT', '30'))
+
+# Kurs sayfası çekmelerinde 5xx/ağ hatası için tekrar sayısı ve ilk bekleme (saniye, her denemede iki katına çıkar)
+FETCH_RETRIES = int(os.environ.get('FETCH_RETRIES', '2'))
+FETCH_BACKOFF = float(os.environ.get('FETCH_BACKOFF', '0.5'))
+
+# Aynı anda havada olacak kurs sayfası isteği sayısı
+COURSE_FETCH_CONCURRENCY = int(os.environ.get('COURSE_FETCH_CONCURRENCY', '6'))
+
+# HTTP motorunda kurs içerikleri sayfa sayfa yerine Moodle AJAX servisiyle (lib/ajax/service.php,
+# core_course_get_contents) toplu istensin mi; tek POST'ta istenecek kurs sayısı.
+# Servis kullanılamazsa ya da kurs için hata dönerse kurs sayfası HTML ile çekilir.
+MOODLE_AJAX_ENABLED = os.environ.get('MOODLE_AJAX_ENABLED', '0') == '1'
+MOODLE_AJAX_BATCH_SIZE = int(os.environ.get('MOODLE_AJAX_BATCH_SIZE', '50'))
+
+# Bir görev içinde seviyeleri paralel işleyecek oturum sayısı (aynı girişin çerezlerini paylaşırlar)
+LEVEL_WORKERS = int(os.environ.get('LEVEL_WORKERS', '3'))
+
+# Oturum (çerez) önbelleğinin ömrü (saniye). Moodle oturumu bundan önce düşerse kayıt doğrulamada elenir.
+SESSION_CACHE_TTL = int(os.environ.get('SESSION_CACHE_TTL', str(2 * 60 * 60)))
+
+# Kurs sayfası önbelleğinin ömrü (saniye) ve açık/kapalı anahtarı
+COURSE_CACHE_TTL = int(os.environ.get('COURSE_CACHE_TTL', str(14 * 24 * 60 * 60)))
+COURSE_CACHE_ENABLED = os.environ.get('COURSE_CACHE_ENABLED', '1') == '1'
+
+# Dil/seviye link haritası önbelleğinin ömrü (saniye)
+LINK_MAP_CACHE_TTL = int(os.environ.get('LINK_MAP_CACHE_TTL', str(24 * 60 * 60)))
+
+# İlerleme/log yazımlarının backend'e en sık ne aralıkla (saniye) ve kaç satır birikince yapılacağı
+PROGRESS_FLUSH_INTERVAL = float(os.environ.get('PROGRESS_FLUSH_INTERVAL', '0.5'))
+PROGRESS_FLUSH_LINES = int(os.environ.get('PROGRESS_FLUSH_LINES', '25'))
+
+# Görev olay listesinin (SSE'de kaldığı yerden devam için) Redis'te tutulma süresi (saniye)
+TASK_EVENTS_TTL = int(os.environ.get('TASK_EVENTS_TTL', str(24 * 60 * 60)))
+
+# Kurs sayfalarını ayrıştıran işlem havuzunun boyutu (worker süreci başına). 0: ayrıştırma çekme thread'inde yapılır.
+PARSE_PROCESSES = int(os.environ.get('PARSE_PROCESSES', str(min(4, os.cpu_count() or 1))))
+
+# Ayrıştırılmayı bekleyen en fazla ham sayfa sayısı (oturum başına); dolunca çekme aşaması bekler
+PARSE_QUEUE_SIZE = int(os.environ.get('PARSE_QUEUE_SIZE', '32'))
+
+# Worker süreci başına sıcak tutulan Selenium oturumu sayısı (konteynerin oturum sınırını aşmamalı). 0: havuz kapalı.
+SELENIUM_POOL_SIZE = int(os.environ.get('SELENIUM_POOL_SIZE', '2'))
+# Havuzdaki bir oturumun en uzun ömrü ve boşta kalma süresi (saniye). Boşta kalma süresi grid'in
+# oturum zaman aşımından (standalone-chrome'da varsayılan 300 sn) kısa tutulmalı.
+SELENIUM_SESSION_MAX_AGE = int(os.environ.get('SELENIUM_SESSION_MAX_AGE', str(30 * 60)))
+SELENIUM_SESSION_MAX_IDLE = int(os.environ.get('SELENIUM_SESSION_MAX_IDLE', '240'))
+# Havuz doluyken boş oturum için en fazla bekleme (saniye)
+SELENIUM_POOL_WAIT_TIMEOUT = float(os.environ.get('SELENIUM_POOL_WAIT_TIMEOUT', '300'))
+# Worker açılışında önceden açılacak oturum sayısı
+SELENIUM_POOL_PREWARM = int(os.environ.get('SELENIUM_POOL_PREWARM', '0'))
+
+# Hangi dilde hangi seviyeler işlenecek (listede olmayan diller 'default'u kullanır)
+ALLOWED_LEVELS = {
+    'İngilizce': ['A1', 'A2', 'B1', 'B2', 'C1'],
+    'default':   ['A1', 'A2', 'B1'],
+}
+
+# Aynı iş (hesap + diller + seviyeler) için son sonucun yeniden kullanılabileceği süre (saniye)
+JOB_RESULT_TTL = int(os.environ.get('JOB_RESULT_TTL', str(15 * 60)))
+# Çalışan iş kaydının en uzun ömrü (saniye); worker düşerse kayıt bu sürede kendiliğinden silinir
+JOB_RUNNING_TTL = int(os.environ.get('JOB_RUNNING_TTL', str(2 * 60 * 60)))
+
+# İş zamanlayıcı (scheduler.py): işler Redis'te hesap başına sıralarda bekler, sınırlar elverdikçe hesaplar arasında
+# sırayla Celery'nin 'interactive' (tek dil) ya da 'bulk' (çok dil) kuyruğuna verilir. 0: işler doğrudan kuyruğa.
+SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', '1') == '1'
+# Aynı anda çalışan toplam iş (selenium_chrome'un oturum sınırını ve worker kapasitesini aşmamalı),
+# bunların en fazla kaçının toplu iş olabileceği (küçük tutulursa tek dilli işlere her zaman yer kalır)
+# ve hesap başına çalışan iş sınırı
+SCHED_GLOBAL_LIMIT = int(os.environ.get('SCHED_GLOBAL_LIMIT', '4'))
+SCHED_BULK_LIMIT = int(os.environ.get('SCHED_BULK_LIMIT', '3'))
+SCHED_ACCOUNT_LIMIT = int(os.environ.get('SCHED_ACCOUNT_LIMIT', '1'))
+# Sıranın (süresi dolan kiralamalar dahil) celery beat ile yeniden gözden geçirilme aralığı (saniye)
+SCHED_DISPATCH_INTERVAL = float(os.environ.get('SCHED_DISPATCH_INTERVAL', '30'))
+
+# Kazıma sonuçlarının anlık görüntülerinin (rapor yeniden üretimi için) klasörü ve saklama süresi (saniye)
+SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR', 'snapshots')
+SNAPSHOT_MAX_AGE = int(os.environ.get('SNAPSHOT_MAX_AGE', str(30 * 24 * 60 * 60)))
+# "Son anlık görüntüyü kullan" modunda bir dilin görüntüsü bu süreden (saniye) yeniyse yeniden kazınmaz
+SNAPSHOT_FRESHNESS = int(os.environ.get('SNAPSHOT_FRESHNESS', str(26 * 60 * 60)))
+
+# Yoğun olmayan saatte (Celery beat) tüm dillerin servis hesabıyla önceden kazınması.
+# Kullanıcı adı boşsa zamanlanmış görev eklenmez. PRECOMPUTE_CRON: "dakika saat ayın-günü ay haftanın-günü"
+# (Europe/Istanbul); PRECOMPUTE_LANGUAGES: virgülle ayrılmış diller, boşsa tümü.
+PRECOMPUTE_USERNAME = os.environ.get('PRECOMPUTE_USERNAME', '')
+PRECOMPUTE_PASSWORD = os.environ.get('PRECOMPUTE_PASSWORD', '')
+PRECOMPUTE_CRON = os.environ.get('PRECOMPUTE_CRON', '0 3 * * *')
+PRECOMPUTE_LANGUAGES = [l.strip() for l in os.environ.get('PRECOMPUTE_LANGUAGES', '').split(',') if l.strip()]
+
+# DOYK geçmişinin (biten işlerin sayıları ve kurs dağılımları, zaman serisi) SQLite dosyası. Kayıtlar silinmez.
+HISTORY_PATH = os.environ.get('HISTORY_PATH', os.path.join('history', 'doyk.sqlite3'))
+
+# Üretilen raporların klasörü (görev ID'si başına alt klasör + SQLite dizini).
+# Bu süreden eski raporlar silinir; toplam boyut sınırı aşılırsa en eskilerden başlanır.
+REPORT_DIR = os.environ.get('REPORT_DIR', 'output')
+REPORT_MAX_AGE = int(os.environ.get('REPORT_MAX_AGE', str(7 * 24 * 60 * 60)))
+REPORT_MAX_BYTES = int(os.environ.get('REPORT_MAX_BYTES', str(1024 * 1024 * 1024)))
+
+# Görev sonucunda ve UI log'unda listelenecek en yavaş kurs sayısı
+METRICS_SLOWEST_COURSES = int(os.environ.get('METRICS_SLOWEST_COURSES', '10'))
+
+# Uyarlanabilir hız denetimi (AIMD): host başına aynı anda havadaki istek sayısı, sunucu sağlıklıyken
+# RATE_LIMIT_MAX'a kadar artar; 429/503, 5xx/ağ hatası ya da gecikme tabanın RATE_LATENCY_TOLERANCE katını
+# aşınca RATE_BACKOFF_FACTOR ile çarpılır. 0 ile kapatılırsa sabit COURSE_FETCH_CONCURRENCY kullanılır.
+RATE_CONTROL_ENABLED = os.environ.get('RATE_CONTROL_ENABLED', '1') == '1'
+RATE_LIMIT_INITIAL = float(os.environ.get('RATE_LIMIT_INITIAL', str(COURSE_FETCH_CONCURRENCY)))
+RATE_LIMIT_MIN = float(os.environ.get('RATE_LIMIT_MIN', '1'))
+RATE_LIMIT_MAX = float(os.environ.get('RATE_LIMIT_MAX', '16'))
+RATE_BACKOFF_FACTOR = float(os.environ.get('RATE_BACKOFF_FACTOR', '0.5'))
+RATE_LATENCY_TOLERANCE = float(os.environ.get('RATE_LATENCY_TOLERANCE', '2.0'))
+# Host'a özgü sınırlar (JSON), ör. {"uzem.msu.edu.tr": {"initial": 4, "max": 8}}
+RATE_LIMITS_BY_HOST = json.loads(os.environ.get('RATE_LIMITS_BY_HOST', '{}'))
+# Retry-After en fazla bu kadar (saniye) dikkate alınır
+RATE_MAX_RETRY_AFTER = float(os.environ.get('RATE_MAX_RETRY_AFTER', '120'))
+# Sınır Redis üzerinden worker'lar arasında paylaşılsın mı; paylaşımlı durumun okunma aralığı (saniye)
+RATE_SHARED = os.environ.get('RATE_SHARED', '0') == '1'
+RATE_SYNC_INTERVAL = float(os.environ.get('RATE_SYNC_INTERVAL', '0.5'))
+
+# Seviye kontrol noktalarının (yarıda kalan görevin devamı için) saklanma süresi (saniye)
+CHECKPOINT_TTL = int(os.environ.get('CHECKPOINT_TTL', str(24 * 60 * 60)))
+# Geçici hatalarda (tarayıcı/ağ) görevin aynı ID ile kendiliğinden yeniden denenme sayısı ve bekleme (saniye)
+JOB_MAX_RETRIES = int(os.environ.get('JOB_MAX_RETRIES', '2'))
+JOB_RETRY_DELAY = int(os.environ.get('JOB_RETRY_DELAY', '30'))
+# Onaylanmamış görevin başka worker'a yeniden verilmesinden önceki süre (saniye). acks_late ile görev bitince
+# onaylandığından en uzun görevden uzun olmalı; yoksa çalışan görev ikinci kez başlatılır.
+JOB_VISIBILITY_TIMEOUT = int(os.environ.get('JOB_VISIBILITY_TIMEOUT', str(JOB_RUNNING_TTL)))
@@ -0,0 +1,240 @@
+# course_analyzer.py
+# Kurs sayfası HTML'indeki DOYK kaynaklarını tek geçişte sayar (tarayıcıdaki JS seçicilerinin Python karşılığı).
+# Aynı kurallar Moodle web servisinin (core_course_get_contents) modül listesine de uygulanabilir.
+# Sadece standart kütüphaneye bağlıdır; işlem havuzunda (ProcessPoolExecutor) çalıştırılabilir.
+
+import re
+from dataclasses import asdict, dataclass
+
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+}
+# HTML5 ağaç kurma kurallarının sayımı etkileyen kısmı (liste, paragraf ve blok elemanları).
+# Biçimlendirme elemanlarının (<a>, <b> ...) yeniden ebeveynlenmesi ve tablolar modellenmez;
+# Moodle şablonları bu durumları üretmediği için sonuçlar tarayıcıdaki querySelectorAll ile aynıdır.
+SPECIAL_TAGS = {
+    'address', 'applet', 'area', 'article', 'aside', 'base', 'blockquote', 'body', 'br', 'button',
+    'caption', 'center', 'col', 'colgroup', 'dd', 'details', 'dir', 'div', 'dl', 'dt', 'embed',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'head',
+    'header', 'hgroup', 'hr', 'html', 'iframe', 'img', 'input', 'li', 'link', 'listing', 'main',
+    'marquee', 'menu', 'meta', 'nav', 'noscript', 'object', 'ol', 'p', 'param', 'pre', 'script',
+    'search', 'section', 'select', 'source', 'style', 'summary', 'table', 'tbody', 'td', 'template',
+    'textarea', 'tfoot', 'th', 'thead', 'title', 'tr', 'track', 'ul', 'wbr',
+}
+# Açık bir <p>'yi kapatan başlangıç etiketleri
+CLOSES_P_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'center', 'details', 'dialog', 'dir', 'div', 'dl',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header',
+    'hgroup', 'hr', 'li', 'dd', 'dt', 'listing', 'main', 'menu', 'nav', 'ol', 'p', 'pre', 'search',
+    'section', 'summary', 'table', 'ul',
+}
+# Kapanış etiketi, kapsamda aynı eleman varsa aradaki her şeyi kapatan blok elemanlar
+BLOCK_END_TAGS = CLOSES_P_TAGS - {'hr', 'li', 'dd', 'dt', 'p', 'table'} | {'button'}
+SCOPE_TAGS = {'applet', 'caption', 'html', 'table', 'td', 'th', 'marquee', 'object', 'template'}
+BUTTON_SCOPE_TAGS = SCOPE_TAGS | {'button'}
+LIST_ITEM_SCOPE_TAGS = SCOPE_TAGS | {'ol', 'ul'}
+
+# html.parser yerine tek bir derlenmiş desen: yorumlar ve script/style içerikleri atlanır,
+# geri kalan her eşleşme bir etikettir. Öznitelikler sadece 'class' için ayrıştırılır.
+_TOKEN_RE = re.compile(
+    r'<!--.*?(?:-->|$)'
+    r'|<(script|style|textarea|title)\b[^>]*>.*?(?:</\1\s*>|$)'
+    r'|<(/?)([a-zA-Z][^\s/>]*)((?:[^>"\']+|"[^"]*"|\'[^\']*\')*)>',
+    re.DOTALL | re.IGNORECASE,
+)
+_CLASS_RE = re.compile(r'(?:^|\s)class\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))', re.IGNORECASE)
+
+# Sınıf -> sayaç alanı (JS'teki seçicilerle birebir)
+#   div.h5p-placeholder:not(:has(div.hiddenactivity))
+#   li.resource / li.h5pactivity / li.modtype_assign :not(:has(div.hiddenactivity))
+#   div.video-js:has(video):not(:has(audio)):not(:has(.hiddenactivity))
+DIV_KINDS = {'h5p-placeholder': 'h5p_placeholders', 'video-js': 'videos'}
+LI_KINDS = {'resource': 'resources', 'h5pactivity': 'h5p_activities', 'modtype_assign': 'assignments'}
+# Web servisindeki modül türü -> sayaç alanı (sayfada bu modüllerin <li>'si yukarıdaki sınıfları taşır)
+MODULE_KINDS = {'resource': 'resources', 'h5pactivity': 'h5p_activities', 'assign': 'assignments'}
+
+
+@dataclass(frozen=True)
+class CourseCounts:
+    """Bir kurs sayfasındaki görünür (gizli olmayan) öğe sayıları."""
+    h5p_placeholders: int = 0
+    resources: int = 0
+    h5p_activities: int = 0
+    assignments: int = 0
+    videos: int = 0
+
+    @property
+    def total(self):
+        return self.h5p_placeholders + self.resources + self.h5p_activities + self.assignments + self.videos
+
+    def as_dict(self):
+        return asdict(self)
+
+
+class _Candidate:
+    """Sayılabilecek açık bir eleman ve alt elemanlarında görülenler (:has karşılığı)."""
+    __slots__ = ('kinds', 'hidden_div', 'hidden_any', 'has_video', 'has_audio')
+
+    def __init__(self, kinds):
+        self.kinds = kinds
+        self.hidden_div = self.hidden_any = self.has_video = self.has_audio = False
+
+
+class CourseAnalyzer:
+    """
+    SAX tarzı tek geçişli sayıcı. Sadece açık aday elemanlar (div.h5p-placeholder, li.resource, ...)
+    takip edilir; her yeni eleman, açık adayların bayraklarını günceller. Aday kapanınca değerlendirilir.
+    """
+
+    def __init__(self):
+        self.stack = []        # [(tag, _Candidate | None)]
+        self.open_candidates = []
+        self.open_p = 0        # yığındaki <p> sayısı; çoğu etikette kapsam taramasını atlamak için
+        self.counts = dict.fromkeys(CourseCounts.__dataclass_fields__, 0)
+
+    def feed(self, html):
+        for m in _TOKEN_RE.finditer(html):
+            tag = m.group(3)
+            if tag is None:
+                continue  # yorum ya da ham metin elemanı
+            tag = tag.lower()
+            if m.group(2):
+                self.handle_endtag(tag)
+            else:
+                attrs = m.group(4)
+                classes = ()
+                if 'class' in attrs or 'CLASS' in attrs:
+                    c = _CLASS_RE.search(attrs)
+                    if c:
+                        classes = (c.group(1) or c.group(2) or c.group(3) or '').split()
+                self.handle_starttag(tag, classes)
+
+    def handle_starttag(self, tag, classes):
+        # HTML'de <div/> kendini kapatmaz; tarayıcı gibi açık etiket sayılır
+        if tag in CLOSES_P_TAGS:
+            if tag == 'li' or tag in ('dd', 'dt'):
+                self._close_list_item(('li',) if tag == 'li' else ('dd', 'dt'))
+            if self.open_p:
+                self._close_in_scope('p', BUTTON_SCOPE_TAGS)
+
+        # Yeni eleman açık adayların alt elemanıdır
+        if self.open_candidates:
+            hidden = 'hiddenactivity' in classes
+            if hidden or tag in ('video', 'audio'):
+                for cand in self.open_candidates:
+                    if hidden:
+                        cand.hidden_any = True
+                        if tag == 'div':
+                            cand.hidden_div = True
+                    elif tag == 'video':
+                        cand.has_video = True
+                    else:
+                        cand.has_audio = True
+
+        if tag in VOID_TAGS:
+            return
+
+        candidate = None
+        if classes and tag in ('div', 'li'):
+            table = DIV_KINDS if tag == 'div' else LI_KINDS
+            kinds = [table[c] for c in classes if c in table]
+            if kinds:
+                candidate = _Candidate(kinds)
+                self.open_candidates.append(candidate)
+        if tag == 'p':
+            self.open_p += 1
+        self.stack.append((tag, candidate))
+
+    def handle_endtag(self, tag):
+        if tag in ('html', 'body', 'head') or tag in VOID_TAGS:
+            # Gövde sonuna kadar açık kalanlar close() içinde kapatılır
+            return
+        if tag == 'p':
+            if self.open_p:
+                self._close_in_scope('p', BUTTON_SCOPE_TAGS)
+        elif tag == 'li':
+            self._close_in_scope('li', LIST_ITEM_SCOPE_TAGS)
+        elif tag in BLOCK_END_TAGS or tag in ('dd', 'dt'):
+            self._close_in_scope(tag, SCOPE_TAGS)
+        else:
+            # Diğer etiketler: eşleşen elemana kadar kapat, arada özel eleman varsa yok say
+            for i in range(len(self.stack) - 1, -1, -1):
+                open_tag = self.stack[i][0]
+                if open_tag == tag:
+                    self._pop_to(i)
+                    return
+                if open_tag in SPECIAL_TAGS:
+                    return
+
+    def close(self):
+        self._pop_to(0)
+
+    def _close_in_scope(self, tag, boundaries):
+        """Kapsamda (sınır elemanı aşılmadan) açık `tag` varsa onu ve içindekileri kapatır."""
+        for i in range(len(self.stack) - 1, -1, -1):
+            open_tag = self.stack[i][0]
+            if open_tag == tag:
+                self._pop_to(i)
+                return
+            if open_tag in boundaries:
+                return
+
+    def _close_list_item(self, tags):
+        # Yeni <li>, araya özel bir eleman (div/p/address hariç) girmediyse açık <li>'yi kapatır
+        for i in range(len(self.stack) - 1, -1, -1):
+            open_tag = self.stack[i][0]
+            if open_tag in tags:
+                self._pop_to(i)
+                return
+            if open_tag in SPECIAL_TAGS and open_tag not in ('address', 'div', 'p'):
+                return
+
+    def _pop_to(self, index):
+        while len(self.stack) > index:
+            tag, cand = self.stack.pop()
+            if tag == 'p':
+                self.open_p -= 1
+            if cand is not None:
+                self.open_candidates.remove(cand)
+                self._evaluate(cand)
+
+    def _evaluate(self, cand):
+        for kind in cand.kinds:
+            if kind == 'videos':
+                if cand.has_video and not cand.has_audio and not cand.hidden_any:
+                    self.counts[kind] += 1
+            elif not cand.hidden_div:
+                self.counts[kind] += 1
+
+
+def analyze_course_html(html):
+    """Kurs sayfası HTML'ini tek geçişte analiz eder ve CourseCounts döndürür."""
+    analyzer = CourseAnalyzer()
+    analyzer.feed(html or '')
+    analyzer.close()
+    return CourseCounts(**analyzer.counts)
+
+
+def analyze_course_contents(sections):
+    """
+    core_course_get_contents yanıtını (bölümler -> modüller) sayfadaki kurallarla sayar:
+    resource/h5pactivity/assign modülleri gizli değilse (sayfada div.hiddenactivity taşımıyorsa: visible ve
+    visibleoncoursepage) birer sayılır; H5P yer tutucuları ve videolar sayfada bölüm özetlerinin ve modül
+    açıklamalarının (etiketler) içinde olduğundan bu HTML parçalarından sayılır.
+    """
+    counts = dict.fromkeys(CourseCounts.__dataclass_fields__, 0)
+    fragments = []
+    for section in sections or []:
+        fragments.append(section.get('summary') or '')
+        for module in section.get('modules') or []:
+            kind = MODULE_KINDS.get(module.get('modname'))
+            if kind and module.get('visible', 1) and module.get('visibleoncoursepage', 1):
+                counts[kind] += 1
+            fragments.append(module.get('description') or '')
+    for fragment in fragments:
+        if '<' in fragment:
+            embedded = analyze_course_html(fragment)
+            counts['h5p_placeholders'] += embedded.h5p_placeholders
+            counts['videos'] += embedded.videos
+    return CourseCounts(**counts)
@@ -0,0 +1,171 @@
+# driver_pool.py
+# Worker süreci başına sıcak Selenium oturumu havuzu. Her görevde webdriver.Remote açıp kapatmak yerine
+# hazır yapılandırılmış oturumlar ödünç verilir; iade edilirken kullanıcıya ait durum temizlenir.
+
+import threading
+import time
+
+import config
+
+
+class DriverPoolTimeout(Exception):
+    """Havuzda süresi içinde boş oturum bulunamadı."""
+
+
+class _Entry:
+    __slots__ = ('driver', 'created_at', 'released_at', 'jobs')
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.created_at = time.monotonic()
+        self.released_at = self.created_at
+        self.jobs = 0
+
+
+class DriverPool:
+    """
+    En fazla `size` oturum (boşta + kullanımda) tutar; bu sınır Selenium konteynerinin oturum
+    sınırına göre seçilmelidir. Oturumlar ilk ihtiyaçta `factory()` ile açılır.
+
+    acquire(): boş ve sağlıklı bir oturum verir. Ömrünü (max_age) aşmış, uzun süre boşta kalmış
+    (max_idle, grid oturumu kendiliğinden düşürmeden önce) ya da sağlık kontrolünden geçemeyen
+    oturumlar kapatılıp yenisi açılır. Havuz doluysa bekler; bekleme süresi istatistiğe yazılır.
+    release(): çerezleri, site depolamasını ve fazla sekmeleri temizleyip oturumu havuza geri koyar.
+    Temizlik başarısız olursa oturum kapatılır; bir kullanıcının durumu diğerine geçmez.
+    """
+
+    def __init__(self, factory, size, max_age=None, max_idle=None):
+        self.factory = factory
+        self.size = size
+        self.max_age = config.SELENIUM_SESSION_MAX_AGE if max_age is None else max_age
+        self.max_idle = config.SELENIUM_SESSION_MAX_IDLE if max_idle is None else max_idle
+        self._idle = []
+        self._in_use = {}
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self.stats = {'created': 0, 'reused': 0, 'discarded': 0,
+                      'waits': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0}
+
+    def acquire(self, timeout=None, stage_stats=None):
+        """Oturum ödünç verir; `timeout` saniye içinde yer açılmazsa DriverPoolTimeout fırlatır."""
+        timeout = config.SELENIUM_POOL_WAIT_TIMEOUT if timeout is None else timeout
+        started = time.perf_counter()
+        acquired = self._slots.acquire(timeout=timeout) if timeout > 0 else self._slots.acquire(blocking=False)
+        waited = time.perf_counter() - started
+        with self._lock:
+            self.stats['waits'] += 1
+            self.stats['wait_seconds'] += waited
+            self.stats['max_wait_seconds'] = max(self.stats['max_wait_seconds'], waited)
+        if stage_stats is not None:
+            stage_stats.add('driver_wait', waited)
+        if not acquired:
+            raise DriverPoolTimeout(f"Tarayıcı havuzunda {timeout:.0f} sn içinde boş oturum bulunamadı.")
+
+        try:
+            while True:
+                with self._lock:
+                    entry = self._idle.pop() if self._idle else None
+                if entry is None:
+                    break
+                if self._usable(entry):
+                    with self._lock:
+                        self.stats['reused'] += 1
+                    return self._lend(entry)
+                self._discard(entry)
+
+            entry = _Entry(self.factory())
+            with self._lock:
+                self.stats['created'] += 1
+            return self._lend(entry)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, driver, origins=(), discard=False):
+        """Oturumu temizleyip havuza iade eder; discard=True ise ya da temizlik başarısızsa kapatır."""
+        with self._lock:
+            entry = self._in_use.pop(id(driver), None)
+        if entry is None:
+            # Havuzdan alınmamış sürücü
+            _quit(driver)
+            return
+        try:
+            if discard or self._expired(entry) or not _clear_state(driver, origins):
+                self._discard(entry)
+            else:
+                entry.released_at = time.monotonic()
+                with self._lock:
+                    self._idle.append(entry)
+        finally:
+            self._slots.release()
+
+    def prewarm(self, count):
+        """Worker açılışında `count` oturumu önceden açıp boşta bekletir."""
+        drivers = []
+        for _ in range(min(count, self.size)):
+            try:
+                drivers.append(self.acquire(timeout=0))
+            except Exception as e:
+                print(f"Tarayıcı havuzu önceden doldurulamadı: {e}")
+                break
+        for driver in drivers:
+            self.release(driver)
+
+    def close_all(self):
+        """Boştaki oturumları kapatır (worker kapanırken konteynerdeki oturum yerlerini boşaltmak için)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            _quit(entry.driver)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, size=self.size, idle=len(self._idle), in_use=len(self._in_use))
+
+    def _lend(self, entry):
+        entry.jobs += 1
+        with self._lock:
+            self._in_use[id(entry.driver)] = entry
+        return entry.driver
+
+    def _expired(self, entry):
+        return self.max_age and time.monotonic() - entry.created_at > self.max_age
+
+    def _usable(self, entry):
+        now = time.monotonic()
+        if self._expired(entry) or (self.max_idle and now - entry.released_at > self.max_idle):
+            return False
+        try:
+            return entry.driver.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    def _discard(self, entry):
+        with self._lock:
+            self.stats['discarded'] += 1
+        _quit(entry.driver)
+
+
+def _clear_state(driver, origins):
+    """Çerezleri, verilen origin'lerin depolamasını ve fazla sekmeleri temizler; başarılıysa True."""
+    try:
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.get('about:blank')
+        driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        for origin in origins:
+            driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+        return True
+    except Exception as e:
+        print(f"Tarayıcı oturumu temizlenemedi, kapatılıyor: {e}")
+        return False
+
+
+def _quit(driver):
+    try:
+        driver.quit()
+    except Exception as e:
+        print(f"WebDriver kapatılırken hata: {e}")
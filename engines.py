@@ -0,0 +1,148 @@
+# engines.py
+# Kazıma motoru seçimi: HTTP motoru önce denenir, işleyemediği sayfada Selenium devreye girer.
+
+import config
+from http_scraper import UzemHttpScraper, UnsupportedPageError
+from scraper_refactored import UzemScraper
+
+
+class FallbackScraper:
+    """
+    UzemHttpScraper'ı saran ve UnsupportedPageError durumunda aynı çağrıyı Selenium ile tekrarlayan motor.
+    Selenium yalnızca ilk ihtiyaç anında başlatılır; HTTP oturumunun çerezleri tarayıcıya taşınır,
+    böylece yeniden giriş yapılmaz.
+    """
+
+    def __init__(self, username, password, base_url=None):
+        self.username = username
+        self.password = password
+        self.base_url = base_url
+        self.http = UzemHttpScraper(username, password, base_url=base_url)
+        self.selenium = None
+        self.logged_in = False
+
+    @property
+    def driver(self):
+        return self.selenium.driver if self.selenium else self.http.driver
+
+    @property
+    def dashboard_url(self):
+        return self.selenium.dashboard_url if self.selenium else self.http.dashboard_url
+
+    @dashboard_url.setter
+    def dashboard_url(self, value):
+        self.http.dashboard_url = value
+        if self.selenium:
+            self.selenium.dashboard_url = value
+
+    @property
+    def cache_stats(self):
+        return self.http.cache_stats
+
+    @property
+    def stage_stats(self):
+        return self.http.stage_stats
+
+    @property
+    def tracer(self):
+        return self.http.tracer
+
+    @tracer.setter
+    def tracer(self, value):
+        self.http.tracer = value
+        if self.selenium:
+            self.selenium.tracer = value
+
+    def _selenium_engine(self):
+        if self.selenium is None:
+            print("[HTTP] Sayfa işlenemedi, Selenium motoruna geçiliyor...")
+            engine = UzemScraper(self.username, self.password, base_url=self.base_url)
+            # Tarayıcı havuzu bekleme süresi de bu oturumun aşama sürelerine yazılsın
+            engine.stage_stats = self.http.stage_stats
+            engine.tracer = self.http.tracer
+            if not engine.connect_driver():
+                raise Exception("WebDriver başlatılamadı.")
+            if self.logged_in:
+                engine.import_cookies(self.http.export_cookies())
+                engine.dashboard_url = self.http.dashboard_url
+            self.selenium = engine
+        return self.selenium
+
+    def _call(self, name, *args):
+        if self.selenium is not None:
+            return getattr(self.selenium, name)(*args)
+        try:
+            return getattr(self.http, name)(*args)
+        except UnsupportedPageError as e:
+            print(f"[HTTP] {name}: {e}")
+            return getattr(self._selenium_engine(), name)(*args)
+
+    def connect_driver(self):
+        return self.http.connect_driver()
+
+    def login(self):
+        self.logged_in = self._call('login')
+        return self.logged_in
+
+    def restore_session(self, cookies, dashboard_url):
+        self.logged_in = self.http.restore_session(cookies, dashboard_url)
+        return self.logged_in
+
+    def get_language_level_links(self):
+        return self._call('get_language_level_links')
+
+    def scrape_doyk_content(self, url):
+        return self._call('scrape_doyk_content', url)
+
+    def export_cookies(self):
+        engine = self.selenium or self.http
+        return engine.export_cookies()
+
+    def import_cookies(self, cookies):
+        """Başka bir oturumun çerezleriyle girişli duruma geçer (login çağrılmadan)."""
+        self.http.import_cookies(cookies)
+        self.logged_in = True
+        return True
+
+    def close_driver(self):
+        self.http.close_driver()
+        if self.selenium:
+            self.selenium.close_driver()
+
+
+def create_scraper(username, password, engine=None, base_url=None, pool_timeout=None):
+    """
+    config.SCRAPER_ENGINE'e göre uygun motoru oluşturur.
+    pool_timeout: Selenium motorunda tarayıcı havuzunda boş oturum için en fazla bekleme (saniye).
+    """
+    engine = (engine or config.SCRAPER_ENGINE).lower()
+    if engine == 'selenium':
+        return UzemScraper(username, password, base_url=base_url, pool_timeout=pool_timeout)
+    return FallbackScraper(username, password, base_url=base_url)
+
+
+def open_session_pool(primary, username, password, size, engine=None, base_url=None):
+    """
+    Giriş yapmış `primary` oturumun çerezlerini paylaşan en fazla `size` oturumluk liste döndürür
+    (ilk eleman primary'dir). Bağlanamayan ek oturumlar atlanır; havuz küçülür ama iş durmaz.
+    Ek tarayıcı oturumları için havuzda beklenmez: başka görevlerin oturumu varken yer açılmasını
+    beklemek yerine eldeki oturumlarla devam edilir.
+    """
+    sessions = [primary]
+    if size <= 1:
+        return sessions
+
+    cookies = primary.export_cookies()
+    for _ in range(size - 1):
+        clone = create_scraper(username, password, engine=engine, base_url=base_url, pool_timeout=0)
+        try:
+            if not clone.connect_driver():
+                raise Exception("bağlantı kurulamadı")
+            clone.import_cookies(cookies)
+            clone.dashboard_url = primary.dashboard_url
+        except Exception as e:
+            print(f"Ek oturum açılamadı, mevcut oturumlarla devam ediliyor: {e}")
+            clone.close_driver()
+            break
+        sessions.append(clone)
+    return sessions
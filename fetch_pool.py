@@ -0,0 +1,60 @@
+# fetch_pool.py
+# Tarayıcısız yol için sınırlı eşzamanlılıkla (N istek havada) sayfa çekme yardımcıları.
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import config
+from rate_control import THROTTLE_STATUS, limited_get, parse_retry_after
+
+# Bu durum kodlarında ve ağ hatalarında istek yeniden denenir
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class RetryableHTTPError(requests.HTTPError):
+    """5xx/429 yanıtlar için; yeniden denenebilir."""
+
+
+def fetch_with_retry(session, url, timeout=None, retries=None, backoff=None, headers=None, limiter=None):
+    """
+    URL'i çeker; 5xx/429 veya ağ hatasında üstel geri çekilmeyle (backoff, 2*backoff, ...) tekrar dener.
+    Sunucu Retry-After verdiyse en az o kadar beklenir. Her deneme host'un uyarlanabilir sınırından
+    (rate_control) yer alarak yapılır.
+    Dönüş: (response, deneme_sayısı). Tüm denemeler başarısızsa son hata (e.attempts ile) fırlatılır.
+    """
+    timeout = config.HTTP_TIMEOUT if timeout is None else timeout
+    retries = config.FETCH_RETRIES if retries is None else retries
+    backoff = config.FETCH_BACKOFF if backoff is None else backoff
+
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            r = limited_get(session, url, limiter, timeout=timeout, headers=headers)
+            if r.status_code in RETRYABLE_STATUS:
+                raise RetryableHTTPError(f"HTTP {r.status_code}", response=r)
+            r.raise_for_status()
+            return r, attempt
+        except (RetryableHTTPError, requests.ConnectionError, requests.Timeout) as e:
+            if attempt > retries:
+                e.attempts = attempt
+                raise
+            delay = backoff * (2 ** (attempt - 1))
+            if isinstance(e, RetryableHTTPError) and e.response.status_code in THROTTLE_STATUS:
+                delay = max(delay, parse_retry_after(e.response.headers.get('Retry-After')) or 0)
+            time.sleep(delay)
+
+
+def bounded_map(func, items, concurrency):
+    """
+    func'ı items üzerinde en fazla `concurrency` iş aynı anda çalışacak şekilde uygular.
+    Biten işin yerine hemen sıradaki başlar; sonuçlar girdi sırasıyla döner.
+    """
+    items = list(items)
+    if not items:
+        return []
+    workers = max(1, min(int(concurrency or 1), len(items)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, items))
@@ -0,0 +1,250 @@
+# history.py
+# Biten işlerin DOYK sayılarının ve kurs bazında dağılımlarının zaman serisi (SQLite).
+# Her iş bir 'runs' satırı ile (dil, seviye, beceri) ve (dil, seviye, kurs) başına birer nokta ekler.
+# Tablolar sorgu sırasıyla kümelenmiştir (WITHOUT ROWID); dil/seviye/beceri + zaman aralığı sorguları
+# indeks aralık taramasıyla döner. "Bu dönem İngilizce B1 okuma kaynakları nasıl değişti" gibi sorular
+# LMS'e gidilmeden yanıtlanır. Web ve worker aynı dosyayı (docker-compose'daki paylaşılan volume) kullanır.
+
+import datetime
+import functools
+import json
+import os
+import sqlite3
+import time
+from zoneinfo import ZoneInfo
+
+import config
+from cache import account_key
+from course_analyzer import CourseCounts
+from report_writer import SKILL_COLUMNS, level_sort_key
+from skill_classifier import classify_titles
+
+COUNT_FIELDS = tuple(CourseCounts.__dataclass_fields__)
+TIMEZONE = ZoneInfo("Europe/Istanbul")
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS runs ('
+    ' id INTEGER PRIMARY KEY, task_id TEXT NOT NULL UNIQUE, finished_at REAL NOT NULL,'
+    ' account TEXT NOT NULL, languages TEXT NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS doyk ('
+    ' language TEXT NOT NULL, level TEXT NOT NULL, skill TEXT NOT NULL, finished_at REAL NOT NULL,'
+    ' run_id INTEGER NOT NULL, count INTEGER NOT NULL,'
+    ' PRIMARY KEY (language, level, skill, finished_at, run_id)) WITHOUT ROWID',
+    'CREATE INDEX IF NOT EXISTS doyk_finished_at ON doyk (finished_at)',
+    'CREATE TABLE IF NOT EXISTS courses ('
+    ' language TEXT NOT NULL, level TEXT NOT NULL, url TEXT NOT NULL, finished_at REAL NOT NULL,'
+    ' run_id INTEGER NOT NULL, title TEXT NOT NULL, skill TEXT, total INTEGER NOT NULL, '
+    + ', '.join(f'{field} INTEGER' for field in COUNT_FIELDS) +
+    ', PRIMARY KEY (language, level, url, finished_at, run_id)) WITHOUT ROWID',
+    'CREATE INDEX IF NOT EXISTS courses_url ON courses (url, finished_at)',
+)
+
+
+def parse_time(value, end=False):
+    """
+    ISO tarih/zaman ('2026-09-01' ya da '2026-09-01T08:00:00+03:00') -> epoch saniye; boşsa None.
+    Saat dilimi yoksa Europe/Istanbul kabul edilir. end=True ise sadece tarih verilmişse günün sonu alınır.
+    Geçersiz değerde ValueError.
+    """
+    if not value:
+        return None
+    parsed = datetime.datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=TIMEZONE)
+    if end and len(value) == 10:
+        parsed += datetime.timedelta(days=1, microseconds=-1)
+    return parsed.timestamp()
+
+
+@functools.lru_cache(maxsize=4096)
+def format_time(timestamp):
+    # Bir çalıştırmanın tüm noktaları aynı zamanı taşır; dönüşüm çalıştırma başına bir kez yapılır
+    return datetime.datetime.fromtimestamp(timestamp, TIMEZONE).isoformat(timespec='seconds')
+
+
+def _sort_key(language, level_code, skill):
+    # Seviyeler A1 < A2 < B1 ..., beceriler rapordaki sırayla (D, O, Y, K)
+    return (language, level_sort_key(level_code),
+            SKILL_COLUMNS.index(skill) if skill in SKILL_COLUMNS else len(SKILL_COLUMNS))
+
+
+def _filters(since=None, until=None, **columns):
+    """Verilen (boş olmayan) sütun filtreleri (değer ya da değer listesi) ve zaman aralığı için WHERE parçası."""
+    clauses, params = [], []
+    for column, value in columns.items():
+        if not value:
+            continue
+        if isinstance(value, (list, tuple)):
+            clauses.append(f'{column} IN ({", ".join("?" * len(value))})')
+            params.extend(value)
+        else:
+            clauses.append(f'{column} = ?')
+            params.append(value)
+    if since is not None:
+        clauses.append('finished_at >= ?')
+        params.append(since)
+    if until is not None:
+        clauses.append('finished_at <= ?')
+        params.append(until)
+    return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+
+class HistoryStore:
+    """
+    DOYK zaman serisi. record() biten işin sonucunu ekler; series(), course_series() ve compare()
+    dil/seviye/beceri ve zaman aralığına göre sorgular. Zamanlar epoch saniye olarak saklanır,
+    dönüşte Europe/Istanbul ISO biçimindedir.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or config.HISTORY_PATH
+
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        # Worker yazarken web okumaya devam edebilsin
+        conn.execute('PRAGMA journal_mode=WAL')
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        return conn
+
+    def record(self, task_id, username, data, courses, languages=None, finished_at=None):
+        """
+        Biten işin özetini (data: {dil: {seviye: {'D','O','Y','K'}}}) ve kurs satırlarını
+        (courses: {dil: {seviye: [kurs, ...]}}) ekler. languages verilirse sadece bu diller eklenir
+        (başka anlık görüntülerden alınmış diller kendi işlerinde eklenmiştir). Aynı görev ID'si tekrar
+        eklenirse (sürdürülen görev) önceki noktaların yerini alır. Eklenen çalıştırmanın ID'sini döndürür.
+        """
+        finished_at = time.time() if finished_at is None else finished_at
+        languages = sorted(lang for lang in (data if languages is None else languages) if data.get(lang))
+
+        doyk_rows = []
+        course_rows = []
+        for lang in languages:
+            for level_code, counts in data[lang].items():
+                for skill in SKILL_COLUMNS:
+                    doyk_rows.append((lang, level_code, skill, finished_at, counts.get(skill, 0)))
+            for level_code, level_courses in (courses.get(lang) or {}).items():
+                level_courses = level_courses or []
+                skills = classify_titles([c.get('title', '') or '' for c in level_courses])
+                for c, skill in zip(level_courses, skills):
+                    counts = c.get('counts') or {}
+                    course_rows.append((lang, level_code, c.get('url') or '', finished_at, c.get('title', '') or '',
+                                        skill, int(c.get('total_resources_from_js', 0) or 0),
+                                        *(counts.get(field) for field in COUNT_FIELDS)))
+
+        conn = self._connect()
+        try:
+            with conn:
+                previous = conn.execute('SELECT id FROM runs WHERE task_id = ?', (task_id,)).fetchone()
+                if previous:
+                    conn.execute('DELETE FROM doyk WHERE run_id = ?', (previous['id'],))
+                    conn.execute('DELETE FROM courses WHERE run_id = ?', (previous['id'],))
+                    conn.execute('DELETE FROM runs WHERE id = ?', (previous['id'],))
+                run_id = conn.execute(
+                    'INSERT INTO runs (task_id, finished_at, account, languages) VALUES (?, ?, ?, ?)',
+                    (task_id, finished_at, account_key(username), json.dumps(languages, ensure_ascii=False)),
+                ).lastrowid
+                conn.executemany('INSERT OR REPLACE INTO doyk (language, level, skill, finished_at, run_id, count) '
+                                 'VALUES (?, ?, ?, ?, ?, ?)', [row[:4] + (run_id,) + row[4:] for row in doyk_rows])
+                conn.executemany(
+                    'INSERT OR REPLACE INTO courses (language, level, url, finished_at, run_id, title, skill, total, '
+                    + ', '.join(COUNT_FIELDS) + ') VALUES (' + ', '.join('?' * (8 + len(COUNT_FIELDS))) + ')',
+                    [row[:4] + (run_id,) + row[4:] for row in course_rows],
+                )
+        finally:
+            conn.close()
+        return run_id
+
+    def series(self, language=None, level=None, skill=None, since=None, until=None):
+        """
+        (dil, seviye, beceri) başına zaman sıralı noktalar:
+        [{'language', 'level', 'skill', 'points': [[iso_zaman, sayı], ...]}, ...]
+        """
+        where, params = _filters(since, until, language=language, level=level, skill=skill)
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT language, level, skill, finished_at, count FROM doyk' + where
+                                + ' ORDER BY language, level, skill, finished_at', params).fetchall()
+        finally:
+            conn.close()
+
+        result = []
+        for row in rows:
+            key = (row['language'], row['level'], row['skill'])
+            if not result or (result[-1]['language'], result[-1]['level'], result[-1]['skill']) != key:
+                result.append({'language': key[0], 'level': key[1], 'skill': key[2], 'points': []})
+            result[-1]['points'].append([format_time(row['finished_at']), row['count']])
+        result.sort(key=lambda s: _sort_key(s['language'], s['level'], s['skill']))
+        return result
+
+    def course_series(self, url=None, language=None, level=None, since=None, until=None):
+        """
+        Kurs başına zaman sıralı noktalar:
+        [{'language', 'level', 'url', 'title', 'skill', 'points': [[iso_zaman, toplam, {dağılım}], ...]}, ...]
+        Başlık ve beceri son noktadakidir.
+        """
+        where, params = _filters(since, until, url=url, language=language, level=level)
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT * FROM courses' + where + ' ORDER BY language, level, url, finished_at',
+                                params).fetchall()
+        finally:
+            conn.close()
+
+        result = []
+        for row in rows:
+            key = (row['language'], row['level'], row['url'])
+            if not result or (result[-1]['language'], result[-1]['level'], result[-1]['url']) != key:
+                result.append({'language': key[0], 'level': key[1], 'url': key[2], 'points': []})
+            result[-1].update(title=row['title'], skill=row['skill'])
+            counts = {field: row[field] for field in COUNT_FIELDS} if row[COUNT_FIELDS[0]] is not None else None
+            result[-1]['points'].append([format_time(row['finished_at']), row['total'], counts])
+        return result
+
+    def compare(self, start, end, language=None, level=None, skill=None):
+        """
+        İki an arasındaki değişim: her seri için start ve end anında (ya da öncesindeki son) değer.
+        Dönüş snapshots.diff_snapshots ile aynı biçimdedir (Excel'in karşılaştırma sayfaları aynen yazılır):
+        {'start', 'end', 'summary': [(dil, seviye, beceri, önceki, şimdiki), ...],
+         'courses': [(dil, seviye, başlık, url, önceki, şimdiki), ...]} (kurslarda sadece değişenler).
+        O an henüz noktası olmayan seri özette 0, kurs listesinde None sayılır.
+        """
+        conn = self._connect()
+        try:
+            summary = self._latest(conn, 'doyk', ('language', 'level', 'skill'), 'count', start, end,
+                                   language=language, level=level, skill=skill)
+            courses = self._latest(conn, 'courses', ('language', 'level', 'url'), 'total', start, end,
+                                   extra=('title',), language=language, level=level, skill=skill)
+        finally:
+            conn.close()
+
+        summary_rows = [(lang, level_code, skill_code, old or 0, new or 0)
+                        for (lang, level_code, skill_code), (old, new, _) in summary.items()]
+        summary_rows.sort(key=lambda r: _sort_key(*r[:3]))
+        course_rows = [(lang, level_code, extra['title'], url, old, new)
+                       for (lang, level_code, url), (old, new, extra) in courses.items() if old != new]
+        course_rows.sort(key=lambda r: (r[0], level_sort_key(r[1]), r[2]))
+        return {'start': format_time(start), 'end': format_time(end), 'summary': summary_rows, 'courses': course_rows}
+
+    @staticmethod
+    def _latest(conn, table, key_columns, value_column, start, end, extra=(), **filters):
+        """{anahtar: [start'taki değer, end'deki değer, {ek sütunlar}]}: her iki an için o ana kadarki son nokta."""
+        values = {}
+        keys = ', '.join(key_columns)
+        selected = ', '.join(key_columns + (value_column,) + tuple(extra))
+        for position, moment in enumerate((start, end)):
+            where, params = _filters(until=moment, **filters)
+            # SQLite'ta MAX() ile seçilen diğer sütunlar en büyük değerli satırdan gelir; gruplama birincil
+            # anahtar sırasında yapıldığından ayrıca sıralama gerekmez
+            rows = conn.execute(f'SELECT {selected}, MAX(finished_at) FROM {table}{where} GROUP BY {keys}',
+                                params).fetchall()
+            for row in rows:
+                key = tuple(row[c] for c in key_columns)
+                entry = values.setdefault(key, [None, None, {}])
+                entry[position] = row[value_column]
+                entry[2].update({c: row[c] for c in extra})
+        return values
@@ -0,0 +1,592 @@
+# http_scraper.py
+# Tarayıcısız UZEM motoru: giriş formunu doğrudan POST eder, sayfaları HTTP ile çekip Python'da ayrıştırır.
+
+import hashlib
+import re
+import threading
+import time
+from html.parser import HTMLParser
+from urllib.parse import parse_qs, urljoin, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+from cache import CourseCache
+from course_analyzer import VOID_TAGS, CourseCounts, analyze_course_contents
+from fetch_pool import bounded_map, fetch_with_retry
+from metrics import Tracer
+from pipeline import ParseStage, StageStats, get_process_pool
+from rate_control import get_limiter, limited_get, limited_request
+
+
+class UnsupportedPageError(Exception):
+    """HTTP motorunun işleyemediği sayfa (JS ile oluşturulan içerik, SSO vb.). Selenium'a düşülmeli."""
+
+
+# --- Basit DOM ---
+
+# Kapanış etiketi yazılmadan aynı etiketle kapanan elemanlar (<li>..<li>..)
+IMPLICIT_CLOSE_TAGS = {'li', 'p', 'option', 'tr', 'td', 'th', 'dt', 'dd'}
+RAW_TEXT_TAGS = {'script', 'style'}
+
+
+class Node:
+    __slots__ = ('tag', 'attrs', 'children', 'parent')
+
+    def __init__(self, tag, attrs=None, parent=None):
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.children = []
+        self.parent = parent
+
+    @property
+    def classes(self):
+        return (self.attrs.get('class') or '').split()
+
+    def has_class(self, cls):
+        return cls in self.classes
+
+    def iter(self):
+        """Kendisi hariç tüm alt elemanları belge sırasıyla dolaşır."""
+        stack = [c for c in reversed(self.children) if isinstance(c, Node)]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(c for c in reversed(node.children) if isinstance(c, Node))
+
+    def find_all(self, predicate):
+        return [n for n in self.iter() if predicate(n)]
+
+    def find(self, predicate):
+        for n in self.iter():
+            if predicate(n):
+                return n
+        return None
+
+    def text(self):
+        """textContent benzeri; boşlukları tek boşluğa indirger."""
+        parts = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                parts.append(node)
+            elif node.tag not in RAW_TEXT_TAGS:
+                stack.extend(reversed(node.children))
+        return ' '.join(''.join(parts).split())
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node('#document')
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        current = self.stack[-1]
+        if tag in IMPLICIT_CLOSE_TAGS and current.tag == tag:
+            self.stack.pop()
+            current = self.stack[-1]
+        node = Node(tag, {k: (v if v is not None else '') for k, v in attrs}, current)
+        current.children.append(node)
+        if tag not in VOID_TAGS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        current = self.stack[-1]
+        current.children.append(Node(tag, {k: (v if v is not None else '') for k, v in attrs}, current))
+
+    def handle_endtag(self, tag):
+        # Eşleşen açık etikete kadar kapat; eşleşme yoksa (bozuk HTML) yok say
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data):
+        self.stack[-1].children.append(data)
+
+
+def parse_html(html):
+    """HTML metnini basit bir Node ağacına çevirir."""
+    builder = _TreeBuilder()
+    builder.feed(html or '')
+    builder.close()
+    return builder.root
+
+
+# --- Sayfa ayrıştırıcıları ---
+
+def parse_login_form(html):
+    """Giriş formundaki gizli alanları döndürür; form yoksa None."""
+    doc = parse_html(html)
+    username_input = doc.find(lambda n: n.tag == 'input' and n.attrs.get('name') == 'username')
+    if username_input is None:
+        return None
+    form = username_input.parent
+    while form is not None and form.tag != 'form':
+        form = form.parent
+    scope = form or doc
+    fields = {}
+    for inp in scope.find_all(lambda n: n.tag == 'input' and n.attrs.get('type') == 'hidden'):
+        name = inp.attrs.get('name')
+        if name:
+            fields[name] = inp.attrs.get('value', '')
+    return {
+        'action': form.attrs.get('action') if form is not None else None,
+        'fields': fields,
+    }
+
+
+def parse_language_level_links(html, base_url):
+    """
+    Dashboard HTML'inden "Lisan Eğitim Portalı" sekmesindeki {dil: {seviye: url}} haritasını çıkarır.
+    Sekme veya kartlar sunucu tarafında basılmamışsa UnsupportedPageError fırlatır.
+    """
+    doc = parse_html(html)
+    tab = doc.find(lambda n: n.attrs.get('id') == 'activates-tab')
+    if tab is None:
+        raise UnsupportedPageError("Dashboard'da 'activates-tab' bulunamadı.")
+
+    pane_id = (tab.attrs.get('aria-controls')
+               or tab.attrs.get('data-bs-target', '').lstrip('#')
+               or tab.attrs.get('data-target', '').lstrip('#')
+               or tab.attrs.get('href', '').partition('#')[2])
+    pane = doc.find(lambda n: n.attrs.get('id') == pane_id) if pane_id else None
+    if pane is None:
+        raise UnsupportedPageError("'Lisan Eğitim Portalı' sekme içeriği HTML'de yok.")
+
+    faq_cards = pane.find_all(lambda n: n.has_class('faq-card'))
+    if not faq_cards:
+        raise UnsupportedPageError("'Lisan Eğitim Portalı' altında dil kartı bulunamadı.")
+
+    language_levels = {}
+    for card in faq_cards:
+        heading = card.find(lambda n: n.has_class('card-heading'))
+        lang_anchor = None
+        if heading is not None:
+            for span in heading.find_all(lambda n: n.tag == 'span'):
+                lang_anchor = span.find(lambda n: n.tag == 'a')
+                if lang_anchor is not None:
+                    break
+        if lang_anchor is None:
+            print("  Uyarı: Dil kartında başlık bulunamadı. Atlanıyor.")
+            continue
+        language_name = lang_anchor.text()
+        language_levels[language_name] = {}
+
+        body = card.find(lambda n: n.has_class('faq-card-body'))
+        items = body.find_all(lambda n: n.tag == 'li') if body is not None else []
+        if not items:
+            print(f"    Uyarı: '{language_name}' altında hiç seviye linki bulunamadı. Atlanıyor.")
+            continue
+        for item in items:
+            anchor = item.find(lambda n: n.tag == 'a')
+            if anchor is None:
+                continue
+            language_levels[language_name][anchor.text()] = urljoin(base_url, anchor.attrs.get('href', ''))
+    return language_levels
+
+
+def parse_course_cards(html, base_url):
+    """Seviye sayfasındaki kurs kartlarını [{'title', 'url'}] olarak döndürür."""
+    doc = parse_html(html)
+    containers = doc.find_all(lambda n: n.has_class('course-cards'))
+    if not containers:
+        # Kartlar Moodle'da çoğunlukla AJAX ile basılır; bu durumda tarayıcı gerekir.
+        raise UnsupportedPageError("Kurs kartları HTML'de yok (JS ile oluşturuluyor olabilir).")
+
+    info = []
+    for container in containers:
+        for card in container.find_all(lambda n: n.has_class('card-wrapper')):
+            a = card.find(lambda n: n.has_class('coursename'))
+            if a is not None and a.attrs.get('href'):
+                info.append({'title': a.text(), 'url': urljoin(base_url, a.attrs['href'])})
+    if not info:
+        # Kapsayıcı var ama kartlar boş: liste sonradan JS ile dolduruluyor
+        raise UnsupportedPageError("Kurs kartı kapsayıcısı boş (JS ile dolduruluyor olabilir).")
+    return info
+
+
+# Moodle sayfalarındaki oturum anahtarı: M.cfg içinde ya da gizli form alanında
+_SESSKEY_RE = re.compile(r'"sesskey"\s*:\s*"([A-Za-z0-9]+)"|name="sesskey"\s+value="([A-Za-z0-9]+)"')
+
+
+def parse_sesskey(html):
+    """Sayfadaki sesskey (AJAX servisi için gerekli); yoksa None."""
+    m = _SESSKEY_RE.search(html or '')
+    return (m.group(1) or m.group(2)) if m else None
+
+
+def course_id_from_url(url):
+    """course/view.php?id=N adresindeki kurs ID'si; yoksa None."""
+    value = parse_qs(urlsplit(url or '').query).get('id', [''])[0]
+    return int(value) if value.isdigit() else None
+
+
+def _ajax_error(error):
+    """Moodle AJAX hata nesnesinin kısa açıklaması."""
+    return error.get('errorcode') or error.get('message') or error.get('error') or 'bilinmeyen hata'
+
+
+# Oturuma özgü, her istekte değişen parçalar (hash'e girmemeli)
+_VOLATILE_RE = re.compile(r'sesskey["\']?\s*[:=]\s*["\']?[A-Za-z0-9]+|name="sesskey"\s+value="[^"]*"')
+
+
+def course_content_hash(html):
+    """
+    Kurs sayfasının sayımı etkileyen bölümünün (region-main) hash'i.
+    Üst menü, alt bilgi ve sesskey gibi istekten isteğe değişen parçalar dışarıda bırakılır.
+    """
+    html = html or ''
+    start = html.find('id="region-main"')
+    if start != -1:
+        end = html.find('<footer', start)
+        html = html[start:end if end != -1 else None]
+    return hashlib.sha256(_VOLATILE_RE.sub('', html).encode('utf-8')).hexdigest()
+
+
+# --- Motor ---
+
+class UzemHttpScraper:
+    """
+    UzemScraper ile aynı arayüze sahip (connect_driver, login, get_language_level_links,
+    scrape_doyk_content, close_driver) tarayıcısız motor.
+    """
+
+    def __init__(self, username, password, base_url=None):
+        self.username = username
+        self.password = password
+        self.base_url = (base_url or config.UZEM_BASE_URL).rstrip('/') + '/'
+        self.login_url = urljoin(self.base_url, 'login/index.php')
+        self.dashboard_url = self.base_url
+        self.session = None
+        self.course_cache = CourseCache() if config.COURSE_CACHE_ENABLED else None
+        self.cache_stats = {'hits': 0, 'misses': 0}
+        self.stage_stats = StageStats()
+        self.tracer = Tracer()
+        self.sesskey = None
+        self.ajax_enabled = config.MOODLE_AJAX_ENABLED
+        self._stats_lock = threading.Lock()
+
+    # Ortak arayüzde 'driver' kontrolü yapılan yerler için
+    @property
+    def driver(self):
+        return self.session
+
+    def connect_driver(self):
+        """Havuzlu bir HTTP oturumu açar."""
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=config.HTTP_POOL_SIZE, pool_maxsize=config.HTTP_POOL_SIZE)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) UzemDoykScraper',
+            'Accept': 'text/html,application/xhtml+xml',
+        })
+        return True
+
+    def _get(self, url, **kwargs):
+        kwargs.setdefault('timeout', config.HTTP_TIMEOUT)
+        return limited_get(self.session, url, **kwargs)
+
+    def _is_login_page(self, url):
+        return 'login/index.php' in (url or '')
+
+    def login(self):
+        """Giriş formunu (logintoken dahil) doğrudan POST eder."""
+        if not self.session:
+            print("Hata: HTTP oturumu başlatılmamış.")
+            return False
+
+        print(f"[HTTP] Giriş sayfası çekiliyor: {self.login_url}")
+        try:
+            r = self._get(self.login_url)
+            r.raise_for_status()
+            form = parse_login_form(r.text)
+            if form is None:
+                raise UnsupportedPageError("Giriş sayfasında kullanıcı adı alanı yok (SSO/JS olabilir).")
+
+            payload = dict(form['fields'])
+            payload.update({'username': self.username, 'password': self.password})
+            action = urljoin(r.url, form['action']) if form['action'] else self.login_url
+            r = self.session.post(action, data=payload, timeout=config.HTTP_TIMEOUT)
+            r.raise_for_status()
+        except requests.RequestException as e:
+            print(f"[HTTP] Giriş sırasında ağ hatası: {e}")
+            return False
+
+        if self._is_login_page(r.url):
+            print("Giriş başarısız oldu.")
+            return False
+
+        print(f"Giriş başarılı! Yönlendirilen URL: {r.url}")
+        self.dashboard_url = r.url
+        return True
+
+    def get_language_level_links(self):
+        """Dashboard HTML'inden dil/seviye linklerini çıkarır."""
+        if not self.session:
+            print("Hata: HTTP oturumu başlatılmamış veya giriş yapılmamış.")
+            return {}
+
+        print(f"[HTTP] Dashboard çekiliyor: {self.dashboard_url}")
+        r = self._get(self.dashboard_url)
+        r.raise_for_status()
+        if self._is_login_page(r.url):
+            raise UnsupportedPageError("Dashboard isteği giriş sayfasına yönlendirildi.")
+
+        language_levels = parse_language_level_links(r.text, r.url)
+        print(f"Toplam {len(language_levels)} adet dil kartı bulundu.")
+        return language_levels
+
+    def scrape_doyk_content(self, url):
+        """Seviye sayfasındaki kursları bulur ve her kurs sayfasındaki kaynakları Python'da sayar."""
+        if not self.session:
+            print("Hata: HTTP oturumu başlatılmamış.")
+            return None
+
+        print(f"\n[HTTP] Kurs listesi için sayfa çekiliyor: {url}")
+        with self.tracer.span('level_page', url=url) as span:
+            r = self._get(url)
+            r.raise_for_status()
+            span.set(bytes=len(r.content))
+            if self._is_login_page(r.url):
+                raise UnsupportedPageError("Seviye sayfası giriş sayfasına yönlendirildi.")
+
+            course_cards = parse_course_cards(r.text, r.url)
+            span.set(courses=len(course_cards))
+            self.sesskey = parse_sesskey(r.text) or self.sesskey
+        print(f"Toplam {len(course_cards)} kurs bulundu. HTTP ile sayılıyor...")
+        counted = self.fetch_course_counts_bulk(course_cards)
+
+        return [{
+            "title": c.get("title", ""),
+            "url": c.get("url"),
+            "total_resources_from_js": c.get("total", 0),
+            "counts": c.get("counts")
+        } for c in counted]
+
+    def fetch_course_counts_bulk(self, courses, concurrency=None):
+        """
+        Kursları sayar. AJAX servisi açıksa (config.MOODLE_AJAX_ENABLED) ve sesskey biliniyorsa içerikler
+        önce toplu istenir; servisten alınamayan kurslar kurs sayfası HTML'iyle sayılır.
+        courses: [{'title':..., 'url':...}, ...]
+        Dönüş (girdi sırasıyla): [{'title':..., 'url':..., 'total': int, 'counts': dict, 'attempts': int}, ...]
+        """
+        results = [None] * len(courses)
+        if self.ajax_enabled and self.sesskey:
+            results = self.fetch_course_counts_ajax(courses)
+        missing = [c for c, res in zip(courses, results) if res is None]
+        if missing:
+            fetched = iter(self.fetch_course_pages(missing, concurrency))
+            results = [res if res is not None else next(fetched) for res in results]
+        return results
+
+    def fetch_course_counts_ajax(self, courses):
+        """
+        Kurs içeriklerini Moodle AJAX servisinden (lib/ajax/service.php) core_course_get_contents çağrılarıyla
+        ister; config.MOODLE_AJAX_BATCH_SIZE kursluk her parti tek POST'tur. Modüller
+        course_analyzer.analyze_course_contents ile sayfadaki kurallara göre sayılır.
+        Dönüş girdi sırasıyla; servisten alınamayan kurslar için None. Servis bu oturumda hiç kullanılamıyorsa
+        (AJAX'a kapalı, sesskey geçersiz, JSON dışı yanıt) self.ajax_enabled kapatılır ve bir daha denenmez.
+        """
+        results = [None] * len(courses)
+        ids = [(i, course_id_from_url(c['url'])) for i, c in enumerate(courses)]
+        ids = [(i, course_id) for i, course_id in ids if course_id is not None]
+        size = max(1, config.MOODLE_AJAX_BATCH_SIZE)
+        parent = self.tracer.current()
+        for start in range(0, len(ids), size):
+            if not self.ajax_enabled:
+                break
+            self._fetch_ajax_batch(courses, ids[start:start + size], results, parent)
+        return results
+
+    def _fetch_ajax_batch(self, courses, batch, results, parent):
+        calls = [{'index': n, 'methodname': 'core_course_get_contents', 'args': {'courseid': course_id}}
+                 for n, (_, course_id) in enumerate(batch)]
+        url = urljoin(self.base_url, f'lib/ajax/service.php?sesskey={self.sesskey}&info=core_course_get_contents')
+        started = time.perf_counter()
+        with self.tracer.span('ajax_batch', parent=parent, courses=len(batch)) as span:
+            try:
+                r = limited_request(self.session, 'POST', url, json=calls, timeout=config.HTTP_TIMEOUT)
+            except requests.RequestException as e:
+                # Geçici ağ hatası: bu partinin kursları HTML ile çekilir
+                span.set(error=type(e).__name__)
+                print(f"[HTTP] AJAX isteği başarısız, kurs sayfalarına dönülüyor: {e}")
+                return
+            finally:
+                self.stage_stats.add('fetch', time.perf_counter() - started)
+            span.set(bytes=len(r.content), status=r.status_code)
+            if r.status_code == 429 or r.status_code >= 500:
+                return
+            try:
+                replies = r.json()
+            except ValueError:
+                replies = None
+            if r.status_code != 200 or not isinstance(replies, list) or len(replies) != len(batch):
+                # İstek bütünüyle reddedildi: {'error': ..., 'exception': ...} ya da HTML (giriş sayfası vb.)
+                self._disable_ajax(_ajax_error(replies) if isinstance(replies, dict) else f"HTTP {r.status_code}")
+                return
+
+            parse_started = time.perf_counter()
+            errors = []
+            for (i, _), reply in zip(batch, replies):
+                if not isinstance(reply, dict) or reply.get('error') or not isinstance(reply.get('data'), list):
+                    errors.append(_ajax_error(reply.get('exception') or reply) if isinstance(reply, dict) else reply)
+                    continue
+                counts = analyze_course_contents(reply['data'])
+                results[i] = {'title': courses[i].get('title') or '', 'url': courses[i]['url'],
+                              'total': counts.total, 'counts': counts.as_dict(), 'attempts': 1}
+            self.stage_stats.add('parse', time.perf_counter() - parse_started, len(batch) - len(errors))
+            if len(errors) == len(batch):
+                # Hiçbir çağrı yanıtlanmadı (ör. servis AJAX'a açık değil)
+                self._disable_ajax(errors[0])
+                return
+            span.set(errors=len(errors))
+
+        # İlerleme ve metrikler kurs başına span'lerle beslenir; parti süresi kurslara bölünür
+        share = span.seconds / len(batch)
+        for i, _ in batch:
+            if results[i] is not None:
+                self.tracer.record('course', share, parent=parent, title=results[i]['title'],
+                                   url=results[i]['url'], source='ajax')
+
+    def _disable_ajax(self, reason):
+        if self.ajax_enabled:
+            self.ajax_enabled = False
+            print(f"[HTTP] Moodle AJAX servisi kullanılamıyor ({reason}); kurs sayfaları HTML ile çekilecek.")
+
+    def fetch_course_pages(self, courses, concurrency=None):
+        """
+        Kurs sayfalarını sınırlı eşzamanlılıkla çeker ve sayar. Hız denetimi açıksa aynı anda havadaki istek
+        sayısını host'un uyarlanabilir sınırı (rate_control) belirler; kapalıysa config.COURSE_FETCH_CONCURRENCY.
+        Önbellekte kaydı olan sayfalar koşullu istenir; 304 dönerse ya da ilgili bölümün hash'i
+        değişmemişse sayfa yeniden ayrıştırılmaz (self.cache_stats'a isabet olarak yazılır).
+        Çekme thread'leri ham HTML'i pipeline.ParseStage'e verip sıradaki sayfaya geçer; sayım
+        (course_analyzer) işlem havuzunda yapılır. Aşama süreleri self.stage_stats'a, sayfa başına
+        'course' (ve altında 'parse') span'leri self.tracer'a yazılır.
+        courses: [{'title':..., 'url':...}, ...]
+        Dönüş (girdi sırasıyla): [{'title':..., 'url':..., 'total': int, 'counts': dict, 'attempts': int}, ...]
+        """
+        stage = ParseStage(self.stage_stats, get_process_pool())
+        # Çekme thread'leri span'lerini çağıranın açık span'ine (seviye sayfası) bağlar
+        parent = self.tracer.current()
+
+        def fetch_one(it):
+            with self.tracer.span('course', parent=parent, title=it.get('title') or '', url=it['url']) as span:
+                return fetch_course(it, span)
+
+        def fetch_course(it, span):
+            title, url = it.get('title') or '', it['url']
+            cached = self.course_cache.get(url) if self.course_cache else None
+            headers = {}
+            if cached and cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached and cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+            started = time.perf_counter()
+            try:
+                r, attempts = fetch_with_retry(self.session, url, headers=headers or None)
+            except requests.RequestException as e:
+                attempts = getattr(e, 'attempts', 1)
+                span.set(retries=attempts - 1, error=type(e).__name__)
+                return {'title': title, 'url': url, 'total': 0, 'counts': None,
+                        'attempts': attempts, 'error': str(e)}
+            finally:
+                self.stage_stats.add('fetch', time.perf_counter() - started)
+            span.set(retries=attempts - 1, bytes=len(r.content), status=r.status_code)
+            if self._is_login_page(r.url):
+                raise UnsupportedPageError("Kurs sayfası giriş sayfasına yönlendirildi.")
+
+            if cached and r.status_code == 304:
+                self._count_cache(hit=True)
+                span.set(cached=True)
+                return {'title': title, 'url': url, 'total': cached['total'],
+                        'counts': cached.get('counts'), 'attempts': attempts}
+
+            entry = {
+                'etag': r.headers.get('ETag'),
+                'last_modified': r.headers.get('Last-Modified'),
+                'hash': course_content_hash(r.text),
+            }
+            # Dağılımı olmayan eski önbellek kayıtları yeniden sayılır
+            if cached and cached.get('hash') == entry['hash'] and cached.get('counts'):
+                self._count_cache(hit=True)
+                span.set(cached=True)
+                self._store_counts(url, entry, cached['counts'])
+                return {'title': title, 'url': url, 'total': cached['total'],
+                        'counts': cached['counts'], 'attempts': attempts}
+
+            self._count_cache(hit=False)
+            return {'title': title, 'url': url, 'attempts': attempts,
+                    '_entry': entry, '_pending': stage.submit(r.text, span)}
+
+        # Thread sayısı sınırın çıkabileceği en yüksek değerdir; fazlası limiter'da bekler
+        limiter = get_limiter(self.base_url)
+        workers = concurrency or (int(limiter.max_limit) if limiter else config.COURSE_FETCH_CONCURRENCY)
+        results = bounded_map(fetch_one, courses, workers)
+
+        # Birleştirme: ayrıştırması süren sayfaların sonuçlarını sırayla topla
+        for res in results:
+            pending = res.pop('_pending', None)
+            if pending is None:
+                continue
+            counts = pending.result()
+            res['total'] = CourseCounts(**counts).total
+            res['counts'] = counts
+            self._store_counts(res['url'], res.pop('_entry'), counts)
+        return results
+
+    def _store_counts(self, url, entry, counts):
+        if self.course_cache:
+            self.course_cache.set(url, dict(entry, total=CourseCounts(**counts).total, counts=counts))
+
+    def _count_cache(self, hit):
+        with self._stats_lock:
+            self.cache_stats['hits' if hit else 'misses'] += 1
+
+    def export_cookies(self):
+        """Oturum çerezlerini Selenium'un add_cookie formatında döndürür."""
+        if not self.session:
+            return []
+        return [{
+            'name': c.name,
+            'value': c.value,
+            'domain': c.domain,
+            'path': c.path or '/',
+            'secure': bool(c.secure),
+        } for c in self.session.cookies]
+
+    def import_cookies(self, cookies):
+        """Başka bir motordan (ör. Selenium) alınmış çerezleri oturuma yükler."""
+        for c in cookies or []:
+            self.session.cookies.set(c['name'], c['value'], domain=c.get('domain'), path=c.get('path', '/'))
+
+    def restore_session(self, cookies, dashboard_url):
+        """
+        Önbellekteki çerezleri yükler ve oturumun hâlâ geçerli olduğunu ucuzca doğrular:
+        dashboard isteği yönlendirmesiz yapılır, gövde okunmaz.
+        """
+        if not self.session:
+            return False
+        self.import_cookies(cookies)
+        try:
+            r = self.session.get(dashboard_url, allow_redirects=False, stream=True, timeout=config.HTTP_TIMEOUT)
+            r.close()
+        except requests.RequestException as e:
+            print(f"[HTTP] Önbellekteki oturum doğrulanamadı: {e}")
+            return False
+        if r.status_code != 200 or self._is_login_page(r.headers.get('Location')):
+            self.session.cookies.clear()
+            return False
+        self.dashboard_url = dashboard_url
+        return True
+
+    def close_driver(self):
+        """HTTP oturumunu kapatır."""
+        if self.session:
+            print("HTTP oturumu kapatılıyor.")
+            self.session.close()
+            self.session = None
@@ -0,0 +1,276 @@
+# metrics.py
+# Görev içi hiyerarşik zamanlama (span'ler) ve görevler arası toplam metrikler.
+# Tracer görev başına tutulur; görev bitince özeti sonuca eklenir ve sayaçlar Redis'e yazılır.
+# Web süreci /metrics endpoint'inde bu sayaçları Prometheus metin biçiminde sunar.
+
+import threading
+import time
+
+import redis
+
+import config
+from cache import get_redis
+
+# Prometheus histogram sınırları (saniye)
+COURSE_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+JOB_BUCKETS = (10, 30, 60, 120, 300, 600, 1200, 3600)
+
+
+class Span:
+    """
+    Tek bir ölçüm: ad, üst span, süre ve öznitelikler (bytes, retries, url, ...).
+    `with tracer.span(...) as span:` ile ya da start()/end() ile kullanılır.
+    """
+
+    __slots__ = ('tracer', 'name', 'id', 'parent_id', 'attrs', 'started', 'seconds')
+
+    def __init__(self, tracer, name, span_id, parent_id, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.id = span_id
+        self.parent_id = parent_id
+        self.attrs = attrs
+        self.started = None
+        self.seconds = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+        return self
+
+    def add(self, key, amount=1):
+        self.attrs[key] = self.attrs.get(key, 0) + amount
+        return self
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.tracer._push(self)
+        return self
+
+    def end(self):
+        if self.seconds is None:
+            self.seconds = time.perf_counter() - self.started
+            self.tracer._pop(self)
+            self.tracer._finish(self)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs.setdefault('error', exc_type.__name__)
+        self.end()
+        return False
+
+
+class Tracer:
+    """
+    Görev boyunca açılan span'leri toplar. Üst span verilmezse aynı thread'de açık olan son span
+    kullanılır; iş başka thread'e dağıtılırken üst span açıkça (parent=) verilmelidir.
+    on_end(span) her span kapandığında (kapanan thread'de) çağrılır; ilerleme hesabı buradan beslenir.
+    """
+
+    def __init__(self, on_end=None):
+        self.on_end = on_end
+        self.spans = []
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def span(self, name, parent=None, **attrs):
+        """Henüz başlamamış bir span döndürür (with ile ya da start() ile başlatılır)."""
+        if parent is None:
+            parent = self.current()
+        with self._lock:
+            self._next_id += 1
+            span_id = self._next_id
+        return Span(self, name, span_id, parent.id if parent is not None else None, attrs)
+
+    def start(self, name, parent=None, **attrs):
+        return self.span(name, parent, **attrs).start()
+
+    def record(self, name, seconds, parent=None, **attrs):
+        """Süresi başka yerde ölçülmüş (ör. tarayıcıda, alt süreçte) bir span'i ekler."""
+        span = self.span(name, parent, **attrs)
+        span.seconds = seconds
+        self._finish(span)
+        return span
+
+    def current(self):
+        stack = getattr(self._local, 'stack', None)
+        return stack[-1] if stack else None
+
+    def _push(self, span):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        self._local.stack.append(span)
+
+    def _pop(self, span):
+        stack = getattr(self._local, 'stack', None)
+        if stack and span in stack:
+            stack.remove(span)
+
+    def _finish(self, span):
+        with self._lock:
+            self.spans.append(span)
+        if self.on_end:
+            try:
+                self.on_end(span)
+            except Exception as e:
+                print(f"Span geri çağrısı başarısız: {e}")
+
+    def summary(self):
+        """Span adı başına {'count', 'seconds', 'max_seconds', 'bytes', 'retries', 'errors'}."""
+        out = {}
+        with self._lock:
+            spans = list(self.spans)
+        for s in spans:
+            e = out.setdefault(s.name, {'count': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                                        'bytes': 0, 'retries': 0, 'errors': 0})
+            e['count'] += 1
+            e['seconds'] += s.seconds
+            e['max_seconds'] = max(e['max_seconds'], s.seconds)
+            e['bytes'] += s.attrs.get('bytes', 0) or 0
+            e['retries'] += s.attrs.get('retries', 0) or 0
+            e['errors'] += 1 if s.attrs.get('error') else 0
+        for e in out.values():
+            e['seconds'] = round(e['seconds'], 3)
+            e['max_seconds'] = round(e['max_seconds'], 3)
+        return out
+
+    def slowest_courses(self, n=None):
+        """En uzun süren n kurs: [{'title', 'url', 'seconds', 'parse_seconds', 'bytes', 'retries'}, ...]."""
+        n = config.METRICS_SLOWEST_COURSES if n is None else n
+        with self._lock:
+            spans = list(self.spans)
+        parse = {}
+        for s in spans:
+            if s.name == 'parse' and s.parent_id is not None:
+                parse[s.parent_id] = parse.get(s.parent_id, 0.0) + s.seconds
+        courses = [s for s in spans if s.name == 'course']
+        courses.sort(key=lambda s: s.seconds + parse.get(s.id, 0.0), reverse=True)
+        return [{
+            'title': s.attrs.get('title', ''),
+            'url': s.attrs.get('url'),
+            'seconds': round(s.seconds, 3),
+            'parse_seconds': round(parse.get(s.id, 0.0), 3),
+            'bytes': s.attrs.get('bytes', 0),
+            'retries': s.attrs.get('retries', 0),
+            'cached': bool(s.attrs.get('cached')),
+            'error': s.attrs.get('error'),
+        } for s in courses[:n]]
+
+    def durations(self, name):
+        with self._lock:
+            return [s.seconds for s in self.spans if s.name == name]
+
+
+def _bucket(value, buckets):
+    for le in buckets:
+        if value <= le:
+            return str(le)
+    return '+Inf'
+
+
+class MetricsStore:
+    """
+    Görevler arası sayaçlar (Redis hash'i). Worker her görevin sonunda record_job() ile ekler,
+    web süreci render() ile Prometheus metin biçiminde okur. Redis'e ulaşılamazsa metrik yazılmaz; iş durmaz.
+    """
+
+    key = 'uzem:metrics'
+
+    def __init__(self, client=None):
+        self.client = client or get_redis()
+
+    def record_job(self, tracer, status, seconds, course_cache=None):
+        fields = {}
+
+        def inc(field, amount=1):
+            fields[field] = fields.get(field, 0) + amount
+
+        inc(f'jobs_total|{status}')
+        inc(f'job_seconds_bucket|{_bucket(seconds, JOB_BUCKETS)}')
+        inc('job_seconds_sum', seconds)
+        inc('job_seconds_count')
+        for name, e in tracer.summary().items():
+            inc(f'span_seconds_sum|{name}', e['seconds'])
+            inc(f'span_seconds_count|{name}', e['count'])
+            inc(f'span_bytes_total|{name}', e['bytes'])
+            inc(f'span_retries_total|{name}', e['retries'])
+            inc(f'span_errors_total|{name}', e['errors'])
+        for value in tracer.durations('course'):
+            inc(f'course_seconds_bucket|{_bucket(value, COURSE_BUCKETS)}')
+            inc('course_seconds_sum', value)
+            inc('course_seconds_count')
+        for result, amount in (course_cache or {}).items():
+            inc(f'course_cache_total|{result}', amount)
+
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for field, amount in fields.items():
+                pipe.hincrbyfloat(self.key, field, amount)
+            pipe.execute()
+        except redis.RedisError as e:
+            print(f"Metrikler yazılamadı: {e}")
+
+    def load(self):
+        try:
+            raw = self.client.hgetall(self.key)
+        except redis.RedisError as e:
+            print(f"Metrikler okunamadı: {e}")
+            return {}
+        return {k.decode('utf-8'): float(v) for k, v in raw.items()}
+
+    def render(self):
+        """Prometheus text exposition biçimi (0.0.4)."""
+        values = self.load()
+        by_metric = {}
+        for field, value in values.items():
+            metric, _, label = field.partition('|')
+            by_metric.setdefault(metric, {})[label] = value
+
+        lines = []
+
+        def counter(metric, help_text, label_name):
+            name = f'uzem_{metric}'
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} counter')
+            for label, value in sorted(by_metric.get(metric, {}).items()):
+                lines.append(f'{name}{{{label_name}="{_escape(label)}"}} {_num(value)}')
+
+        def histogram(metric, help_text, buckets):
+            name = f'uzem_{metric}'
+            counts = by_metric.get(f'{metric}_bucket', {})
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            cumulative = 0.0
+            for le in [str(b) for b in buckets] + ['+Inf']:
+                cumulative += counts.get(le, 0.0)
+                lines.append(f'{name}_bucket{{le="{le}"}} {_num(cumulative)}')
+            lines.append(f'{name}_sum {_num(by_metric.get(f"{metric}_sum", {}).get("", 0.0))}')
+            lines.append(f'{name}_count {_num(by_metric.get(f"{metric}_count", {}).get("", 0.0))}')
+
+        counter('jobs_total', 'Biten kazıma görevleri (duruma göre).', 'status')
+        histogram('job_seconds', 'Kazıma görevi süresi (saniye).', JOB_BUCKETS)
+        histogram('course_seconds', 'Kurs sayfası çekme süresi (saniye).', COURSE_BUCKETS)
+        counter('course_cache_total', 'Kurs önbelleği isabet/ıska sayısı.', 'result')
+
+        name = 'uzem_span_seconds'
+        lines.append(f'# HELP {name} Aşama (span) süreleri; thread\'lerin toplamıdır.')
+        lines.append(f'# TYPE {name} summary')
+        for label, value in sorted(by_metric.get('span_seconds_sum', {}).items()):
+            lines.append(f'{name}_sum{{span="{_escape(label)}"}} {_num(value)}')
+            count = by_metric.get('span_seconds_count', {}).get(label, 0.0)
+            lines.append(f'{name}_count{{span="{_escape(label)}"}} {_num(count)}')
+        counter('span_bytes_total', 'Aşamada indirilen bayt.', 'span')
+        counter('span_retries_total', 'Aşamadaki yeniden deneme sayısı.', 'span')
+        counter('span_errors_total', 'Hatayla biten span sayısı.', 'span')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _num(value):
+    return str(int(value)) if float(value).is_integer() else repr(round(value, 6))
@@ -0,0 +1,172 @@
+# pipeline.py
+# Kurs sayımı için aşamalı hat: ağ (thread'ler) -> sınırlı ayrıştırma kuyruğu -> işlem havuzu -> birleştirme.
+# Worker gevent ile çalıştığından CPU işi (HTML ayrıştırma, Excel yazımı) olay döngüsünü kilitlemesin diye
+# ayrı süreçlerde yapılır; ağ bekleyen greenlet'ler bu sırada çalışmaya devam eder.
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import config
+from course_analyzer import analyze_course_html
+from skill_classifier import classify_titles
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool():
+    """
+    Worker süreci başına tek, tembel oluşturulan işlem havuzu (config.PARSE_PROCESSES).
+    0 verilirse None döner ve işler çağıran thread'de yapılır.
+    Alt süreçler 'spawn' ile başlatılır: gevent yamalı ana süreç fork edilmez.
+    """
+    global _pool
+    if config.PARSE_PROCESSES <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=config.PARSE_PROCESSES,
+                                        mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def shutdown_process_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+class StageStats:
+    """Aşama başına toplam süre ve iş sayısı; birden fazla thread'den güvenle güncellenir."""
+
+    def __init__(self):
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds, items=1):
+        with self._lock:
+            entry = self.stages.setdefault(stage, {'seconds': 0.0, 'items': 0})
+            entry['seconds'] += seconds
+            entry['items'] += items
+
+    def merge(self, other):
+        for stage, entry in other.as_dict().items():
+            self.add(stage, entry['seconds'], entry['items'])
+
+    def as_dict(self):
+        with self._lock:
+            return {stage: {'seconds': round(e['seconds'], 3), 'items': e['items']} for stage, e in self.stages.items()}
+
+    def summary(self):
+        """'fetch 12.31s/40, parse 3.02s/38, ...' biçiminde tek satırlık özet."""
+        return ', '.join(f"{stage} {e['seconds']:.2f}s/{e['items']}" for stage, e in self.as_dict().items())
+
+
+def _parse_page(html):
+    # Alt süreçte çalışır; süre de burada ölçülür (kuyrukta bekleme hariç)
+    start = time.perf_counter()
+    counts = analyze_course_html(html)
+    return counts.as_dict(), time.perf_counter() - start
+
+
+def _run_timed(func, args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+class ParseStage:
+    """
+    Ham kurs HTML'ini işlem havuzunda sayan aşama. Aynı anda en fazla `queue_size` sayfa
+    kuyrukta/işlemde olabilir; dolunca submit() bekler (geri basınç) ve ağ aşaması yavaşlar,
+    böylece bellekteki ham HTML miktarı sınırlı kalır.
+    """
+
+    def __init__(self, stats, pool=None, queue_size=None):
+        self.stats = stats
+        self.pool = pool
+        self._slots = threading.BoundedSemaphore(queue_size or config.PARSE_QUEUE_SIZE)
+
+    def submit(self, html, span=None):
+        """
+        Sayımı başlatır; sonucu (CourseCounts sözlüğü) veren bir Future döndürür.
+        span verilirse ayrıştırma süresi onun altına 'parse' span'i olarak eklenir.
+        """
+        waited = time.perf_counter()
+        self._slots.acquire()
+        self.stats.add('queue_wait', time.perf_counter() - waited)
+
+        if self.pool is None:
+            future = Future()
+            try:
+                counts, seconds = _parse_page(html)
+                self._record(seconds, span)
+                future.set_result(counts)
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                self._slots.release()
+            return future
+
+        result = Future()
+
+        def done(f):
+            self._slots.release()
+            try:
+                counts, seconds = f.result()
+            except Exception as e:
+                result.set_exception(e)
+                return
+            self._record(seconds, span)
+            result.set_result(counts)
+
+        self.pool.submit(_parse_page, html).add_done_callback(done)
+        return result
+
+    def _record(self, seconds, span):
+        self.stats.add('parse', seconds)
+        if span is not None:
+            span.tracer.record('parse', seconds, parent=span)
+
+
+def run_cpu(stats, stage, func, *args):
+    """func(*args)'ı işlem havuzunda (yoksa yerinde) çalıştırıp süresini `stage` altında kaydeder."""
+    pool = get_process_pool()
+    if pool is None:
+        result, seconds = _run_timed(func, args)
+    else:
+        result, seconds = pool.submit(_run_timed, func, args).result()
+    stats.add(stage, seconds)
+    return result
+
+
+def aggregate_doyk(all_scraped_courses, stats=None, on_unmatched=None):
+    """
+    {dil: {seviye: [kurs, ...]}} -> {dil: {seviye: {'D','O','Y','K'}}}.
+    Aynı seviyede aynı beceriye birden fazla kurs varsa toplamları eklenir.
+    Beceri eşleşmeyen kurslar için on_unmatched(dil, seviye, başlık, toplam) çağrılır.
+    """
+    start = time.perf_counter()
+    grouped = {}
+    for lang, levels_dict in all_scraped_courses.items():
+        lang_block = {}
+        for level_code, courses_list in levels_dict.items():
+            doyk_counts = {'D': 0, 'O': 0, 'Y': 0, 'K': 0}
+            courses_list = courses_list or []
+            skills = classify_titles([c.get('title', '') or '' for c in courses_list])
+            for c, skill in zip(courses_list, skills):
+                total = int(c.get('total_resources_from_js', 0) or 0)
+                if skill:
+                    doyk_counts[skill] += total
+                elif on_unmatched:
+                    on_unmatched(lang, level_code, c.get('title', '') or '', total)
+            lang_block[level_code] = doyk_counts
+        if lang_block:
+            grouped[lang] = lang_block
+    if stats is not None:
+        stats.add('aggregate', time.perf_counter() - start, sum(len(v) for v in all_scraped_courses.values()))
+    return grouped
@@ -0,0 +1,129 @@
+# progress.py
+# Celery görev ilerlemesini tamponlayarak backend'e yazar: her log satırı için ayrı Redis yazımı ve bekleme yok.
+
+import threading
+import time
+
+import config
+from task_events import publish_events
+
+
+class ProgressReporter:
+    """
+    İlerleme yüzdesi ve log satırlarını biriktirir; backend'e (update_state) en fazla
+    `min_interval` saniyede bir ya da `max_pending` satır biriktiğinde yazar.
+    Faz geçişlerinde ve iş sonunda flush() ile bekleyen her şey hemen yazılır.
+
+    meta: {'progress': int, 'log_message': son satır, 'logs': tüm satırlar}
+    'logs' her yazımda baştan gönderilir; arayüz kaldığı sıradan devam ederek hiçbir satırı kaçırmaz.
+    Aynı satırlar task_events üzerinden SSE dinleyicilerine de yayınlanır (olay ID'si = satır sırası).
+    """
+
+    def __init__(self, task, task_id, min_interval=None, max_pending=None):
+        self.task = task
+        self.task_id = task_id
+        self.min_interval = config.PROGRESS_FLUSH_INTERVAL if min_interval is None else min_interval
+        self.max_pending = config.PROGRESS_FLUSH_LINES if max_pending is None else max_pending
+        self.progress = 0
+        self.logs = []
+        self._pending = 0
+        self._published = 0
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+    def update(self, progress, message, flush=False):
+        """İlerlemeyi günceller ve mesajı log'a ekler; flush=True ise hemen yazar."""
+        with self._lock:
+            if progress is not None:
+                self.progress = progress
+            if message:
+                self.logs.append(message)
+                self._pending += 1
+            due = (flush
+                   or self._pending >= self.max_pending
+                   or time.monotonic() - self._last_flush >= self.min_interval)
+            if due:
+                self._write()
+
+    def flush(self):
+        with self._lock:
+            if self._pending or not self._last_flush:
+                self._write()
+
+    def finish(self, state, message=None):
+        """Bekleyenleri yazar ve dinleyicilere işin bittiğini bildirir."""
+        with self._lock:
+            if self._pending:
+                self._write()
+            self._publish_new([{'type': 'end', 'state': state, 'progress': self.progress, 'message': message or ''}])
+
+    def meta(self):
+        return {
+            'progress': self.progress,
+            'log_message': self.logs[-1] if self.logs else '',
+            'logs': list(self.logs),
+        }
+
+    def _write(self):
+        self.task.update_state(task_id=self.task_id, state='PROGRESS', meta=self.meta())
+        self._publish_new([])
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def _publish_new(self, extra):
+        events = [{'type': 'log', 'progress': self.progress, 'message': m} for m in self.logs[self._published:]]
+        self._published = len(self.logs)
+        publish_events(self.task_id, events + extra)
+
+
+class WorkProgress:
+    """
+    Yüzdeyi sabit adımlar yerine biten iş birimlerinden hesaplar: her seviye sayfası bir birim,
+    her kurs sayfası bir birim. Kurs sayısı seviye sayfası işlendikçe öğrenilir; henüz açılmamış
+    seviyeler için o ana kadarki seviye başına ortalama kurs sayısı tahmin olarak kullanılır.
+    Dönen yüzde [start, end] aralığındadır ve hiç geri gitmez.
+    """
+
+    def __init__(self, levels, start, end):
+        self.levels = levels
+        self.start = start
+        self.end = end
+        self._discovered = {}
+        self._pages_done = 0
+        self._courses_done = 0
+        self._fraction = 0.0
+        self._lock = threading.Lock()
+
+    def level_discovered(self, level_key, courses):
+        """Seviye sayfası işlendi; `courses` kurs çekilecek. Aynı seviye tekrar bildirilirse üzerine yazılır."""
+        with self._lock:
+            if level_key not in self._discovered:
+                self._pages_done += 1
+            self._discovered[level_key] = courses
+            return self._percent()
+
+    def level_finished(self, level_key):
+        """Seviye bitti; sayfası hiç işlenemediyse (hata, boş sayfa) kursu yok sayılır."""
+        with self._lock:
+            if level_key not in self._discovered:
+                self._pages_done += 1
+                self._discovered[level_key] = 0
+            return self._percent()
+
+    def course_done(self, count=1):
+        with self._lock:
+            self._courses_done += count
+            return self._percent()
+
+    def percent(self):
+        with self._lock:
+            return self._percent()
+
+    def _percent(self):
+        known = sum(self._discovered.values())
+        pending_levels = max(0, self.levels - len(self._discovered))
+        average = known / len(self._discovered) if self._discovered else 0
+        expected = self.levels + known + pending_levels * average
+        if expected:
+            self._fraction = max(self._fraction, min(1.0, (self._pages_done + self._courses_done) / expected))
+        return self.start + int((self.end - self.start) * self._fraction)
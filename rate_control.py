@@ -0,0 +1,280 @@
+# rate_control.py
+# LMS'e giden istekler için uyarlanabilir eşzamanlılık sınırı (AIMD).
+# Sunucu sağlıklı yanıt verdikçe aynı anda havadaki istek sayısı yavaşça artırılır; 429/503, ağ hatası
+# ya da belirgin gecikme artışında yarıya indirilir, Retry-After verilmişse o süre hiç istek atılmaz.
+# Sınırlayıcı host başınadır ve süreçteki tüm görevlerin istekleri tarafından paylaşılır;
+# RATE_SHARED açıksa sınır Redis üzerinden worker'lar arasında da paylaşılır.
+
+import email.utils
+import os
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+import redis
+
+import config
+from cache import get_redis
+
+# Bu yanıtlar sunucunun yavaşlamamızı istediği anlamına gelir
+THROTTLE_STATUS = {429, 503}
+
+
+def parse_retry_after(value):
+    """Retry-After başlığını (saniye ya da HTTP tarihi) saniyeye çevirir; geçersizse None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            seconds = email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return max(0.0, min(seconds, config.RATE_MAX_RETRY_AFTER))
+
+
+def host_limits(host):
+    """config'teki genel sınırlar + RATE_LIMITS_BY_HOST'taki host'a özgü değerler."""
+    limits = {
+        'initial': config.RATE_LIMIT_INITIAL,
+        'min': config.RATE_LIMIT_MIN,
+        'max': config.RATE_LIMIT_MAX,
+    }
+    limits.update(config.RATE_LIMITS_BY_HOST.get(host, {}))
+    return limits
+
+
+class AdaptiveLimiter:
+    """
+    Toplamsal artış / çarpımsal azalış (AIMD) ile ayarlanan eşzamanlılık sınırı.
+
+    acquire() yer açılana (ve varsa Retry-After süresi dolana) kadar bekler; her istekten sonra
+    release(saniye, durum_kodu, retry_after) çağrılmalıdır (ağ hatasında durum_kodu=None, error=True).
+    Başarılı yanıtta sınır 1/sınır kadar artar (tur başına ~+1); yavaşlatma yanıtında, hatada ya da kısa
+    vadeli gecikme ortalaması taban gecikmenin `latency_tolerance` katını aştığında `backoff` ile çarpılır.
+    Ardışık hatalar sınırı bir anda sıfıra indirmesin diye azalış en fazla gecikme süresi başına bir kez yapılır.
+    shared (SharedRateState) verilirse `limit` host'a giden toplam sınırdır ve etkin süreçler arasında bölünür.
+    """
+
+    def __init__(self, host, initial=None, min_limit=None, max_limit=None, shared=None):
+        limits = host_limits(host)
+        self.host = host
+        self.min_limit = float(limits['min'] if min_limit is None else min_limit)
+        self.max_limit = float(limits['max'] if max_limit is None else max_limit)
+        self.limit = min(self.max_limit, max(self.min_limit, float(limits['initial'] if initial is None else initial)))
+        self.backoff = config.RATE_BACKOFF_FACTOR
+        self.latency_tolerance = config.RATE_LATENCY_TOLERANCE
+        self.shared = shared
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._baseline = None
+        self._recent = None
+        self._last_decrease = 0.0
+        self._members = 1
+        self._delta = 0.0
+        self._last_sync = 0.0
+        self._cond = threading.Condition()
+        self.stats = {'requests': 0, 'throttled': 0, 'errors': 0, 'decreases': 0,
+                      'max_limit_reached': self.limit, 'wait_seconds': 0.0}
+
+    def capacity(self):
+        """Bu sürecin aynı anda atabileceği istek sayısı (paylaşımlıysa genel sınırın payı)."""
+        return max(1, int(max(self.min_limit, self.limit / self._members)))
+
+    def acquire(self):
+        started = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    self._cond.wait(self.paused_until - now)
+                elif self.in_flight >= self.capacity():
+                    # Başka süreçlerdeki azalışlar da görülsün diye ara ara uyanılır
+                    self._cond.wait(1.0)
+                else:
+                    break
+                self._maybe_sync()
+            self.in_flight += 1
+            self.stats['wait_seconds'] += time.monotonic() - started
+
+    def release(self, seconds, status=None, retry_after=None, error=False):
+        with self._cond:
+            self.in_flight -= 1
+            self._observe(seconds, status, retry_after, error)
+
+    def observe(self, seconds, status=None, retry_after=None, error=False):
+        """acquire() ile alınmamış (ör. tarayıcıda atılmış) bir isteğin sonucunu sınıra yansıtır."""
+        with self._cond:
+            self._observe(seconds, status, retry_after, error)
+
+    def _observe(self, seconds, status, retry_after, error):
+        # Kilit altında çağrılır
+        self.stats['requests'] += 1
+        now = time.monotonic()
+        throttled = status in THROTTLE_STATUS
+        if throttled:
+            self.stats['throttled'] += 1
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+        if error:
+            self.stats['errors'] += 1
+
+        if throttled or error:
+            self._decrease(now)
+        else:
+            self._observe_latency(seconds)
+            if self._latency_degraded():
+                self._decrease(now)
+            else:
+                self._increase(1.0 / self.limit)
+        self._maybe_sync(force=throttled)
+        self._cond.notify_all()
+
+    def _observe_latency(self, seconds):
+        self._recent = seconds if self._recent is None else 0.7 * self._recent + 0.3 * seconds
+        if self._baseline is None:
+            self._baseline = seconds
+        elif not self._latency_degraded():
+            # Taban yalnızca sağlıklı dönemde ve yavaş güncellenir; daha hızlı yanıtlar tabanı hemen indirir
+            self._baseline = min(seconds, 0.95 * self._baseline + 0.05 * seconds)
+
+    def _latency_degraded(self):
+        if self._baseline is None or self._recent is None:
+            return False
+        # Çok kısa gecikmelerde gürültüye tepki verilmesin diye mutlak bir pay da aranır
+        return self._recent > self._baseline * self.latency_tolerance and self._recent - self._baseline > 0.05
+
+    def _increase(self, amount):
+        before = self.limit
+        self.limit = min(self.max_limit, self.limit + amount)
+        self._delta += self.limit - before
+        self.stats['max_limit_reached'] = max(self.stats['max_limit_reached'], self.limit)
+
+    def _decrease(self, now):
+        if now - self._last_decrease < max(self._recent or 0.0, 0.1):
+            return
+        self._last_decrease = now
+        before = self.limit
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+        self._delta += self.limit - before
+        self.stats['decreases'] += 1
+        # Gecikme tabanı yeni sınırla yeniden öğrenilsin
+        self._recent = self._baseline
+
+    def _maybe_sync(self, force=False):
+        if self.shared is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_sync < config.RATE_SYNC_INTERVAL:
+            return
+        self._last_sync = now
+        state = self.shared.sync(self._delta, self.paused_until)
+        self._delta = 0.0
+        if state:
+            self.limit = min(self.max_limit, max(self.min_limit, state['limit']))
+            self._members = state['members']
+            self.paused_until = max(self.paused_until, state['paused_until'])
+
+    def snapshot(self):
+        with self._cond:
+            return dict(self.stats, host=self.host, limit=round(self.limit, 2), capacity=self.capacity(),
+                        in_flight=self.in_flight, members=self._members,
+                        max_limit_reached=round(self.stats['max_limit_reached'], 2),
+                        wait_seconds=round(self.stats['wait_seconds'], 3),
+                        baseline_ms=round(self._baseline * 1000, 1) if self._baseline else None)
+
+
+class SharedRateState:
+    """
+    Host başına genel sınırın Redis'teki kopyası. Her sürecin limiter'ı ara ara sync() ile kendi
+    değişimini ekler ve genel sınırı, etkin süreç sayısını ve duraklama bitişini okur; sınır süreçler
+    arasında eşit bölünür. Redis'e ulaşılamazsa None döner ve limiter yerel olarak çalışmaya devam eder.
+    """
+
+    prefix = 'uzem:rate:'
+
+    def __init__(self, host, member_id, initial, client=None):
+        self.client = client or get_redis()
+        self.key = f'{self.prefix}{host}'
+        self.members_key = f'{self.key}:members'
+        self.member_id = member_id
+        self.initial = initial
+
+    def sync(self, delta, paused_until):
+        """Yerel değişimi (delta) genel sınıra ekler; {'limit', 'members', 'paused_until'} ya da None döner."""
+        now = time.time()
+        # Duraklama monotonic saatle tutulur; süreçler arasında duvar saatine çevrilir
+        pause_wall = now + max(0.0, paused_until - time.monotonic())
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.hsetnx(self.key, 'limit', self.initial)
+            pipe.hincrbyfloat(self.key, 'limit', delta)
+            pipe.zadd(self.members_key, {self.member_id: now})
+            # Son birkaç senkronda görünmeyen süreçler (bitmiş/düşmüş) paydan çıkar
+            pipe.zremrangebyscore(self.members_key, 0, now - 5 * config.RATE_SYNC_INTERVAL - 5)
+            pipe.zcard(self.members_key)
+            pipe.hget(self.key, 'paused_until')
+            pipe.expire(self.key, 3600)
+            pipe.expire(self.members_key, 3600)
+            _, limit, _, _, members, shared_pause, _, _ = pipe.execute()
+            if pause_wall > float(shared_pause or 0):
+                self.client.hset(self.key, 'paused_until', pause_wall)
+        except redis.RedisError as e:
+            print(f"Paylaşımlı hız sınırı okunamadı: {e}")
+            return None
+
+        shared_pause = float(shared_pause or 0)
+        return {
+            'limit': float(limit),
+            'members': max(1, int(members)),
+            'paused_until': time.monotonic() + max(0.0, max(shared_pause, pause_wall) - now),
+        }
+
+
+def limited_get(session, url, limiter=None, **kwargs):
+    """
+    session.get(url) isteğini limiter'dan yer alarak atar ve sonucu sınıra bildirir.
+    limiter verilmezse URL'in host'u için süreç genelindeki limiter kullanılır (kapalıysa doğrudan istek).
+    """
+    return limited_request(session, 'GET', url, limiter, **kwargs)
+
+
+def limited_request(session, method, url, limiter=None, **kwargs):
+    """limited_get'in her HTTP yöntemi için olanı (ör. AJAX servisine POST)."""
+    limiter = limiter or get_limiter(url)
+    if limiter is None:
+        return session.request(method, url, **kwargs)
+    limiter.acquire()
+    started = time.perf_counter()
+    response = None
+    try:
+        response = session.request(method, url, **kwargs)
+        return response
+    finally:
+        status = response.status_code if response is not None else None
+        retry_after = parse_retry_after(response.headers.get('Retry-After')) if status in THROTTLE_STATUS else None
+        limiter.release(time.perf_counter() - started, status, retry_after,
+                        error=status is None or (status >= 500 and status not in THROTTLE_STATUS))
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(url):
+    """URL'in host'u için süreç genelinde tek limiter; RATE_CONTROL_ENABLED kapalıysa None."""
+    if not config.RATE_CONTROL_ENABLED:
+        return None
+    host = urlsplit(url).netloc.lower()
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limits = host_limits(host)
+            shared = None
+            if config.RATE_SHARED:
+                shared = SharedRateState(host, f'{os.getpid()}:{uuid.uuid4().hex[:8]}', limits['initial'])
+            limiter = _limiters[host] = AdaptiveLimiter(host, shared=shared)
+        return limiter
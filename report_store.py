@@ -0,0 +1,229 @@
+# report_store.py
+# Üretilen raporların görev ID'siyle saklanması: REPORT_DIR/<id>/ altında Excel ve gzip'li JSON/CSV alternatifleri,
+# SQLite dizininde üst bilgi (diller, boyut, oluşturma zamanı). Yaşı ya da toplam boyutu aşan eski raporlar silinir.
+# Web ve worker aynı klasörü (docker-compose'daki paylaşılan volume) kullanır.
+
+import csv
+import datetime
+import gzip
+import io
+import json
+import os
+import re
+import shutil
+import sqlite3
+import time
+from zoneinfo import ZoneInfo
+
+import config
+from pipeline import run_cpu
+from report_writer import DEFAULT_MINIMUM, SKILL_COLUMNS, level_sort_key, write_doyk_workbook
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+JSON_FILE = 'report.json.gz'
+CSV_FILE = 'report.csv.gz'
+
+_ID_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+class ReportNotFound(Exception):
+    """İstenen rapor yok, silinmiş ya da istenen biçimde değil."""
+
+
+class ReportStore:
+    """
+    Rapor klasörleri ve SQLite dizini. Excel prepare() ile verilen yola yazılır, ardından add() ile
+    JSON/CSV alternatifleri üretilir ve rapor dizine eklenir; her eklemede prune() çalışır.
+    """
+
+    def __init__(self, root=None):
+        # Flask send_file göreli yolları uygulama klasörüne göre çözer; yol çalışma klasörüne göre sabitlenir
+        self.root = os.path.abspath(root or config.REPORT_DIR)
+        self.index_path = os.path.join(self.root, 'index.sqlite3')
+
+    def _connect(self):
+        os.makedirs(self.root, exist_ok=True)
+        conn = sqlite3.connect(self.index_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS reports ('
+            ' id TEXT PRIMARY KEY, created_at REAL NOT NULL, languages TEXT NOT NULL,'
+            ' size INTEGER NOT NULL, filename TEXT NOT NULL)'
+        )
+        return conn
+
+    def report_dir(self, report_id):
+        if not _ID_RE.match(report_id or ''):
+            raise ReportNotFound(f"Geçersiz rapor ID'si: {report_id!r}")
+        return os.path.join(self.root, report_id)
+
+    def prepare(self, report_id, filename):
+        """Excel'in yazılacağı yolu döndürür (klasörü oluşturur)."""
+        directory = self.report_dir(report_id)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, filename)
+
+    def add(self, report_id, excel_path, data, minimum_values, course_details=None):
+        """
+        Yazılmış Excel'in yanına gzip'li JSON (özet + varsa kurs detayları) ve CSV (özet) ekler,
+        raporu dizine kaydeder ve Excel'in yolunu döndürür. Aynı ID tekrar eklenirse (yeniden denenen görev)
+        önceki dosyaların yerini alır.
+        """
+        directory = self.report_dir(report_id)
+        filename = os.path.basename(excel_path)
+        languages = sorted(lang for lang, levels in data.items() if levels)
+        created_at = time.time()
+
+        doc = {
+            'report_id': report_id,
+            'created_at': datetime.datetime.fromtimestamp(created_at, ZoneInfo("Europe/Istanbul")).isoformat(),
+            'languages': languages,
+            'minimum_values': minimum_values,
+            'data': data,
+        }
+        if course_details:
+            doc['courses'] = course_details
+        _write_gzip(os.path.join(directory, JSON_FILE), json.dumps(doc, ensure_ascii=False, separators=(',', ':')))
+        _write_gzip(os.path.join(directory, CSV_FILE), _summary_csv(data, minimum_values))
+
+        # Yeniden denenen görevin farklı dakikada yazılmış eski Excel'i kalmasın
+        keep = {filename, JSON_FILE, CSV_FILE}
+        for name in os.listdir(directory):
+            if name not in keep:
+                _remove(os.path.join(directory, name))
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in keep)
+
+        with self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO reports (id, created_at, languages, size, filename) '
+                         'VALUES (?, ?, ?, ?, ?)', (report_id, created_at, json.dumps(languages), size, filename))
+        conn.close()
+        self.prune(keep_id=report_id)
+        return excel_path
+
+    def get(self, report_id):
+        """Dizindeki kayıt: {'id', 'created_at', 'languages', 'size', 'filename'}."""
+        self.report_dir(report_id)
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT * FROM reports WHERE id = ?', (report_id,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            raise ReportNotFound(f"Rapor bulunamadı ya da süresi dolmuş: {report_id}")
+        entry = dict(row)
+        entry['languages'] = json.loads(entry['languages'])
+        return entry
+
+    def file(self, report_id, fmt='xlsx'):
+        """
+        İstenen biçimin (xlsx/json/csv) dosyası: (yol, mimetype, indirme adı, gzip'li mi).
+        JSON ve CSV diskte gzip'li durur; istemci kabul ediyorsa olduğu gibi gönderilir.
+        """
+        entry = self.get(report_id)
+        base = os.path.splitext(entry['filename'])[0]
+        if fmt == 'xlsx':
+            name, mimetype, download_name, gzipped = entry['filename'], XLSX_MIMETYPE, entry['filename'], False
+        elif fmt == 'json':
+            name, mimetype, download_name, gzipped = JSON_FILE, 'application/json', f'{base}.json', True
+        elif fmt == 'csv':
+            name, mimetype, download_name, gzipped = CSV_FILE, 'text/csv; charset=utf-8', f'{base}.csv', True
+        else:
+            raise ReportNotFound(f"Desteklenmeyen rapor biçimi: {fmt}")
+        path = os.path.join(self.report_dir(report_id), name)
+        if not os.path.exists(path):
+            raise ReportNotFound(f"Rapor dosyası bulunamadı: {report_id}/{name}")
+        return path, mimetype, download_name, gzipped
+
+    def prune(self, max_age=None, max_bytes=None, keep_id=None):
+        """
+        config.REPORT_MAX_AGE'den eski raporları, ardından toplam boyut config.REPORT_MAX_BYTES'ı
+        aşıyorsa en eskilerden başlayarak diğerlerini siler. keep_id (yeni eklenen rapor) silinmez.
+        Dizinde olmayan klasörler ve eski düz çıktı dosyaları da yaşa göre temizlenir.
+        """
+        max_age = config.REPORT_MAX_AGE if max_age is None else max_age
+        max_bytes = config.REPORT_MAX_BYTES if max_bytes is None else max_bytes
+        cutoff = time.time() - max_age
+
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT id, created_at, size FROM reports ORDER BY created_at DESC').fetchall()
+            total = 0
+            evict = []
+            for row in rows:
+                if row['id'] == keep_id:
+                    total += row['size']
+                elif row['created_at'] < cutoff or total + row['size'] > max_bytes:
+                    evict.append(row['id'])
+                else:
+                    total += row['size']
+            with conn:
+                conn.executemany('DELETE FROM reports WHERE id = ?', [(report_id,) for report_id in evict])
+            indexed = {row['id'] for row in rows} - set(evict)
+        finally:
+            conn.close()
+
+        for report_id in evict:
+            shutil.rmtree(os.path.join(self.root, report_id), ignore_errors=True)
+
+        # Dizine hiç girmemiş (yazım yarıda kalmış) klasörler ve klasörlemeden önceki düz Excel dosyaları
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name in indexed or name.startswith('index.sqlite3'):
+                continue
+            try:
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+            except OSError:
+                continue
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            elif name.endswith('.xlsx'):
+                _remove(path)
+        return evict
+
+
+def create_excel_report(data, minimum_values, report_id, course_details=None, stage_stats=None, diff=None):
+    """
+    Verilen dataya göre biçimlendirilmiş bir Excel raporu oluşturur ve kaydeder.
+    course_details verilirse kurs bazında satırlar ikinci bir sayfaya yazılır.
+    diff verilirse iki anlık görüntünün karşılaştırması da eklenir.
+    Görev içinde (stage_stats verilince) yazım CPU işi olduğundan işlem havuzunda yapılır ve süresi
+    'report' aşamasına eklenir; web sürecinde (önbellekteki sonuçtan) doğrudan yazılır.
+    Rapor report_id ile ReportStore'a kaydedilir (JSON/CSV alternatifleriyle); Excel'in yolu döner.
+    """
+    store = ReportStore()
+    timestamp = datetime.datetime.now(ZoneInfo("Europe/Istanbul")).strftime("%d-%m-%Y_%H-%M")
+    # Her rapor kendi klasöründe; aynı dakikada biten görevlerin dosyaları birbirini ezmez
+    filename = store.prepare(report_id, f'UZEM_DOYK_{timestamp}.xlsx')
+    if stage_stats is None:
+        write_doyk_workbook(filename, data, minimum_values, course_details, diff)
+    else:
+        run_cpu(stage_stats, 'report', write_doyk_workbook, filename, data, minimum_values, course_details, diff)
+    return store.add(report_id, filename, data, minimum_values, course_details)
+
+
+def _summary_csv(data, minimum_values):
+    """DOYK özeti: dil, seviye, beceri sayıları ve dilin minimum değeri."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(('Dil', 'Seviye') + SKILL_COLUMNS + ('Minimum',))
+    for language, levels in data.items():
+        min_value = minimum_values.get(language, DEFAULT_MINIMUM)
+        for level_code in sorted(levels, key=level_sort_key):
+            counts = levels[level_code]
+            writer.writerow([language, level_code] + [counts.get(skill, 0) for skill in SKILL_COLUMNS] + [min_value])
+    return out.getvalue()
+
+
+def _write_gzip(path, text):
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
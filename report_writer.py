@@ -0,0 +1,246 @@
+# report_writer.py
+# DOYK Excel raporunu openpyxl write-only modunda, satır satır akıtarak yazar.
+# Hücre başına Border/Alignment nesnesi oluşturmak yerine paylaşılan adlandırılmış stiller kullanılır.
+# openpyxl ilk rapor yazılırken yüklenir: web süreci bu modülü sabitler (beceri sütunları, seviye sırası)
+# için de içe aktarır ve rapor üretmeyen süreçler kütüphaneyi taşımaz.
+
+from skill_classifier import classify_title
+
+SKILL_COLUMNS = ('D', 'O', 'Y', 'K')
+# Kurs detay sayfasındaki dağılım sütunları (course_analyzer.CourseCounts alanları)
+COUNT_COLUMNS = (
+    ('h5p_placeholders', 'H5P'),
+    ('resources', 'Kaynak'),
+    ('h5p_activities', 'H5P Etkinlik'),
+    ('assignments', 'Ödev'),
+    ('videos', 'Video'),
+)
+DEFAULT_MINIMUM = 42
+
+
+def _named_styles():
+    """Rapordaki tüm hücre görünümleri; çalışma kitabına bir kez eklenir."""
+    from openpyxl.styles import Alignment, Border, NamedStyle, PatternFill, Side
+
+    thin = Side(style='thin')
+    center = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    return [
+        # Değerli, ortalanmış ve kenarlıklı hücre
+        NamedStyle(name='doyk_cell', border=Border(left=thin, right=thin, top=thin, bottom=thin), alignment=center),
+        # Minimum değerin altındaki sayı
+        NamedStyle(name='doyk_warning', border=Border(left=thin, right=thin, top=thin, bottom=thin), alignment=center,
+                   fill=PatternFill(start_color="FFEBEE", end_color="FFEBEE", fill_type="solid")),
+        # Sadece kenarlık (boş başlık hücreleri)
+        NamedStyle(name='doyk_border', border=Border(left=thin, right=thin, top=thin, bottom=thin)),
+        # Dikey birleştirilmiş dil hücresinin ortadaki ve son satırları
+        NamedStyle(name='doyk_merged_mid', border=Border(left=thin, right=thin)),
+        NamedStyle(name='doyk_merged_last', border=Border(left=thin, right=thin, bottom=thin)),
+    ]
+
+
+def _new_workbook():
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for style in _named_styles():
+        workbook.add_named_style(style)
+    return workbook
+
+
+def level_sort_key(k):
+    return (k[0], int(k[1:])) if len(k) > 1 and k[1:].isdigit() else (k, 0)
+
+
+class _SheetWriter:
+    """Tek bir write-only sayfaya stilli satır ekleme yardımcısı."""
+
+    def __init__(self, workbook, title, widths):
+        from openpyxl.cell import WriteOnlyCell
+
+        self._cell_class = WriteOnlyCell
+        self.ws = workbook.create_sheet(title)
+        # Sütun genişlikleri ilk satırdan önce verilmeli
+        for col, width in widths.items():
+            self.ws.column_dimensions[col].width = width
+        self.row = 0
+
+    def cell(self, value=None, style='doyk_cell'):
+        c = self._cell_class(self.ws, value=value)
+        c.style = style
+        return c
+
+    def append(self, cells):
+        self.ws.append(cells)
+        self.row += 1
+
+    def merge(self, ref):
+        self.ws.merged_cells.add(ref)
+
+
+def _write_summary_sheet(writer, data, minimum_values):
+    # Her dil bloğunda aynı olan iki başlık satırı bir kez hazırlanır
+    title_row = [writer.cell(style='doyk_border'), writer.cell(style='doyk_border'), writer.cell("DOYK"),
+                 writer.cell(style='doyk_border'), writer.cell(style='doyk_border'), writer.cell(style='doyk_border')]
+    header_row = [writer.cell(v) for v in ("Dil", "Seviye") + SKILL_COLUMNS]
+
+    for language, levels_data in data.items():
+        if not levels_data:
+            continue
+
+        # Her dil bloğundan önce boş satır bırak
+        if writer.row:
+            writer.append([])
+
+        writer.append(title_row)
+        writer.merge(f"C{writer.row}:F{writer.row}")
+        writer.append(header_row)
+
+        min_value = minimum_values.get(language, DEFAULT_MINIMUM)
+        sorted_levels = sorted(levels_data.keys(), key=level_sort_key)
+        data_start_row = writer.row + 1
+        last = len(sorted_levels) - 1
+
+        for i, level_code in enumerate(sorted_levels):
+            doyk_counts = levels_data[level_code]
+            if i == 0:
+                first = writer.cell(language)
+            else:
+                first = writer.cell(style='doyk_merged_last' if i == last else 'doyk_merged_mid')
+            row = [first, writer.cell(level_code)]
+            for skill in SKILL_COLUMNS:
+                value = doyk_counts.get(skill, 0)
+                row.append(writer.cell(value, 'doyk_warning' if value < min_value else 'doyk_cell'))
+            writer.append(row)
+
+        # Dil adı tüm seviye satırları boyunca birleştirilir
+        writer.merge(f"A{data_start_row}:A{writer.row}")
+
+
+def _write_course_sheet(writer, course_details):
+    headers = ("Dil", "Seviye", "Beceri", "Kurs", "Toplam") + tuple(label for _, label in COUNT_COLUMNS) + ("URL",)
+    writer.append([writer.cell(v) for v in headers])
+    for language, levels in course_details.items():
+        for level_code in sorted(levels.keys(), key=level_sort_key):
+            for course in levels[level_code] or []:
+                title = course.get('title', '') or ''
+                # Dağılımı olmayan (hatalı/eski önbellek) kurslarda sütunlar boş kalır
+                counts = course.get('counts') or {}
+                writer.append([
+                    language,
+                    level_code,
+                    classify_title(title) or '-',
+                    title,
+                    int(course.get('total_resources_from_js', 0) or 0),
+                    *(counts.get(field) for field, _ in COUNT_COLUMNS),
+                    course.get('url') or '',
+                ])
+
+
+def _write_diff_sheet(writer, summary, minimum_values):
+    writer.append([writer.cell(v) for v in ("Dil", "Seviye", "Beceri", "Önceki", "Şimdiki", "Fark")])
+    for lang, level_code, skill, old, new in summary:
+        min_value = minimum_values.get(lang, DEFAULT_MINIMUM)
+        writer.append([
+            writer.cell(lang), writer.cell(level_code), writer.cell(skill), writer.cell(old),
+            writer.cell(new, 'doyk_warning' if new < min_value else 'doyk_cell'),
+            # Azalan sayılar dikkat çeksin
+            writer.cell(new - old, 'doyk_warning' if new < old else 'doyk_cell'),
+        ])
+
+
+def _write_course_diff_sheet(writer, courses):
+    writer.append([writer.cell(v) for v in ("Dil", "Seviye", "Kurs", "Önceki", "Şimdiki", "Fark", "URL")])
+    for lang, level_code, title, url, old, new in courses:
+        # Önceki ya da şimdiki görüntüde olmayan kurs: '-'
+        writer.append([
+            lang, level_code, title,
+            '-' if old is None else old,
+            '-' if new is None else new,
+            (new or 0) - (old or 0),
+            url,
+        ])
+
+
+def _trend_days(series):
+    """Serilerin gün bazında değerleri: (sıralı günler, [(seri, {gün: sayı}), ...]). Aynı günden son nokta alınır."""
+    daily = []
+    days = set()
+    for s in series:
+        values = {}
+        for timestamp, count in s['points']:
+            values[timestamp[:10]] = count
+        daily.append((s, values))
+        days.update(values)
+    return sorted(days), daily
+
+
+def _write_trend_sheet(writer, days, daily):
+    headers = ("Dil", "Seviye", "Beceri") + tuple(f"{d[8:10]}.{d[5:7]}.{d[:4]}" for d in days) + ("Fark",)
+    writer.append([writer.cell(v) for v in headers])
+    for s, values in daily:
+        row = [writer.cell(s['language']), writer.cell(s['level']), writer.cell(s['skill'])]
+        previous = None
+        for day in days:
+            value = values.get(day)
+            # Önceki noktaya göre azalan sayı dikkat çeksin
+            decreased = value is not None and previous is not None and value < previous
+            row.append(writer.cell(value, 'doyk_warning' if decreased else 'doyk_cell'))
+            if value is not None:
+                previous = value
+        present = [values[d] for d in days if d in values]
+        change = present[-1] - present[0] if present else None
+        row.append(writer.cell(change, 'doyk_warning' if change is not None and change < 0 else 'doyk_cell'))
+        writer.append(row)
+
+
+def write_trend_workbook(target, series, diff=None, minimum_values=None):
+    """
+    history.HistoryStore.series çıktısını 'Trend' sayfasına (seri başına satır, gün başına sütun) yazar.
+    diff (HistoryStore.compare çıktısı) verilirse 'Karşılaştırma' ve 'Kurs Değişiklikleri' sayfaları eklenir.
+    target dosya yolu ya da yazılabilir dosya nesnesi olabilir.
+    """
+    from openpyxl.utils import get_column_letter
+
+    workbook = _new_workbook()
+    days, daily = _trend_days(series)
+    widths = {'A': 15, 'B': 10, 'C': 8}
+    for i in range(len(days) + 1):
+        widths[get_column_letter(4 + i)] = 11
+    _write_trend_sheet(_SheetWriter(workbook, 'Trend', widths), days, daily)
+
+    if diff:
+        comparison = _SheetWriter(workbook, 'Karşılaştırma', {'A': 15, 'B': 10, 'C': 8, 'D': 10, 'E': 10, 'F': 8})
+        _write_diff_sheet(comparison, diff['summary'], minimum_values or {})
+        changes = _SheetWriter(workbook, 'Kurs Değişiklikleri',
+                               {'A': 15, 'B': 10, 'C': 50, 'D': 10, 'E': 10, 'F': 8, 'G': 60})
+        _write_course_diff_sheet(changes, diff['courses'])
+
+    workbook.save(target)
+    return target
+
+
+def write_doyk_workbook(filename, data, minimum_values, course_details=None, diff=None):
+    """
+    data: {dil: {seviye: {'D','O','Y','K'}}} özetini 'DOYK Analizi' sayfasına yazar.
+    course_details ({dil: {seviye: [kurs, ...]}}) verilirse kurs bazında satırlar
+    'Kurs Detayları' sayfasına eklenir.
+    diff (snapshots.diff_snapshots çıktısı) verilirse 'Karşılaştırma' ve 'Kurs Değişiklikleri' sayfaları eklenir.
+    """
+    workbook = _new_workbook()
+    summary = _SheetWriter(workbook, 'DOYK Analizi', {'A': 15, 'B': 10, 'C': 5, 'D': 5, 'E': 5, 'F': 5})
+    _write_summary_sheet(summary, data, minimum_values)
+
+    if course_details:
+        details = _SheetWriter(workbook, 'Kurs Detayları', {'A': 15, 'B': 10, 'C': 8, 'D': 50, 'E': 8,
+                                                        'F': 8, 'G': 8, 'H': 12, 'I': 8, 'J': 8, 'K': 60})
+        _write_course_sheet(details, course_details)
+
+    if diff:
+        comparison = _SheetWriter(workbook, 'Karşılaştırma', {'A': 15, 'B': 10, 'C': 8, 'D': 10, 'E': 10, 'F': 8})
+        _write_diff_sheet(comparison, diff['summary'], minimum_values)
+        changes = _SheetWriter(workbook, 'Kurs Değişiklikleri',
+                               {'A': 15, 'B': 10, 'C': 50, 'D': 10, 'E': 10, 'F': 8, 'G': 60})
+        _write_course_diff_sheet(changes, diff['courses'])
+
+    workbook.save(filename)
+    return filename
@@ -0,0 +1,192 @@
+# scheduler.py
+# Kazıma işlerinin adil zamanlanması. İşler hemen Celery'ye verilmez; Redis'te hesap başına sıralarda bekler
+# ve eşzamanlılık sınırları (toplam, toplu iş, hesap başına) elverdikçe hesaplar arasında sırayla dağıtılır.
+#   interactive -> tek dilli işler; önce bunlara bakılır ve toplu işlere kapalı en az bir yer kalır
+#   bulk        -> birden çok dilli ya da tüm diller (önceden kazıma dahil)
+# Sınırlar, süresi dolan kiralamalarla (sorted set) tutulan semaforlardır: worker düşerse yer
+# config.JOB_RUNNING_TTL sonunda kendiliğinden boşalır.
+
+import json
+import time
+
+import redis
+
+import config
+from cache import account_key, get_redis
+
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+JOB_CLASSES = (INTERACTIVE, BULK)
+
+# Ortalama iş süresinin (tahmini bekleme için) üstel hareketli ortalama katsayısı
+DURATION_ALPHA = 0.3
+
+
+def job_class(selected_languages):
+    """Tek dil seçilmişse etkileşimli, birden çok dil ya da tümü seçilmişse toplu iş."""
+    return INTERACTIVE if len(selected_languages or []) == 1 else BULK
+
+
+class JobScheduler:
+    """
+    Bekleyen işler (görev ID'si + Celery argümanları) ve çalışan işlerin kiralamaları.
+    submit() işi hesabın sırasına ekler; take_ready() sınırlar içinde verilebilecek işleri, hesaplar arasında
+    round-robin sırayla kuyruktan çıkarıp kiralamalarını alır; release() görev bitince yeri boşaltır.
+    Sıra değiştiren işlemler tek bir Redis kilidi altında yapılır (web ve worker'lar aynı anda çağırabilir).
+    """
+
+    prefix = 'uzem:sched:'
+
+    def __init__(self, client=None, global_limit=None, bulk_limit=None, account_limit=None, lease_ttl=None):
+        self.client = client or get_redis()
+        self.global_limit = global_limit or config.SCHED_GLOBAL_LIMIT
+        self.bulk_limit = min(bulk_limit or config.SCHED_BULK_LIMIT, self.global_limit)
+        self.account_limit = account_limit or config.SCHED_ACCOUNT_LIMIT
+        self.lease_ttl = lease_ttl or config.JOB_RUNNING_TTL
+
+    def _key(self, *parts):
+        return self.prefix + ':'.join(parts)
+
+    def _lock(self):
+        return self.client.lock(self._key('lock'), timeout=10, blocking_timeout=10)
+
+    def submit(self, task_id, username, cls, args, kwargs=None):
+        """İşi hesabın sırasının sonuna ekler. Aynı görev ID'si zaten sıradaysa tekrar eklenmez."""
+        account = account_key(username)
+        job = {'task_id': task_id, 'account': account, 'job_class': cls, 'args': list(args),
+               'kwargs': kwargs or {}, 'queued_at': time.time()}
+        with self._lock():
+            # Şifre Celery mesajında olduğu gibi argümanlarda durur; kayıt kiralama süresi sonunda silinir
+            if not self.client.set(self._key('job', task_id), json.dumps(job), nx=True, ex=self.lease_ttl):
+                return
+            pipe = self.client.pipeline()
+            pipe.rpush(self._key('pending', cls, account), task_id)
+            pipe.lrange(self._key('ring', cls), 0, -1)
+            _, ring = pipe.execute()
+            if account.encode() not in ring:
+                self.client.rpush(self._key('ring', cls), account)
+
+    def take_ready(self):
+        """
+        Sınırlar elverdiğince verilecek işleri sıradan çıkarır ve kiralamalarını alır; iş sözlüklerini döndürür.
+        Önce etkileşimli, sonra toplu işlere bakılır. Her sınıfta hesaplar halka (ring) sırasıyla gezilir:
+        iş verilen hesap halkanın sonuna geçer, hesap sınırındaki hesap atlanır.
+        """
+        ready = []
+        with self._lock():
+            now = time.time()
+            self.client.zremrangebyscore(self._key('active'), '-inf', now)
+            self.client.zremrangebyscore(self._key('active', BULK), '-inf', now)
+            for cls in JOB_CLASSES:
+                ring_key = self._key('ring', cls)
+                skipped = 0
+                while skipped < self.client.llen(ring_key):
+                    if self.client.zcard(self._key('active')) >= self.global_limit:
+                        return ready
+                    if cls == BULK and self.client.zcard(self._key('active', BULK)) >= self.bulk_limit:
+                        break
+                    account = self.client.lpop(ring_key).decode()
+                    pending_key = self._key('pending', cls, account)
+                    account_active = self._key('active', 'account', account)
+                    self.client.zremrangebyscore(account_active, '-inf', now)
+                    if self.client.zcard(account_active) >= self.account_limit:
+                        self.client.rpush(ring_key, account)
+                        skipped += 1
+                        continue
+                    job = self._pop_job(pending_key)
+                    if self.client.llen(pending_key):
+                        self.client.rpush(ring_key, account)
+                    if job is None:
+                        continue
+                    self._lease(job, account_active, now)
+                    ready.append(job)
+                    skipped = 0
+        return ready
+
+    def _pop_job(self, pending_key):
+        # Kaydı süresi dolmuş (çok uzun beklemiş) görev ID'leri atlanır
+        while True:
+            task_id = self.client.lpop(pending_key)
+            if task_id is None:
+                return None
+            job_key = self._key('job', task_id.decode())
+            raw = self.client.get(job_key)
+            self.client.delete(job_key)
+            if raw:
+                return json.loads(raw)
+
+    def _lease(self, job, account_active, now):
+        expires = now + self.lease_ttl
+        pipe = self.client.pipeline()
+        pipe.zadd(self._key('active'), {job['task_id']: expires})
+        if job['job_class'] == BULK:
+            pipe.zadd(self._key('active', BULK), {job['task_id']: expires})
+        pipe.zadd(account_active, {job['task_id']: expires})
+        pipe.expire(account_active, self.lease_ttl)
+        pipe.set(self._key('lease', job['task_id']), json.dumps({'account': job['account'], 'job_class': job['job_class']}),
+                 ex=self.lease_ttl)
+        pipe.execute()
+
+    def release(self, task_id, seconds=None):
+        """Görevin kiralamasını bırakır; seconds verilirse sınıfın ortalama süresine katılır."""
+        try:
+            raw = self.client.get(self._key('lease', task_id))
+            if not raw:
+                return
+            lease = json.loads(raw)
+            pipe = self.client.pipeline()
+            pipe.zrem(self._key('active'), task_id)
+            pipe.zrem(self._key('active', BULK), task_id)
+            pipe.zrem(self._key('active', 'account', lease['account']), task_id)
+            pipe.delete(self._key('lease', task_id))
+            pipe.execute()
+            if seconds is not None:
+                self._record_duration(lease['job_class'], seconds)
+        except redis.RedisError as e:
+            print(f"Zamanlayıcı kiralaması bırakılamadı: {e}")
+
+    def _record_duration(self, cls, seconds):
+        previous = self.client.hget(self._key('duration'), cls)
+        average = seconds if previous is None else DURATION_ALPHA * seconds + (1 - DURATION_ALPHA) * float(previous)
+        self.client.hset(self._key('duration'), cls, average)
+
+    def position(self, task_id):
+        """
+        Sıradaki görevin yeri: {'queue', 'position', 'ahead', 'estimated_wait'} ya da sırada değilse None.
+        Önündeki iş sayısı round-robin sırasına göre hesaplanır (her hesap bu görevin hesabı kadar tur alır;
+        toplu işlerin önüne bekleyen tüm etkileşimli işler de eklenir). estimated_wait saniye cinsinden kaba
+        tahmindir: ortalama iş süresi ve sınıfın eşzamanlılık sınırıyla hesaplanır, süre bilinmiyorsa None.
+        """
+        try:
+            raw = self.client.get(self._key('job', task_id))
+            if not raw:
+                return None
+            job = json.loads(raw)
+            cls, account = job['job_class'], job['account']
+            own = [t.decode() for t in self.client.lrange(self._key('pending', cls, account), 0, -1)]
+            if task_id not in own:
+                return None
+            turn = own.index(task_id)
+            ahead = turn
+            before_own = True
+            for other in self.client.lrange(self._key('ring', cls), 0, -1):
+                other = other.decode()
+                if other == account:
+                    before_own = False
+                    continue
+                waiting = self.client.llen(self._key('pending', cls, other))
+                ahead += min(waiting, turn + 1 if before_own else turn)
+            if cls == BULK:
+                for other in self.client.lrange(self._key('ring', INTERACTIVE), 0, -1):
+                    ahead += self.client.llen(self._key('pending', INTERACTIVE, other.decode()))
+            average = self.client.hget(self._key('duration'), cls)
+        except redis.RedisError as e:
+            print(f"Zamanlayıcı sırası okunamadı: {e}")
+            return None
+
+        estimated_wait = None
+        if average is not None:
+            capacity = self.global_limit if cls == INTERACTIVE else self.bulk_limit
+            # Çalışan işlerin bitmesi için ortalama yarım iş süresi + önündeki işlerin tur sayısı
+            estimated_wait = round((ahead / capacity + 0.5) * float(average))
+        return {'queue': cls, 'position': ahead + 1, 'ahead': ahead, 'estimated_wait': estimated_wait}
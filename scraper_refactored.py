@@ -1,73 +1,114 @@
 # scraper_refactored.py
 
+import threading
+from urllib.parse import urlsplit
+
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 
-import time
+import config
+from driver_pool import DriverPool
+from metrics import Tracer
+from pipeline import StageStats
+from rate_control import get_limiter
+
+
+def create_remote_driver():
+    """
+    Remote Selenium WebDriver'a (Docker konteyneri) optimize edilmiş ayarlarla yeni bir oturum açar.
+    """
+    options = webdriver.ChromeOptions()
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--headless=new')  # Headless
+    options.page_load_strategy = 'none'     # Tam yüklemeyi bekleme
+
+    # Arka plan ağ istekleri vs.
+    options.add_argument('--disable-background-networking')
+    options.add_argument('--disable-sync')
+    options.add_argument('--disable-component-update')
+    options.add_argument('--disable-default-apps')
+    options.add_argument('--no-pings')
+    options.add_argument('--disable-domain-reliability')
+    options.add_argument('--disable-features=OptimizationHints,MediaRouter')
+
+    # Görselleri kapat (ek)
+    prefs = {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.plugins": 2,
+    }
+    options.add_experimental_option("prefs", prefs)
+
+    driver = webdriver.Remote(
+        command_executor=config.SELENIUM_URL,
+        options=options
+    )
+
+    # CDP: Ağ filtreleri (oturum boyunca geçerli; havuzdaki oturumlarda tekrar gönderilmez)
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {
+        'urls': [
+            '*.png','*.jpg','*.jpeg','*.gif','*.webp','*.svg','*.ico',
+            '*.mp4','*.webm','*.mp3','*.wav','*.ogg',
+            '*.woff','*.woff2','*.ttf','*.otf',
+            '*.css',
+            '*googletagmanager*','*google-analytics*','*doubleclick*',
+            '*facebook*','*hotjar*','*sentry*','*clarity*','*newrelic*','*datadoghq*',
+            '*gravatar*','*youtube*','*vimeo*'
+        ]
+    })
+    driver.set_page_load_timeout(120)
+    return driver
+
+
+_driver_pool = None
+_driver_pool_lock = threading.Lock()
+
+
+def get_driver_pool():
+    """Worker süreci başına tek tarayıcı havuzu; config.SELENIUM_POOL_SIZE 0 ise None (havuz kapalı)."""
+    global _driver_pool
+    if config.SELENIUM_POOL_SIZE <= 0:
+        return None
+    with _driver_pool_lock:
+        if _driver_pool is None:
+            _driver_pool = DriverPool(create_remote_driver, config.SELENIUM_POOL_SIZE)
+        return _driver_pool
+
 
 class UzemScraper:
-    def __init__(self, username, password):
+    def __init__(self, username, password, base_url=None, pool_timeout=None):
         self.username = username
         self.password = password
-        self.login_url = "https://uzem.msu.edu.tr/login/index.php"
-        self.dashboard_url = "https://uzem.msu.edu.tr/"
+        self.base_url = (base_url or config.UZEM_BASE_URL).rstrip('/') + '/'
+        self.login_url = self.base_url + "login/index.php"
+        self.dashboard_url = self.base_url
         self.driver = None
+        # Havuzda boş oturum için en fazla bekleme (None: config, 0: beklemeden vazgeç)
+        self.pool_timeout = pool_timeout
+        self.stage_stats = StageStats()
+        self.tracer = Tracer()
+        self._pooled = False
 
     def connect_driver(self):
         """
-        Remote Selenium WebDriver'a (Docker konteyneri) optimize edilmiş ayarlarla bağlanır.
+        Tarayıcı havuzundan hazır bir oturum alır; havuz kapalıysa yeni bir Remote oturum açar.
         """
-        print("Remote Chrome WebDriver'a (Docker) optimize edilmiş ayarlarla bağlanılıyor...")
+        pool = get_driver_pool()
         try:
-            options = webdriver.ChromeOptions()
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--headless=new')  # Headless
-            options.page_load_strategy = 'none'     # Tam yüklemeyi bekleme
-
-            # Arka plan ağ istekleri vs.
-            options.add_argument('--disable-background-networking')
-            options.add_argument('--disable-sync')
-            options.add_argument('--disable-component-update')
-            options.add_argument('--disable-default-apps')
-            options.add_argument('--no-pings')
-            options.add_argument('--disable-domain-reliability')
-            options.add_argument('--disable-features=OptimizationHints,MediaRouter')
-
-            # Görselleri kapat (ek)
-            prefs = {
-                "profile.managed_default_content_settings.images": 2,
-                "profile.managed_default_content_settings.plugins": 2,
-            }
-            options.add_experimental_option("prefs", prefs)
-
-            self.driver = webdriver.Remote(
-                command_executor='http://selenium_chrome:4444/wd/hub',
-                options=options
-            )
-
-            # CDP: Ağ filtreleri
-            self.driver.execute_cdp_cmd('Network.enable', {})
-            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {
-                'urls': [
-                    '*.png','*.jpg','*.jpeg','*.gif','*.webp','*.svg','*.ico',
-                    '*.mp4','*.webm','*.mp3','*.wav','*.ogg',
-                    '*.woff','*.woff2','*.ttf','*.otf',
-                    '*.css',
-                    '*googletagmanager*','*google-analytics*','*doubleclick*',
-                    '*facebook*','*hotjar*','*sentry*','*clarity*','*newrelic*','*datadoghq*',
-                    '*gravatar*','*youtube*','*vimeo*'
-                ]
-            })
-
-
+            if pool is not None:
+                print("Tarayıcı havuzundan oturum alınıyor...")
+                self.driver = pool.acquire(self.pool_timeout, self.stage_stats)
+                self._pooled = True
+            else:
+                print("Remote Chrome WebDriver'a (Docker) optimize edilmiş ayarlarla bağlanılıyor...")
+                self.driver = create_remote_driver()
             print("Remote WebDriver'a başarıyla bağlanıldı.")
-            self.driver.set_page_load_timeout(120)
             return True
-            
+
         except Exception as e:
             print(f"Remote WebDriver'a bağlanırken hata oluştu: {e}")
             return False
@@ -120,10 +161,9 @@ class UzemScraper:
             print("Hata: WebDriver başlatılmamış veya giriş yapılmamış.")
             return {}
 
-        # Dashboard'a giderek sayfanın doğru yüklendiğinden emin ol
+        # Dashboard'a git; sabit bekleme yerine sekme butonu tıklanabilir olana kadar bekle
         print(f"Dashboard URL'ine gidiliyor: {self.dashboard_url}")
-        self.driver.get(self.dashboard_url) 
-        time.sleep(3) # Sayfanın tamamen yüklenmesi için bekle
+        self.driver.get(self.dashboard_url)
 
         print("\nDil seviyeleri linkleri çekiliyor...")
         language_levels = {}
@@ -131,61 +171,55 @@ class UzemScraper:
         try:
             # "LİSAN EĞİTİM PORTALI" düğmesini bul ve tıklanabilir olana kadar bekle
             print("Lisan Eğitim Portalı butonunu arıyorum (ID: activates-tab)...")
-            language_portal_button = WebDriverWait(self.driver, 60).until(
+            wait = WebDriverWait(self.driver, 60)
+            language_portal_button = wait.until(
                 EC.element_to_be_clickable((By.ID, "activates-tab"))
             )
             print(f"Lisan Eğitim Portalı butonu bulundu: '{language_portal_button.text}'")
 
-            # Eğer zaten aktif değilse tıkla
+            # Eğer zaten aktif değilse tıkla ve sekme içeriği gelene kadar bekle
             if "active" not in language_portal_button.get_attribute("class"):
                 print("Lisan Eğitim Portalı butonu aktif değil, tıklıyorum...")
                 language_portal_button.click()
-                time.sleep(3) # Akordiyonun açılması için biraz daha bekle
 
             print("Dil kartlarını arıyorum (.tab-pane.active .faq-card)...")
-            faq_cards = self.driver.find_elements(By.CSS_SELECTOR, ".tab-pane.active .faq-card")
-            if not faq_cards:
+            try:
+                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ".tab-pane.active .faq-card")))
+            except TimeoutException:
                 print("Hata: 'Lisan Eğitim Portalı' altında hiç dil kartı bulunamadı.")
                 print("Mevcut sayfa başlığı:", self.driver.title)
                 print("Sayfa kaynağının bir kısmı (hata ayıklama için):", self.driver.page_source[:1000])
                 return {}
-            print(f"Toplam {len(faq_cards)} adet dil kartı bulundu.")
-            
-            for i, card in enumerate(faq_cards):
-                try:
-                    lang_heading = card.find_element(By.CSS_SELECTOR, ".card-heading span a")
-                    language_name = lang_heading.text.strip()
-                    print(f"  Dil: {language_name}")
-                    
-                    language_levels[language_name] = {}
-
-                    # Dilin seviyelerini gösteren akordiyonu aç
-                    card_heading_element = card.find_element(By.CLASS_NAME, "card-heading")
-                    if "collapsed" in card_heading_element.get_attribute("class"):
-                        print(f"    '{language_name}' akordiyonunu açıyorum (tıklama)...")
-                        self.driver.execute_script("arguments[0].click();", card_heading_element)
-                        time.sleep(2) # Açılmasını bekle
-
-                    # Açılan akordiyondaki seviye linklerini bul
-                    level_links_container = card.find_element(By.CLASS_NAME, "faq-card-body")
-                    level_list_items = level_links_container.find_elements(By.TAG_NAME, "li")
-                    
-                    if not level_list_items:
-                        print(f"    Uyarı: '{language_name}' altında hiç seviye linki bulunamadı. Atlanıyor.")
-                        continue
-
-                    for item in level_list_items:
-                        level_anchor = item.find_element(By.TAG_NAME, "a")
-                        level_name = level_anchor.text.strip()
-                        level_url = level_anchor.get_attribute("href")
-                        language_levels[language_name][level_name] = level_url
-                        # print(f"      - Seviye: {level_name}, URL: {level_url}")
-
-                except NoSuchElementException:
-                    print(f"  Uyarı: Kart {i+1} ({language_name if 'language_name' in locals() else 'Bilinmeyen'}) içinde beklenen bir element bulunamadı. Atlanıyor.")
-                except Exception as e:
-                    print(f"  Bir dil kartı işlenirken beklenmedik hata oluştu ({language_name if 'language_name' in locals() else 'Bilinmiyor'}): {e}")
+
+            # Akordiyonları tek tek açmak yerine linkleri zaten DOM'da olan kartlardan tek seferde oku.
+            # Kapalı akordiyonda .text boş döner; textContent ise görünürlükten bağımsızdır.
+            cards = self.driver.execute_script("""
+                const clean = (s) => (s || '').replace(/\\s+/g, ' ').trim();
+                return Array.from(document.querySelectorAll('.tab-pane.active .faq-card')).map(card => {
+                    const heading = card.querySelector('.card-heading span a');
+                    const body = card.querySelector('.faq-card-body');
+                    const levels = body ? Array.from(body.querySelectorAll('li')).map(li => {
+                        const a = li.querySelector('a');
+                        return a ? { name: clean(a.textContent), url: a.href } : null;
+                    }).filter(Boolean) : [];
+                    return { language: heading ? clean(heading.textContent) : null, levels };
+                });
+            """) or []
+            print(f"Toplam {len(cards)} adet dil kartı bulundu.")
+
+            for i, card in enumerate(cards):
+                language_name = card.get('language')
+                if not language_name:
+                    print(f"  Uyarı: Kart {i+1} içinde dil başlığı bulunamadı. Atlanıyor.")
+                    continue
+                print(f"  Dil: {language_name}")
+                language_levels[language_name] = {}
+
+                if not card.get('levels'):
+                    print(f"    Uyarı: '{language_name}' altında hiç seviye linki bulunamadı. Atlanıyor.")
                     continue
+                for level in card['levels']:
+                    language_levels[language_name][level['name']] = level['url']
 
         except TimeoutException:
             print("Zaman aşımı: 'Lisan Eğitim Portalı' butonu veya dil kartları beklenen sürede bulunamadı.")
@@ -206,35 +240,38 @@ class UzemScraper:
             return None
 
         print(f"\nKurs listesi için sayfaya gidiliyor: {url}")
-        self.driver.get(url)
+        with self.tracer.span('level_page', url=url) as span:
+            self.driver.get(url)
 
-        wait = WebDriverWait(self.driver, 60)
-        # Sayfa tam yüklenmesini beklemeyelim; kartların geldiğini görmek yeterli
-        try:
-            wait.until(lambda d: d.execute_script('return document.readyState') in ('interactive','complete'))
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ".course-cards .card-wrapper")))
-        except TimeoutException:
-            print("Kurs kartları görünmedi, atlanıyor.")
-            return []
+            wait = WebDriverWait(self.driver, 60)
+            # Sayfa tam yüklenmesini beklemeyelim; kartların geldiğini görmek yeterli
+            try:
+                wait.until(lambda d: d.execute_script('return document.readyState') in ('interactive','complete'))
+                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ".course-cards .card-wrapper")))
+            except TimeoutException:
+                print("Kurs kartları görünmedi, atlanıyor.")
+                span.set(error='TimeoutException')
+                return []
 
-        # Liste sayfasında JS ile kurs linklerini al
-        course_cards = self.driver.execute_script("""
-            const cards = document.querySelectorAll('.course-cards .card-wrapper');
-            const info = [];
-            cards.forEach(card => {
-                const a = card.querySelector('.coursename');
-                if (a && a.href) info.push({title: a.innerText.trim(), url: a.href});
-            });
-            return info;
-        """) or []
+            # Liste sayfasında JS ile kurs linklerini al
+            course_cards = self.driver.execute_script("""
+                const cards = document.querySelectorAll('.course-cards .card-wrapper');
+                const info = [];
+                cards.forEach(card => {
+                    const a = card.querySelector('.coursename');
+                    if (a && a.href) info.push({title: a.innerText.trim(), url: a.href});
+                });
+                return info;
+            """) or []
+            span.set(courses=len(course_cards))
 
         if not course_cards:
             print("Uyarı: Kurs kartı bulunamadı.")
             return []
 
         print(f"Toplam {len(course_cards)} kurs bulundu. Fetch ile sayılıyor...")
-        # Tam gezinmeden, sadece HTML çek
-        counted = self.fetch_course_counts_bulk(course_cards, timeout_sec=180, concurrency=6)
+        # Tam gezinmeden, sadece HTML çek (eşzamanlılık host'un uyarlanabilir sınırından başlar)
+        counted = self.fetch_course_counts_bulk(course_cards, timeout_sec=180)
 
         # Dönüş formatını eski kodla uyumlu hale getir
         all_courses_with_js_counts = []
@@ -242,75 +279,250 @@ class UzemScraper:
             all_courses_with_js_counts.append({
                 "title": c.get("title", ""),
                 "url": c.get("url"),
-                "total_resources_from_js": c.get("total", 0)
+                "total_resources_from_js": c.get("total", 0),
+                "counts": c.get("counts")
             })
         return all_courses_with_js_counts
 
-    def fetch_course_counts_bulk(self, courses, timeout_sec=120, concurrency=5):
+    def fetch_course_counts_bulk(self, courses, timeout_sec=120, concurrency=None):
             """
             Aynı domain içindeki course URL'lerini tam gezinmeden, sadece HTML getirerek sayar.
+            Tarayıcı içinde sınırlı bir iş havuzu çalışır; biten isteğin yerine sıradaki başlar.
+            Hız denetimi açıksa havuz host'un limiter'ındaki sınırla başlar ve tarayıcıda aynı AIMD kuralıyla
+            büyüyüp küçülür (429/503/5xx/ağ hatasında azalır, Retry-After süresince yeni istek atılmaz);
+            isteklerin sonuçları sonradan limiter'a bildirilir. Kapalıysa `concurrency` (varsayılan
+            config.COURSE_FETCH_CONCURRENCY) sabit kalır. 5xx/429/ağ hatalarında geri çekilmeyle tekrar denenir.
+            Süreler tarayıcıda ölçülür; her kurs için 'course' (ve altında 'parse') span'i self.tracer'a eklenir.
             courses: [{'title':..., 'url':...}, ...]
-            Dönüş: [{'title':..., 'url':..., 'total': int}, ...]
+            Dönüş (girdi sırasıyla): [{'title':..., 'url':..., 'total': int, 'counts': dict, 'attempts': int}, ...]
             """
             # execute_async_script ile tarayıcı içinde fetch + DOMParser çalıştır
             js = """
                 const courses = arguments[0];
-                const concurrency = arguments[1] || 5;
+                const concurrency = Math.max(1, arguments[1] || 5);
+                const opts = arguments[2] || {};
+                const timeoutMs = opts.timeoutMs || 30000;
+                const retries = opts.retries || 0;
+                const backoffMs = opts.backoffMs || 500;
+                const minLimit = Math.max(1, opts.minConcurrency || concurrency);
+                const maxLimit = Math.max(minLimit, opts.maxConcurrency || concurrency);
+                const backoffFactor = opts.backoffFactor || 0.5;
                 const callback = arguments[arguments.length - 1];
 
-                const worker = async (items) => {
-                    const results = [];
-                    for (const it of items) {
-                        try {
-                            const r = await fetch(it.url, { credentials: 'include' });
-                            const html = await r.text();
-                            // Dış kaynaklar yüklenmez; sadece metin.
-                            const doc = new DOMParser().parseFromString(html, 'text/html');
-
-                            const h5pDivs   = doc.querySelectorAll('div.h5p-placeholder:not(:has(div.hiddenactivity))').length;
-                            const resources = doc.querySelectorAll('li.resource:not(:has(div.hiddenactivity))').length;
-                            const h5pLis    = doc.querySelectorAll('li.h5pactivity:not(:has(div.hiddenactivity))').length;
-                            const assigns   = doc.querySelectorAll('li.modtype_assign:not(:has(div.hiddenactivity))').length;
-                            const videos    = doc.querySelectorAll('div.video-js:has(video):not(:has(audio)):not(:has(.hiddenactivity))').length;
-
-
-                            const total = h5pDivs + resources + h5pLis + assigns + videos;
-                            results.push({ title: it.title || '', url: it.url, total });
-                        } catch(e) {
-                            results.push({ title: it.title || '', url: it.url, total: 0, error: String(e) });
-                        }
+                const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+                // AIMD: başarıda sınır 1/sınır artar; 429/503/5xx/ağ hatasında (en fazla 100 ms'de bir) azalır
+                let limit = Math.min(maxLimit, Math.max(minLimit, concurrency));
+                let pausedUntil = 0;
+                let lastDecrease = 0;
+                const feedback = (ok, retryAfterMs) => {
+                    const now = performance.now();
+                    if (ok) {
+                        limit = Math.min(maxLimit, limit + 1 / limit);
+                        return;
+                    }
+                    if (retryAfterMs) pausedUntil = Math.max(pausedUntil, now + retryAfterMs);
+                    if (now - lastDecrease > 100) {
+                        lastDecrease = now;
+                        limit = Math.max(minLimit, limit * backoffFactor);
                     }
-                    return results;
                 };
 
-                (async () => {
-                    const buckets = [];
-                    for (let i = 0; i < courses.length; i += concurrency) {
-                        buckets.push(courses.slice(i, i + concurrency));
+                // Tek istek: zaman aşımında iptal edilir; 5xx/429 ve ağ hataları tekrar denenebilir sayılır.
+                // Her denemenin süresi ve durum kodu (ağ hatasında 0) samples'a yazılır.
+                const fetchOnce = async (url, samples) => {
+                    const ctrl = new AbortController();
+                    const timer = setTimeout(() => ctrl.abort(), timeoutMs);
+                    const started = performance.now();
+                    try {
+                        const r = await fetch(url, { credentials: 'include', signal: ctrl.signal });
+                        samples.push([performance.now() - started, r.status]);
+                        if (!r.ok) {
+                            const err = new Error('HTTP ' + r.status);
+                            err.retryable = r.status >= 500 || r.status === 429;
+                            const retryAfter = parseInt(r.headers.get('Retry-After') || '', 10);
+                            err.retryAfterMs = isNaN(retryAfter) ? 0 : retryAfter * 1000;
+                            throw err;
+                        }
+                        feedback(true);
+                        return await r.text();
+                    } catch (e) {
+                        if (e.retryable === undefined) {
+                            e.retryable = true;  // ağ hatası / zaman aşımı
+                            samples.push([performance.now() - started, 0]);
+                        }
+                        if (e.retryable) feedback(false, e.retryAfterMs);
+                        throw e;
+                    } finally {
+                        clearTimeout(timer);
                     }
+                };
 
-                    const out = [];
-                    for (const b of buckets) {
-                        const chunk = await worker(b);
-                        out.push(...chunk);
+                const countHtml = (html) => {
+                    // Dış kaynaklar yüklenmez; sadece metin.
+                    const doc = new DOMParser().parseFromString(html, 'text/html');
+
+                    // Alan adları course_analyzer.CourseCounts ile aynı
+                    return {
+                        h5p_placeholders: doc.querySelectorAll('div.h5p-placeholder:not(:has(div.hiddenactivity))').length,
+                        resources:        doc.querySelectorAll('li.resource:not(:has(div.hiddenactivity))').length,
+                        h5p_activities:   doc.querySelectorAll('li.h5pactivity:not(:has(div.hiddenactivity))').length,
+                        assignments:      doc.querySelectorAll('li.modtype_assign:not(:has(div.hiddenactivity))').length,
+                        videos:           doc.querySelectorAll('div.video-js:has(video):not(:has(audio)):not(:has(.hiddenactivity))').length,
+                    };
+                };
+                const sumCounts = (c) => Object.values(c).reduce((a, b) => a + b, 0);
+
+                const processOne = async (it) => {
+                    let attempt = 0;
+                    const started = performance.now();
+                    const samples = [];
+                    while (true) {
+                        attempt++;
+                        try {
+                            const html = await fetchOnce(it.url, samples);
+                            const fetchMs = performance.now() - started;
+                            const counts = countHtml(html);
+                            return { title: it.title || '', url: it.url, total: sumCounts(counts), counts, attempts: attempt,
+                                     fetchMs, parseMs: performance.now() - started - fetchMs, bytes: html.length, samples };
+                        } catch (e) {
+                            if (!e.retryable || attempt > retries) {
+                                return { title: it.title || '', url: it.url, total: 0, counts: null, attempts: attempt, error: String(e),
+                                         fetchMs: performance.now() - started, parseMs: 0, bytes: 0, samples };
+                            }
+                            await sleep(Math.max(backoffMs * Math.pow(2, attempt - 1), e.retryAfterMs || 0));
+                        }
                     }
+                };
+
+                (async () => {
+                    const out = new Array(courses.length);
+                    let next = 0;
+                    let active = 0;
+                    // Biten işin yerine sıradaki başlar; havadaki istek sayısı o anki sınırı izler
+                    await new Promise(resolve => {
+                        const pump = () => {
+                            if (next >= courses.length && active === 0) return resolve();
+                            const wait = pausedUntil - performance.now();
+                            if (wait > 0) {
+                                setTimeout(pump, wait);
+                                return;
+                            }
+                            while (next < courses.length && active < Math.floor(limit)) {
+                                const i = next++;
+                                active++;
+                                processOne(courses[i]).then(res => {
+                                    out[i] = res;
+                                    active--;
+                                    pump();
+                                });
+                            }
+                        };
+                        pump();
+                    });
                     callback(out);
                 })();
             """
+            limiter = get_limiter(self.base_url)
+            if limiter is not None and concurrency is None:
+                concurrency = limiter.capacity()
+                bounds = {'minConcurrency': int(limiter.min_limit), 'maxConcurrency': int(limiter.max_limit),
+                          'backoffFactor': limiter.backoff}
+            else:
+                concurrency = concurrency or config.COURSE_FETCH_CONCURRENCY
+                bounds = {'minConcurrency': concurrency, 'maxConcurrency': concurrency}
+            opts = dict(bounds, **{
+                'timeoutMs': int(config.HTTP_TIMEOUT * 1000),
+                'retries': config.FETCH_RETRIES,
+                'backoffMs': int(config.FETCH_BACKOFF * 1000),
+            })
             try:
                 WebDriverWait(self.driver, timeout_sec).until(
                     lambda d: d.execute_script('return document.readyState') in ('interactive','complete')
                 )
-                results = self.driver.execute_async_script(js, courses, concurrency)
-                return results
+                # Varsayılan script zaman aşımı (30 sn) büyük seviyelerde yetmiyor
+                self.driver.set_script_timeout(timeout_sec)
+                results = self.driver.execute_async_script(js, courses, concurrency, opts) or []
             except Exception as e:
                 print("fetch_course_counts_bulk hatası:", e)
                 return []
 
+            parent = self.tracer.current()
+            for res in results:
+                # Tarayıcıdaki isteklerin sonuçları sonraki seviyeler için limiter'a da yansıtılır
+                for ms, status in res.pop('samples', None) or []:
+                    if limiter is not None:
+                        limiter.observe(ms / 1000, status or None,
+                                        error=not status or (status >= 500 and status != 503))
+                span = self.tracer.record('course', (res.pop('fetchMs', 0) or 0) / 1000, parent=parent,
+                                          title=res.get('title', ''), url=res.get('url'), bytes=res.pop('bytes', 0) or 0,
+                                          retries=max(0, (res.get('attempts') or 1) - 1), error=res.get('error'))
+                self.tracer.record('parse', (res.pop('parseMs', 0) or 0) / 1000, parent=span)
+            return results
+
+
+    def export_cookies(self):
+        """Tarayıcı oturumunun çerezlerini döndürür."""
+        if not self.driver:
+            return []
+        return [{
+            'name': c['name'],
+            'value': c['value'],
+            'domain': c.get('domain'),
+            'path': c.get('path', '/'),
+            'secure': c.get('secure', False),
+        } for c in self.driver.get_cookies()]
+
+    def import_cookies(self, cookies):
+        """
+        Başka bir oturumdan (ör. HTTP motoru) alınmış çerezleri tarayıcıya yükler.
+        add_cookie sadece aynı domain açıkken çalıştığı için önce kök adrese gidilir.
+        """
+        if not self.driver or not cookies:
+            return False
+        self.driver.get(self.base_url)
+        WebDriverWait(self.driver, 60).until(
+            lambda d: d.execute_script('return document.readyState') in ('interactive', 'complete')
+        )
+        for c in cookies:
+            cookie = {'name': c['name'], 'value': c['value'], 'path': c.get('path') or '/'}
+            if c.get('domain'):
+                cookie['domain'] = c['domain']
+            if c.get('secure'):
+                cookie['secure'] = True
+            try:
+                self.driver.add_cookie(cookie)
+            except WebDriverException as e:
+                print(f"Çerez yüklenemedi ({c['name']}): {e}")
+        return True
+
+    def restore_session(self, cookies, dashboard_url):
+        """Önbellekteki çerezleri yükler; dashboard giriş sayfasına yönlenmiyorsa oturum geçerlidir."""
+        if not self.import_cookies(cookies):
+            return False
+        try:
+            self.driver.get(dashboard_url)
+            WebDriverWait(self.driver, 60).until(
+                lambda d: d.execute_script('return document.readyState') in ('interactive', 'complete')
+            )
+        except (TimeoutException, WebDriverException) as e:
+            print(f"Önbellekteki oturum doğrulanamadı: {e}")
+            return False
+        if "login/index.php" in self.driver.current_url:
+            self.driver.delete_all_cookies()
+            return False
+        self.dashboard_url = dashboard_url
+        return True
 
     def close_driver(self):
-        """WebDriver'ı kapatır."""
+        """WebDriver'ı kapatır; havuzdan alındıysa temizleyip havuza iade eder."""
         if self.driver:
-            print("WebDriver kapatılıyor.")
-
-            self.driver.quit()
+            if self._pooled:
+                print("WebDriver havuza iade ediliyor.")
+                origin = '{0.scheme}://{0.netloc}'.format(urlsplit(self.base_url))
+                get_driver_pool().release(self.driver, origins=[origin])
+            else:
+                print("WebDriver kapatılıyor.")
+                self.driver.quit()
+            self.driver = None
+            self._pooled = False
@@ -0,0 +1,66 @@
+# skill_classifier.py
+# Kurs başlığından beceri (D/O/Y/K) ve seviye kodu tespiti. Desenler modül yüklenirken bir kez derlenir.
+
+import re
+from functools import lru_cache
+
+# Öncelik sırası önemli: bir başlıkta birden fazla beceri geçerse listedeki ilk beceri seçilir
+SKILL_SYNONYMS = {
+    'D': ('dinleme', 'listening'),
+    'O': ('okuma', 'reading'),
+    'Y': ('yazma', 'writing'),
+    'K': ('konusma', 'speaking'),
+}
+SKILL_PRIORITY = {code: i for i, code in enumerate(SKILL_SYNONYMS)}
+
+# Türkçe harfleri ASCII karşılığına indirger. str.lower() 'İ'yi 'i̇' (noktalı, iki karakter) yaptığı için
+# 'DİNLEME' eski kodda eşleşmiyordu; 'I' ise İngilizce başlıklar bozulmasın diye 'ı' değil 'i' olur.
+_TR_FOLD = str.maketrans({
+    'İ': 'i', 'I': 'i', 'ı': 'i',
+    'Ş': 's', 'ş': 's',
+    'Ç': 'c', 'ç': 'c',
+    'Ğ': 'g', 'ğ': 'g',
+    'Ö': 'o', 'ö': 'o',
+    'Ü': 'u', 'ü': 'u',
+})
+
+# Tüm eş anlamlılar tek alternasyonda; grup adı beceri kodu. Başlık tek geçişte taranır.
+SKILL_RE = re.compile(
+    r'\b(?:' + '|'.join(
+        f"(?P<{code}>{'|'.join(map(re.escape, words))})" for code, words in SKILL_SYNONYMS.items()
+    ) + r')\b'
+)
+
+LEVEL_RE = re.compile(r'\b(A1|A2|B1|B2|C1|C2)\b', re.IGNORECASE)
+
+
+def normalize_title(title):
+    """Türkçe duyarlı küçük harfe çevirme + aksan katlama (konuşma -> konusma, DİNLEME -> dinleme)."""
+    return (title or '').translate(_TR_FOLD).lower()
+
+
+@lru_cache(maxsize=4096)
+def classify_title(title):
+    """
+    Başlıktaki beceri kodunu ('D', 'O', 'Y', 'K') ya da None döndürür.
+    Eski "reading skills" yedek deseni, 'reading' kelimesi zaten ana desende olduğu için gereksizdir.
+    """
+    best = None
+    for m in SKILL_RE.finditer(normalize_title(title)):
+        code = m.lastgroup
+        if best is None or SKILL_PRIORITY[code] < SKILL_PRIORITY[best]:
+            best = code
+            if SKILL_PRIORITY[code] == 0:
+                break
+    return best
+
+
+def classify_titles(titles):
+    """Başlık listesini tek çağrıda sınıflandırır; sonuçlar girdi sırasıyla döner."""
+    return [classify_title(t or '') for t in titles]
+
+
+def detect_level_code(level_name):
+    """'İngilizce B1 Seviyesi' -> 'B1'; seviye kodu yoksa None."""
+    m = LEVEL_RE.search(level_name or '')
+    return m.group(0).upper() if m else None
@@ -0,0 +1,227 @@
+# snapshots.py
+# Kazıma sonucunun (kurs bazında sayımlar + üst bilgi) sürümlü, sıkıştırılmış anlık görüntüsü.
+# Rapor biçimlendirmesi (minimum değerler, detay sayfası, karşılaştırma) kazıma yapmadan bu kayıttan üretilir.
+# latest.json her dil için en son kazındığı anlık görüntüyü tutar; "son anlık görüntüyü kullan" modu
+# taze dilleri buradan verir, sadece eskimiş dilleri yeniden kazır.
+
+import datetime
+import gzip
+import json
+import os
+import re
+import time
+from zoneinfo import ZoneInfo
+
+import config
+from cache import account_key
+from course_analyzer import CourseCounts
+from pipeline import aggregate_doyk
+
+SNAPSHOT_VERSION = 1
+COUNT_FIELDS = tuple(CourseCounts.__dataclass_fields__)
+
+_ID_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+class SnapshotNotFound(Exception):
+    """İstenen anlık görüntü yok, süresi dolmuş ya da okunamıyor."""
+
+
+def _path(snapshot_id):
+    if not _ID_RE.match(snapshot_id or ''):
+        raise SnapshotNotFound(f"Geçersiz anlık görüntü ID'si: {snapshot_id!r}")
+    return os.path.join(config.SNAPSHOT_DIR, f'{snapshot_id}.json.gz')
+
+
+def _encode_courses(all_scraped_courses):
+    """{dil: {seviye: [kurs, ...]}} -> {dil: {seviye: [[başlık, url, toplam, [sayımlar] | None], ...]}}"""
+    encoded = {}
+    for lang, levels in all_scraped_courses.items():
+        for level_code, courses in levels.items():
+            rows = []
+            for c in courses or []:
+                counts = c.get('counts')
+                rows.append([
+                    c.get('title', '') or '',
+                    c.get('url') or '',
+                    int(c.get('total_resources_from_js', 0) or 0),
+                    [counts.get(f, 0) for f in COUNT_FIELDS] if counts else None,
+                ])
+            encoded.setdefault(lang, {})[level_code] = rows
+    return encoded
+
+
+def _decode_courses(encoded):
+    decoded = {}
+    for lang, levels in encoded.items():
+        for level_code, rows in levels.items():
+            decoded.setdefault(lang, {})[level_code] = [{
+                'title': title,
+                'url': url,
+                'total_resources_from_js': total,
+                'counts': dict(zip(COUNT_FIELDS, counts)) if counts else None,
+            } for title, url, total, counts in rows]
+    return decoded
+
+
+def save_snapshot(snapshot_id, username, selected_languages, all_scraped_courses, scraped_languages=None):
+    """
+    Anlık görüntüyü yazar (önce geçici dosyaya, sonra atomik olarak yerine) ve ID'sini döndürür.
+    scraped_languages (varsayılan: kursu olan tüm diller) bu çalıştırmada gerçekten kazınan dillerdir;
+    latest.json'da bu diller yeni görüntüyü gösterecek şekilde güncellenir. Başka görüntülerden alınmış
+    diller verilmemelidir, yoksa eski veri taze görünür.
+    """
+    os.makedirs(config.SNAPSHOT_DIR, exist_ok=True)
+    doc = {
+        'version': SNAPSHOT_VERSION,
+        'id': snapshot_id,
+        'created_at': datetime.datetime.now(ZoneInfo("Europe/Istanbul")).isoformat(),
+        'site': config.UZEM_BASE_URL,
+        'account': account_key(username),
+        'languages': sorted(set(selected_languages or [])),
+        'allowed_levels': config.ALLOWED_LEVELS,
+        'count_fields': list(COUNT_FIELDS),
+        'courses': _encode_courses(all_scraped_courses),
+    }
+    path = _path(snapshot_id)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+        json.dump(doc, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp, path)
+    if scraped_languages is None:
+        scraped_languages = [lang for lang, levels in all_scraped_courses.items() if levels]
+    _update_latest(snapshot_id, doc['created_at'], scraped_languages)
+    prune_snapshots()
+    return snapshot_id
+
+
+def _latest_path():
+    return os.path.join(config.SNAPSHOT_DIR, 'latest.json')
+
+
+def _read_latest():
+    try:
+        with open(_latest_path(), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _update_latest(snapshot_id, created_at, languages):
+    # Eşzamanlı iki görevden birinin güncellemesi kaybolabilir; o dil sonraki istekte yeniden kazınır
+    if not languages:
+        return
+    latest = _read_latest()
+    for lang in languages:
+        latest[lang] = {'snapshot_id': snapshot_id, 'created_at': created_at, 'timestamp': time.time()}
+    tmp = f'{_latest_path()}.{os.getpid()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(latest, f, ensure_ascii=False)
+    os.replace(tmp, _latest_path())
+
+
+def latest_snapshots(languages=None, max_age=None):
+    """
+    Dillerin en son anlık görüntüleri: ({dil: snapshot_id} taze olanlar, [dil] eskimiş ya da hiç olmayanlar).
+    languages boşsa latest.json'daki tüm diller. Dosyası silinmiş görüntüler eskimiş sayılır.
+    """
+    max_age = config.SNAPSHOT_FRESHNESS if max_age is None else max_age
+    latest = _read_latest()
+    fresh, stale = {}, []
+    for lang in languages or sorted(latest):
+        entry = latest.get(lang)
+        if (entry and time.time() - entry.get('timestamp', 0) <= max_age
+                and os.path.exists(_path(entry['snapshot_id']))):
+            fresh[lang] = entry['snapshot_id']
+        else:
+            stale.append(lang)
+    return fresh, stale
+
+
+def compose_courses(language_snapshots):
+    """
+    {dil: snapshot_id} -> ({dil: {seviye: [kurs, ...]}}, en eski oluşturma zamanı).
+    Aynı görüntü birden fazla dil için bir kez okunur; okunamazsa SnapshotNotFound.
+    """
+    loaded = {}
+    courses = {}
+    for lang, snapshot_id in language_snapshots.items():
+        if snapshot_id not in loaded:
+            loaded[snapshot_id] = load_snapshot(snapshot_id)
+        courses[lang] = loaded[snapshot_id]['courses'].get(lang, {})
+    created = min((s['created_at'] for s in loaded.values()), default=None)
+    return courses, created
+
+
+def load_snapshot(snapshot_id):
+    """
+    Anlık görüntüyü okur: {'id', 'created_at', ..., 'courses': {dil: {seviye: [kurs, ...]}},
+    'data': {dil: {seviye: {'D','O','Y','K'}}}}. Özet sayımlar kurs satırlarından yeniden hesaplanır.
+    """
+    try:
+        with gzip.open(_path(snapshot_id), 'rt', encoding='utf-8') as f:
+            doc = json.load(f)
+    except (OSError, ValueError) as e:
+        raise SnapshotNotFound(f"Anlık görüntü okunamadı ({snapshot_id}): {e}")
+    if doc.get('version') != SNAPSHOT_VERSION:
+        raise SnapshotNotFound(f"Desteklenmeyen anlık görüntü sürümü: {doc.get('version')}")
+
+    courses = _decode_courses(doc['courses'])
+    doc['courses'] = courses
+    doc['data'] = aggregate_doyk(courses)
+    return doc
+
+
+def prune_snapshots(max_age=None):
+    """config.SNAPSHOT_MAX_AGE'den eski anlık görüntüleri siler."""
+    max_age = config.SNAPSHOT_MAX_AGE if max_age is None else max_age
+    cutoff = time.time() - max_age
+    try:
+        names = os.listdir(config.SNAPSHOT_DIR)
+    except OSError:
+        return
+    for name in names:
+        path = os.path.join(config.SNAPSHOT_DIR, name)
+        try:
+            if name.endswith('.json.gz') and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def diff_snapshots(base, current):
+    """
+    İki anlık görüntü arasındaki değişim.
+    Dönüş: {'base_id', 'current_id', 'summary': [(dil, seviye, beceri, önceki, şimdiki), ...],
+            'courses': [(dil, seviye, başlık, url, önceki, şimdiki), ...]} (sadece değişenler kursta).
+    """
+    summary = []
+    langs = list(current['data']) + [l for l in base['data'] if l not in current['data']]
+    for lang in langs:
+        old_levels, new_levels = base['data'].get(lang, {}), current['data'].get(lang, {})
+        levels = list(new_levels) + [lv for lv in old_levels if lv not in new_levels]
+        for level_code in levels:
+            for skill in ('D', 'O', 'Y', 'K'):
+                summary.append((lang, level_code, skill,
+                                old_levels.get(level_code, {}).get(skill, 0),
+                                new_levels.get(level_code, {}).get(skill, 0)))
+
+    def by_url(snapshot):
+        rows = {}
+        for lang, levels in snapshot['courses'].items():
+            for level_code, courses in levels.items():
+                for c in courses:
+                    rows[(lang, level_code, c['url'])] = c
+        return rows
+
+    old_rows, new_rows = by_url(base), by_url(current)
+    courses = []
+    for key in list(new_rows) + [k for k in old_rows if k not in new_rows]:
+        old, new = old_rows.get(key), new_rows.get(key)
+        old_total = old['total_resources_from_js'] if old else None
+        new_total = new['total_resources_from_js'] if new else None
+        if old_total != new_total:
+            title = (new or old)['title']
+            courses.append((key[0], key[1], title, key[2], old_total, new_total))
+
+    return {'base_id': base['id'], 'current_id': current['id'], 'summary': summary, 'courses': courses}
@@ -0,0 +1,96 @@
+# task_events.py
+# Görev ilerleme olaylarının Redis'te saklanması (kaldığı yerden devam için liste) ve
+# canlı dağıtımı (pub/sub). /task-events SSE endpoint'i buradaki stream() ile beslenir.
+
+import json
+import time
+
+import redis
+
+import config
+from cache import get_redis
+
+
+def log_key(task_id):
+    return f'uzem:task:{task_id}:events'
+
+
+def channel(task_id):
+    return f'uzem:task:{task_id}:live'
+
+
+def publish_events(task_id, events, client=None):
+    """
+    Olayları listeye ekler ve abonelere yayınlar. Olay ID'si listedeki sırasıdır (0'dan başlar),
+    böylece bağlantısı kopan istemci Last-Event-ID ile kaldığı yerden devam edebilir.
+    """
+    if not events:
+        return
+    client = client or get_redis()
+    payloads = [json.dumps(e) for e in events]
+    try:
+        length = client.rpush(log_key(task_id), *payloads)
+        client.expire(log_key(task_id), config.TASK_EVENTS_TTL)
+        first_id = length - len(payloads)
+        for offset, payload in enumerate(payloads):
+            client.publish(channel(task_id), json.dumps({'id': first_id + offset, 'event': json.loads(payload)}))
+    except redis.RedisError as e:
+        print(f"Görev olayları yayınlanamadı: {e}")
+
+
+def reset(task_id, client=None):
+    """Görevin olay listesini siler; aynı ID ile yeniden başlatılan görevin olayları 0'dan başlar."""
+    client = client or get_redis()
+    try:
+        client.delete(log_key(task_id))
+    except redis.RedisError as e:
+        print(f"Görev olayları silinemedi: {e}")
+
+
+def _format_sse(event_id, event):
+    return f"id: {event_id}\nevent: {event.get('type', 'log')}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+def stream(task_id, offset=0, client=None, keepalive=15):
+    """
+    SSE metni üreten generator. Önce kanala abone olur, sonra listedeki `offset`'ten itibaren
+    birikmiş olayları gönderir, ardından canlı olayları aktarır. 'end' olayında biter.
+    Abonelik listeden önce açıldığı için arada yayınlanan olay kaybolmaz; tekrarlar ID ile elenir.
+    """
+    client = client or get_redis()
+    pubsub = client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(channel(task_id))
+    next_id = max(0, offset)
+    try:
+        for raw in client.lrange(log_key(task_id), next_id, -1):
+            event = json.loads(raw)
+            yield _format_sse(next_id, event)
+            next_id += 1
+            if event.get('type') == 'end':
+                return
+
+        last_sent = time.monotonic()
+        while True:
+            message = pubsub.get_message(timeout=1.0)
+            if message is None:
+                if time.monotonic() - last_sent >= keepalive:
+                    # Proxy'lerin bağlantıyı boşta diye kapatmaması için yorum satırı
+                    yield ': keepalive\n\n'
+                    last_sent = time.monotonic()
+                continue
+            data = json.loads(message['data'])
+            if data['id'] < next_id:
+                continue
+            if data['id'] > next_id:
+                # Yayında kaybolan olay varsa listeden tamamla
+                for raw in client.lrange(log_key(task_id), next_id, data['id'] - 1):
+                    yield _format_sse(next_id, json.loads(raw))
+                    next_id += 1
+            event = data['event']
+            yield _format_sse(data['id'], event)
+            next_id = data['id'] + 1
+            last_sent = time.monotonic()
+            if event.get('type') == 'end':
+                return
+    finally:
+        pubsub.close()
@@ -0,0 +1,80 @@
+# task_signatures.py
+# Celery uygulama nesnesi, ayarları, beat zamanlaması ve görevlerin adıyla (send_task) kuyruğa verilmesi.
+# Görev kodunu (tasks.py: Selenium, HTTP motoru, rapor yazıcı) içe aktarmaz; Flask ve celery beat süreçleri
+# sadece bunu yükler. Worker tasks.py'yi yükler, görevler buradaki uygulama nesnesine kaydedilir.
+
+import redis
+from celery import Celery
+from celery.schedules import crontab
+
+import config
+from scheduler import JobScheduler, job_class
+
+# tasks.py'deki görevlerin adları (Celery modül adı + fonksiyon adı)
+START_SCRAPE_TASK = 'tasks.start_scrape_process'
+DISPATCH_TASK = 'tasks.dispatch_scheduled_jobs'
+PRECOMPUTE_TASK = 'tasks.precompute_snapshots'
+
+celery_app = Celery('tasks', broker=config.REDIS_URL, backend=config.REDIS_URL)
+# Görevler bitince onaylanır (acks_late); worker düşerse mesaj görünürlük süresi sonunda yeniden verilir.
+# Uzun görevlerde worker önceden mesaj biriktirmesin.
+celery_app.conf.update(
+    broker_transport_options={'visibility_timeout': config.JOB_VISIBILITY_TIMEOUT},
+    worker_prefetch_multiplier=1,
+    timezone='Europe/Istanbul',
+)
+
+# celery beat ayrı süreçte çalışır. Zamanlayıcı sırası düzenli aralıkla gözden geçirilir (düşen worker'ın
+# kiralaması dolunca yer açılır); servis hesabı verilmişse tüm diller yoğun olmayan saatte önceden kazınır.
+celery_app.conf.beat_schedule = {}
+if config.SCHEDULER_ENABLED:
+    celery_app.conf.beat_schedule['dispatch-scheduled-jobs'] = {
+        'task': DISPATCH_TASK,
+        'schedule': config.SCHED_DISPATCH_INTERVAL,
+    }
+if config.PRECOMPUTE_USERNAME:
+    _minute, _hour, _day_of_month, _month_of_year, _day_of_week = config.PRECOMPUTE_CRON.split()
+    celery_app.conf.beat_schedule['precompute-snapshots'] = {
+        'task': PRECOMPUTE_TASK,
+        'schedule': crontab(minute=_minute, hour=_hour, day_of_month=_day_of_month,
+                            month_of_year=_month_of_year, day_of_week=_day_of_week),
+    }
+
+
+def send_scrape(task_id, args, kwargs=None, queue=None):
+    """start_scrape_process'i görev kodunu yüklemeden verilen ID ile kuyruğa gönderir."""
+    return celery_app.send_task(START_SCRAPE_TASK, args=args, kwargs=kwargs, task_id=task_id, queue=queue)
+
+
+def submit_job(task_id, username, args, kwargs=None):
+    """
+    start_scrape_process işini zamanlayıcıya verir ve hemen başlatılabiliyorsa Celery'ye gönderir.
+    args start_scrape_process'in konumsal argümanlarıdır (4. eleman seçilen diller, sınıfı belirler).
+    Görev sırada bekliyorsa sıradaki yerini (JobScheduler.position), başlatıldıysa None döndürür.
+    Zamanlayıcı kapalıysa ya da Redis'e yazılamazsa iş doğrudan sınıfının kuyruğuna gönderilir.
+    """
+    cls = job_class(args[3])
+    if config.SCHEDULER_ENABLED:
+        scheduler = JobScheduler()
+        try:
+            scheduler.submit(task_id, username, cls, args, kwargs)
+        except redis.RedisError as e:
+            print(f"İş zamanlayıcıya eklenemedi, doğrudan kuyruğa veriliyor: {e}")
+        else:
+            dispatch_jobs()
+            return scheduler.position(task_id)
+    send_scrape(task_id, args, kwargs, cls)
+    return None
+
+
+def dispatch_jobs():
+    """Sınırlar elverdiğince sıradaki işleri sınıflarının Celery kuyruğuna gönderir."""
+    if not config.SCHEDULER_ENABLED:
+        return
+    try:
+        jobs = JobScheduler().take_ready()
+    except redis.RedisError as e:
+        print(f"Zamanlayıcı sırası işlenemedi: {e}")
+        return
+    for job in jobs:
+        send_scrape(job['task_id'], job['args'], job['kwargs'], job['job_class'])
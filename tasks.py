@@ -1,106 +1,68 @@
 # tasks.py
-import re
-import time
+# Worker görevleri. Celery uygulama nesnesi task_signatures'tadır (web ve beat görevleri oradan adla gönderir).
+# Kazıma yığını (Selenium, HTTP motoru) ilk görevde yüklenir; worker açılışı ve bu modülü yükleyen diğer
+# süreçler onu taşımaz.
 import os
+import queue
+import sqlite3
+import sys
+import threading
+import uuid
 import datetime
 from zoneinfo import ZoneInfo
-from celery import Celery
-from scraper_refactored import UzemScraper 
-from openpyxl import Workbook
-from openpyxl.styles import Alignment, Border, Side, PatternFill
-
-
-celery_app = Celery('tasks', broker='redis://redis:6379/0', backend='redis://redis:6379/0')
-
-def create_excel_report(data, minimum_values, task_id):
-    """Verilen dataya göre biçimlendirilmiş bir Excel raporu oluşturur ve kaydeder."""
-    output_folder = 'output'
-    if not os.path.exists(output_folder):
-        os.makedirs(output_folder)
-    
-    now = datetime.datetime.now(ZoneInfo("Europe/Istanbul"))
-    timestamp = now.strftime("%d-%m-%Y_%H-%M")
-    filename = os.path.join(output_folder, f'UZEM_DOYK_{timestamp}.xlsx')
-    workbook = Workbook()
-    sheet = workbook.active
-    sheet.title = 'DOYK Analizi'
-
-    # Stil tanımlamaları
-    thin_border = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin'))
-    center_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
-    warning_fill = PatternFill(start_color="FFEBEE", end_color="FFEBEE", fill_type="solid")
-
-    # Sütun genişlikleri
-    sheet.column_dimensions['A'].width = 15
-    sheet.column_dimensions['B'].width = 10
-    sheet.column_dimensions['C'].width = 5
-    sheet.column_dimensions['D'].width = 5
-    sheet.column_dimensions['E'].width = 5
-    sheet.column_dimensions['F'].width = 5
-
-    current_row = 1
-    for language, levels_data in data.items():
-        if not levels_data: continue
-
-        # Her dil bloğundan önce boş satır bırak
-        if current_row > 1:
-            current_row += 1
-        
-        # Başlıklar
-        sheet.cell(row=current_row, column=3, value="DOYK").alignment = center_align
-        sheet.merge_cells(start_row=current_row, start_column=3, end_row=current_row, end_column=6)
-        
-        header_row = current_row + 1
-        sheet.cell(row=header_row, column=1, value="Dil").alignment = center_align
-        sheet.cell(row=header_row, column=2, value="Seviye").alignment = center_align
-        sheet.cell(row=header_row, column=3, value="D").alignment = center_align
-        sheet.cell(row=header_row, column=4, value="O").alignment = center_align
-        sheet.cell(row=header_row, column=5, value="Y").alignment = center_align
-        sheet.cell(row=header_row, column=6, value="K").alignment = center_align
-
-        for col in range(1, 7):
-            sheet.cell(row=current_row, column=col).border = thin_border
-            sheet.cell(row=header_row, column=col).border = thin_border
-
-        # Veri satırları
-        data_start_row = header_row + 1
-        min_value = minimum_values.get(language, 42)
-
-        sorted_levels = sorted(levels_data.keys(), key=lambda k: (k[0], int(k[1:])) if len(k) > 1 and k[1:].isdigit() else (k, 0))
-
-        for i, level_code in enumerate(sorted_levels):
-            row_num = data_start_row + i
-            doyk_counts = levels_data[level_code]
-            
-            sheet.cell(row=row_num, column=2, value=level_code).alignment = center_align
-            
-            col_map = {'D': 3, 'O': 4, 'Y': 5, 'K': 6}
-            for skill, col_idx in col_map.items():
-                cell = sheet.cell(row=row_num, column=col_idx)
-                value = doyk_counts.get(skill, 0)
-                cell.value = value
-                cell.alignment = center_align
-                if value < min_value:
-                    cell.fill = warning_fill
-            
-            for col in range(1, 7):
-                sheet.cell(row=row_num, column=col).border = thin_border
-        
-        # Dil adını birleştir ve ortala
-        if len(sorted_levels) > 0:
-            end_row = data_start_row + len(sorted_levels) - 1
-            sheet.merge_cells(start_row=data_start_row, start_column=1, end_row=end_row, end_column=1)
-            lang_cell = sheet.cell(row=data_start_row, column=1)
-            lang_cell.value = language
-            lang_cell.alignment = center_align
-
-        current_row = data_start_row + len(sorted_levels)
-    
-    workbook.save(filename)
-    return filename
-
-@celery_app.task(bind=True)
-def start_scrape_process(self, username, password, minimum_values, selected_languages):
+from celery.signals import worker_ready, worker_shutdown
+import config
+from cache import JobCache, LevelCheckpoint, LinkMapCache, SessionCache, job_fingerprint
+from driver_pool import DriverPoolTimeout
+from history import HistoryStore
+from metrics import MetricsStore, Tracer
+from pipeline import StageStats, aggregate_doyk
+from progress import ProgressReporter, WorkProgress
+from report_store import create_excel_report
+from scheduler import JobScheduler
+from skill_classifier import detect_level_code
+from snapshots import SnapshotNotFound, compose_courses, save_snapshot
+from task_signatures import celery_app, dispatch_jobs, submit_job
+
+
+def retryable_errors():
+    """Bu hatalarda görev aynı ID ile yeniden denenir; biten seviyeler kontrol noktasından alınır."""
+    import requests
+    from selenium.common.exceptions import WebDriverException
+
+    return (WebDriverException, DriverPoolTimeout, requests.ConnectionError, requests.Timeout)
+
+
+def level_key(item):
+    """Seviyenin kontrol noktasındaki anahtarı."""
+    return f"{item['lang']}/{item['level_name']}"
+
+
+@worker_ready.connect
+def prewarm_driver_pool(**kwargs):
+    # İlk görev oturum açma süresini beklemesin; açılış bloklanmasın diye arka planda.
+    # Önceden açılacak oturum yoksa Selenium ilk göreve kadar yüklenmez.
+    if config.SELENIUM_POOL_PREWARM <= 0:
+        return
+    from scraper_refactored import get_driver_pool
+
+    pool = get_driver_pool()
+    if pool is not None:
+        threading.Thread(target=pool.prewarm, args=(config.SELENIUM_POOL_PREWARM,), daemon=True).start()
+
+
+@worker_shutdown.connect
+def close_driver_pool(**kwargs):
+    # Konteynerdeki oturum yerlerini boşalt (scraper hiç yüklenmediyse açık oturum da yoktur)
+    scraper_module = sys.modules.get('scraper_refactored')
+    pool = scraper_module.get_driver_pool() if scraper_module else None
+    if pool is not None:
+        pool.close_all()
+
+@celery_app.task(bind=True, acks_late=True, reject_on_worker_lost=True,
+                 max_retries=config.JOB_MAX_RETRIES, default_retry_delay=config.JOB_RETRY_DELAY)
+def start_scrape_process(self, username, password, minimum_values, selected_languages, refresh_links=False,
+                         include_course_details=False, merge_snapshots=None):
     """
     Celery ana görevi:
       1) Giriş + linkleri çek
@@ -108,67 +70,109 @@ def start_scrape_process(self, username, password, minimum_values, selected_lang
       3) TR+EN başlıklardan beceri (D/O/Y/K) tespiti yap
       4) Excel raporunu üret
       5) Tüm uyarı/teşhis mesajlarını HTML log-area'ya da ilet
+    refresh_links=True ise önbellekteki dil/seviye link haritası yok sayılıp yeniden çekilir.
+    include_course_details=True ise Excel'e kurs bazında detay sayfası eklenir.
+    merge_snapshots ({dil: snapshot_id}) verilirse bu diller kazınmaz, kursları taze anlık görüntülerden
+    alınıp sonuca (rapor + yeni görüntü) eklenir; selected_languages sadece eskimiş dilleri içerir.
+    Biten her seviye Redis'e kontrol noktası olarak yazılır. Görev aynı ID ile yeniden çalıştığında
+    (geçici hatada otomatik yeniden deneme, worker düşmesi sonrası yeniden teslim ya da /resume-scrape)
+    yalnızca eksik seviyeler kazınır.
     """
 
+    # Kazıma yığını ilk görevde yüklenir (sonraki görevlerde modül önbellekten gelir)
+    from engines import create_scraper, open_session_pool
+    from fetch_pool import bounded_map
+
+    # self.request thread-local; seviye işçileri (ayrı thread/greenlet) için görev ID'sini baştan al
+    task_id = self.request.id
+
     # --- Yardımcılar ---
-    def update_status(progress, message):
-        # Arayüze ilerleme + log mesajı gönder
-        self.update_state(state='PROGRESS', meta={'progress': progress, 'log_message': message})
-        # Çok hızlı ardışık update'lerde UI'nin yetişebilmesi için küçük gecikme
-        time.sleep(0.3)
+    # Log satırları tamponlanır; backend'e zaman/satır sayısına göre toplu yazılır
+    reporter = ProgressReporter(self, task_id)
+
+    def update_status(progress, message, flush=True):
+        # Arayüze ilerleme + log mesajı gönder (faz geçişleri varsayılan olarak hemen yazılır)
+        reporter.update(progress, message, flush=flush)
 
     def send_log_to_frontend(progress, message):
         # Konsola da yaz, UI'ya da yolla
         print(message)
-        update_status(progress, message)
-
-    # TR + EN eşleşme desenleri (başlık içi)
-    SKILL_PATTERNS = {
-        'D': [r'\bdinleme\b', r'\blistening\b'],
-        'O': [r'\bokuma\b', r'\breading\b'],
-        'Y': [r'\byazma\b', r'\bwriting\b'],
-        'K': [r'\bkonuşma\b', r'\bkonusma\b', r'\bspeaking\b'],
-    }
-    SKILL_FALLBACK_RE = re.compile(r'\b(reading|writing|listening|speaking)\s+skill(s)?\b', re.IGNORECASE)
-    SKILL_WORD_TO_CODE = {'reading': 'O', 'writing': 'Y', 'listening': 'D', 'speaking': 'K'}
-
-    def detect_skill_from_title(title: str):
-        t = (title or '').lower()
-        for code, pats in SKILL_PATTERNS.items():
-            for p in pats:
-                if re.search(p, t, re.IGNORECASE):
-                    return code
-        m = SKILL_FALLBACK_RE.search(t)
-        if m:
-            return SKILL_WORD_TO_CODE.get(m.group(1).lower())
-        return None
-
-    LEVEL_RE = re.compile(r'\b(A1|A2|B1|B2|C1|C2)\b', re.IGNORECASE)
-
-    # Hangi dilde hangi seviyeler işlenecek (gerekirse özelleştir)
-    allowed_levels_config = {
-        'İngilizce': ['A1', 'A2', 'B1', 'B2', 'C1'],
-        'default':   ['A1', 'A2', 'B1']
-    }
+        reporter.update(progress, message)
+
+    # Kurs toplama aşamasının ilerlemesi biten iş birimlerinden (seviye sayfası + kurs sayfası) hesaplanır;
+    # seviye listesi belli olunca kurulur
+    work = None
+
+    def on_span_end(span):
+        if work is None:
+            return
+        if span.name == 'level_page':
+            reporter.update(work.level_discovered(span.parent_id, span.attrs.get('courses', 0)), None)
+        elif span.name == 'course':
+            reporter.update(work.course_done(), None)
+        elif span.name == 'level':
+            reporter.update(work.level_finished(span.id), None)
+
+    # connect > login > links > level > (level_page, course > parse) > aggregate > report
+    tracer = Tracer(on_end=on_span_end)
+    job_span = tracer.start('job')
+    status = 'FAILURE'
+    course_cache_stats = {'hits': 0, 'misses': 0}
+
+    # Aynı hesap + dil seçimiyle gelen sonraki istekler bu işe katılır ya da sonucunu kullanır (bkz. app.py)
+    fingerprint = job_fingerprint(username, selected_languages)
+    job_cache = JobCache()
+
+    checkpoint = LevelCheckpoint(task_id)
+    checkpoint.save_meta(username, password, {
+        'minimum_values': minimum_values,
+        'selected_languages': selected_languages,
+        'include_course_details': include_course_details,
+        'merge_snapshots': merge_snapshots,
+    })
+    retrying = False
 
     scraper = None
+    extra_sessions = []
     try:
         # 1) Giriş
         update_status(5, 'Sistem başlatılıyor...')
-        scraper = UzemScraper(username, password)
+        scraper = create_scraper(username, password)
+        scraper.tracer = tracer
 
         update_status(10, 'WebDriver bağlanıyor...')
-        if not scraper.connect_driver():
-            raise Exception("WebDriver başlatılamadı.")
-
-        update_status(15, 'Sisteme giriş yapılıyor...')
-        if not scraper.login():
-            raise Exception("Giriş başarısız. Lütfen kullanıcı adı/şifreyi kontrol edin.")
-
-        update_status(30, 'Dil seviyesi linkleri çekiliyor...')
-        language_data = scraper.get_language_level_links()
-        if not language_data:
-            raise Exception("Ana sayfadan dil seviyesi linkleri çekilemedi.")
+        with tracer.span('connect'):
+            if not scraper.connect_driver():
+                raise Exception("WebDriver başlatılamadı.")
+
+        # Aynı hesapla yakın zamanda açılmış oturum varsa etkileşimli girişi atla
+        with tracer.span('login') as span:
+            session_cache = SessionCache()
+            cached_session = session_cache.load(username, password)
+            if cached_session and scraper.restore_session(cached_session['cookies'], cached_session['dashboard_url']):
+                session_cache.touch(username)
+                span.set(cached=True)
+                update_status(15, 'Önbellekteki oturum kullanılıyor...')
+            else:
+                if cached_session:
+                    session_cache.invalidate(username)
+                update_status(15, 'Sisteme giriş yapılıyor...')
+                if not scraper.login():
+                    raise Exception("Giriş başarısız. Lütfen kullanıcı adı/şifreyi kontrol edin.")
+                session_cache.save(username, password, scraper.export_cookies(), scraper.dashboard_url)
+
+        with tracer.span('links') as span:
+            link_cache = LinkMapCache()
+            language_data = None if refresh_links else link_cache.get(username)
+            if language_data:
+                span.set(cached=True)
+                update_status(30, 'Dil seviyesi linkleri önbellekten alındı.')
+            else:
+                update_status(30, 'Dil seviyesi linkleri çekiliyor...')
+                language_data = scraper.get_language_level_links()
+                if not language_data:
+                    raise Exception("Ana sayfadan dil seviyesi linkleri çekilemedi.")
+                link_cache.set(username, language_data)
 
         if selected_languages:
             language_data = {lang: levels for lang, levels in language_data.items() if lang in selected_languages}
@@ -178,10 +182,9 @@ def start_scrape_process(self, username, password, minimum_values, selected_lang
         # 2) İşlenecek seviye listesi
         levels_to_process = []
         for lang, levels in language_data.items():
-            target_levels = allowed_levels_config.get(lang, allowed_levels_config['default'])
+            target_levels = config.ALLOWED_LEVELS.get(lang, config.ALLOWED_LEVELS['default'])
             for level_name, level_url in levels.items():
-                m = LEVEL_RE.search(level_name or '')
-                level_code = (m.group(0).upper() if m else None)
+                level_code = detect_level_code(level_name)
                 if level_code and level_code in target_levels:
                     levels_to_process.append({
                         'lang': lang,
@@ -196,73 +199,207 @@ def start_scrape_process(self, username, password, minimum_values, selected_lang
         if total_levels == 0:
             raise Exception("İşlenecek uygun seviye bulunamadı.")
 
-        update_status(30, f'Toplam {total_levels} seviye için kurslar toplanacak...')
-
-        # 3) Kursları topla (hafif yöntemlerle)
-        all_scraped_courses = {}  # {lang: {level_code: [ {title, url, total_resources_from_js}, ... ]}}
-        for idx, item in enumerate(levels_to_process, start=1):
-            lang, level_name, level_code, level_url = item['lang'], item['level_name'], item['level_code'], item['level_url']
-            prog = 30 + int(50 * (idx-1) / total_levels)
-            update_status(prog, f"İşleniyor: {lang} - {level_name} ({level_code})")
-
-            if lang not in all_scraped_courses:
-                all_scraped_courses[lang] = {}
-            if level_code not in all_scraped_courses[lang]:
-                all_scraped_courses[lang][level_code] = []
-
-            courses_in_level = scraper.scrape_doyk_content(level_url) or []
-            if not courses_in_level:
-                send_log_to_frontend(prog, f"[WARN] Kurs bulunamadı: {lang} - {level_name} ({level_code})")
+        # Önceki çalıştırmada (aynı görev ID'si) biten seviyeler yeniden kazınmaz
+        restored = checkpoint.load_levels()
+        pending_levels = [item for item in levels_to_process if level_key(item) not in restored]
+        work = WorkProgress(total_levels, 30, 80)
+        if restored:
+            for item in levels_to_process:
+                courses = restored.get(level_key(item))
+                if courses is not None:
+                    work.level_discovered(level_key(item), len(courses))
+                    work.course_done(len(courses))
+            send_log_to_frontend(work.percent(), f"{total_levels - len(pending_levels)} seviye kontrol noktasından alındı; "
+                                                 f"kalan {len(pending_levels)} seviye kazınacak.")
+
+        # 3) Kursları topla: seviyeler birbirinden bağımsız, aynı girişin çerezlerini paylaşan
+        #    küçük bir oturum havuzuna dağıtılır
+        sessions = open_session_pool(scraper, username, password, min(config.LEVEL_WORKERS, max(1, len(pending_levels))))
+        extra_sessions = sessions[1:]
+        for s in sessions:
+            s.tracer = tracer
+        update_status(work.percent(), f'Toplam {len(pending_levels)} seviye için kurslar {len(sessions)} oturumla toplanacak...')
+
+        idle_sessions = queue.Queue()
+        for s in sessions:
+            idle_sessions.put(s)
+
+        def scrape_level(item):
+            lang, level_name, level_code = item['lang'], item['level_name'], item['level_code']
+            session = idle_sessions.get()
+            try:
+                # Seviye işçisi ayrı thread'de; span'i görev span'ine açıkça bağlanır
+                with tracer.span('level', parent=job_span, lang=lang, level=level_code):
+                    update_status(work.percent(), f"İşleniyor: {lang} - {level_name} ({level_code})", flush=False)
+                    courses_in_level = session.scrape_doyk_content(item['level_url']) or []
+            finally:
+                idle_sessions.put(session)
+
+            if courses_in_level:
+                # Boş sonuç kaydedilmez: tarayıcı hatası da boş dönebilir, devamda seviye yeniden denenir
+                checkpoint.save_level(level_key(item), courses_in_level)
             else:
-                all_scraped_courses[lang][level_code].extend(courses_in_level)
+                send_log_to_frontend(work.percent(), f"[WARN] Kurs bulunamadı: {lang} - {level_name} ({level_code})")
+            return courses_in_level
+
+        scraped = dict(zip(map(level_key, pending_levels), bounded_map(scrape_level, pending_levels, len(sessions))))
+
+        # Sonuçları seviye sırasıyla birleştir
+        all_scraped_courses = {}  # {lang: {level_code: [ {title, url, total_resources_from_js, counts}, ... ]}}
+        for item in levels_to_process:
+            courses_in_level = restored.get(level_key(item)) or scraped.get(level_key(item)) or []
+            all_scraped_courses.setdefault(item['lang'], {}).setdefault(item['level_code'], []).extend(courses_in_level)
+        scraped_languages = [lang for lang, levels in all_scraped_courses.items() if any(levels.values())]
+
+        # Taze anlık görüntüsü olan diller kazınmadı; kursları görüntüden eklenir
+        if merge_snapshots:
+            try:
+                merged, merged_at = compose_courses(merge_snapshots)
+                all_scraped_courses.update(merged)
+                send_log_to_frontend(80, f"{', '.join(merged)} anlık görüntüden alındı ({merged_at}).")
+            except SnapshotNotFound as e:
+                send_log_to_frontend(80, f"[WARN] Anlık görüntü okunamadı, bu diller rapora eklenmedi: {e}")
+
+        # Kurs önbelleği istatistikleri (sadece HTTP motoru önbellek kullanır)
+        for s in sessions:
+            stats = getattr(s, 'cache_stats', None) or {}
+            course_cache_stats['hits'] += stats.get('hits', 0)
+            course_cache_stats['misses'] += stats.get('misses', 0)
+        send_log_to_frontend(80, f"Kurs önbelleği: {course_cache_stats['hits']} isabet, {course_cache_stats['misses']} ıska")
+
+        # Aşama süreleri (ağ / kuyrukta bekleme / ayrıştırma); thread'lerin toplamıdır, duvar saati değil
+        stage_stats = StageStats()
+        for s in sessions:
+            if getattr(s, 'stage_stats', None):
+                stage_stats.merge(s.stage_stats)
 
         # 4) Gruplama (D/O/Y/K)
         update_status(82, 'Veriler işleniyor (D/O/Y/K gruplanıyor)...')
 
-        grouped_data_by_language = {}  # {lang: {level_code: {'D':int,'O':int,'Y':int,'K':int}}}
-        for lang, levels_dict in all_scraped_courses.items():
-            lang_block = {}
-            for level_code, courses_list in levels_dict.items():
-                doyk_counts = {'D': 0, 'O': 0, 'Y': 0, 'K': 0}
-                for c in (courses_list or []):
-                    title = c.get('title', '') or ''
-                    total = int(c.get('total_resources_from_js', 0) or 0)
-
-                    skill = detect_skill_from_title(title)
-                    if skill:
-                        # Aynı seviyede aynı beceriye birden fazla kurs varsa topluyoruz
-                        doyk_counts[skill] += total
-                    else:
-                        # Eşleşmeyen başlıkları UI'ya da gönder
-                        send_log_to_frontend(85, f"[WARN] Beceri eşleşmedi: {lang} {level_code} → '{title}' (total={total})")
-
-                lang_block[level_code] = doyk_counts
-
-            if lang_block:
-                grouped_data_by_language[lang] = lang_block
-
-        # 5) Sürücüyü kapat + Excel
+        def warn_unmatched(lang, level_code, title, total):
+            # Eşleşmeyen başlıkları UI'ya da gönder
+            send_log_to_frontend(85, f"[WARN] Beceri eşleşmedi: {lang} {level_code} → '{title}' (total={total})")
+
+        # {lang: {level_code: {'D':int,'O':int,'Y':int,'K':int}}}
+        with tracer.span('aggregate', parent=job_span):
+            grouped_data_by_language = aggregate_doyk(all_scraped_courses, stage_stats, warn_unmatched)
+
+        # 5) Sürücüleri kapat + Excel
+        for s in extra_sessions:
+            s.close_driver()
+        extra_sessions = []
         if scraper:
             scraper.close_driver()
             scraper = None
 
         update_status(92, 'Excel raporu oluşturuluyor...')
-        excel_file_path = create_excel_report(grouped_data_by_language, minimum_values, self.request.id)
-
+        with tracer.span('report', parent=job_span):
+            excel_file_path = create_excel_report(grouped_data_by_language, minimum_values, task_id,
+                                                  all_scraped_courses if include_course_details else None, stage_stats)
+        send_log_to_frontend(98, f"Aşama süreleri: {stage_stats.summary()}")
+
+        # Ham sonuç anlık görüntü olarak saklanır; eşik değişince rapor /render-report ile kazımasız üretilir
+        snapshot_id = None
+        try:
+            snapshot_id = save_snapshot(task_id, username, list(selected_languages) + list(merge_snapshots or {}),
+                                        all_scraped_courses, scraped_languages)
+        except OSError as e:
+            send_log_to_frontend(98, f"[WARN] Anlık görüntü kaydedilemedi: {e}")
+
+        # Kazınan dillerin sayıları DOYK geçmişine eklenir (anlık görüntüden alınanlar kendi işlerinde eklendi)
+        try:
+            HistoryStore().record(task_id, username, grouped_data_by_language, all_scraped_courses, scraped_languages)
+        except (OSError, sqlite3.Error) as e:
+            send_log_to_frontend(98, f"[WARN] DOYK geçmişine yazılamadı: {e}")
+
+        # Biçimlendirmeden bağımsız sonuç; aynı iş kısa süre içinde tekrar istenirse buradan üretilir
+        job_cache.save_result(fingerprint, password, {
+            'data': grouped_data_by_language,
+            'courses': all_scraped_courses,
+            'snapshot_id': snapshot_id,
+            'finished_at': datetime.datetime.now(ZoneInfo("Europe/Istanbul")).isoformat(),
+        })
+        checkpoint.clear()
+
+        job_span.end()
+        slowest_courses = tracer.slowest_courses()
+        for c in slowest_courses[:3]:
+            send_log_to_frontend(99, f"Yavaş kurs: {c['seconds'] + c['parse_seconds']:.2f}s "
+                                     f"({c['bytes'] // 1024} KB, {c['retries']} tekrar) → '{c['title']}'")
+
+        status = 'SUCCESS'
         update_status(100, 'Tamamlandı.')
+        reporter.finish('SUCCESS')
         return {
             'status': 'SUCCESS',
             'data': grouped_data_by_language,
-            'excel_filename': os.path.basename(excel_file_path)
+            'excel_filename': os.path.basename(excel_file_path),
+            'report_id': task_id,
+            'course_cache': course_cache_stats,
+            'stages': stage_stats.as_dict(),
+            'metrics': {'spans': tracer.summary(), 'slowest_courses': slowest_courses},
+            'snapshot_id': snapshot_id
         }
 
     except Exception as e:
         import traceback
         traceback.print_exc()
-        # Hata ayrıntısını UI'ya da gönder
-        self.update_state(state='FAILURE', meta={'progress': 0, 'log_message': f"Hata: {str(e)}"})
-        return {'status': 'FAILURE', 'log_message': str(e)}
+        if isinstance(e, retryable_errors()) and self.request.retries < self.max_retries:
+            # Geçici hata: görev aynı ID ile yeniden kuyruğa girer, iş kaydı (JobCache) korunur
+            retrying = True
+            status = 'RETRY'
+            send_log_to_frontend(reporter.progress, f"[WARN] Geçici hata: {e}. {checkpoint.count_levels()} seviye kaydedildi; "
+                                                    f"görev {config.JOB_RETRY_DELAY} sn sonra kaldığı yerden devam edecek.")
+            reporter.flush()
+            raise self.retry(exc=e, countdown=config.JOB_RETRY_DELAY)
+        # Bekleyen logları yaz, hata ayrıntısını UI'ya da gönder
+        reporter.finish('FAILURE', f"Hata: {str(e)}")
+        self.update_state(task_id=task_id, state='FAILURE', meta={'progress': 0, 'log_message': f"Hata: {str(e)}"})
+        # Kaydedilmiş seviye varsa kullanıcı /resume-scrape ile kaldığı yerden devam edebilir
+        return {'status': 'FAILURE', 'log_message': str(e), 'resumable': checkpoint.count_levels() > 0}
 
     finally:
+        if not retrying:
+            job_cache.release(fingerprint, task_id)
+        job_span.end()
+        MetricsStore().record_job(tracer, status, job_span.seconds, course_cache_stats)
+        for s in extra_sessions:
+            if s.driver:
+                s.close_driver()
         if scraper and scraper.driver:
             scraper.close_driver()
+        if not retrying:
+            # Tarayıcılar kapandı, yer boşaldı; sıradaki işler başlatılır
+            JobScheduler().release(task_id, job_span.seconds)
+            dispatch_jobs()
+
+
+@celery_app.task
+def dispatch_scheduled_jobs():
+    """Celery beat ile düzenli çalışır: kiralaması dolan (düşen worker'daki) işlerin yerine sıradakileri başlatır."""
+    dispatch_jobs()
+
+
+@celery_app.task
+def precompute_snapshots():
+    """
+    Celery beat ile yoğun olmayan saatte çalışır: servis hesabıyla (config.PRECOMPUTE_*) dilleri kazıyan
+    bir görev başlatır. Sonuç anlık görüntü olarak saklanır ve "son anlık görüntüyü kullan" isteklerinde
+    kazıma yapılmadan verilir. Aynı iş zaten çalışıyorsa yeni görev başlatılmaz.
+    """
+    if not config.PRECOMPUTE_USERNAME:
+        print("Önceden kazıma atlandı: PRECOMPUTE_USERNAME tanımlı değil.")
+        return None
+
+    username, password = config.PRECOMPUTE_USERNAME, config.PRECOMPUTE_PASSWORD
+    languages = config.PRECOMPUTE_LANGUAGES
+    fingerprint = job_fingerprint(username, languages)
+    task_id = str(uuid.uuid4())
+    if not JobCache().claim(fingerprint, password, task_id):
+        print("Önceden kazıma atlandı: aynı iş zaten çalışıyor.")
+        return None
+    # Link haritası yeniden çekilir (yeni seviyeler görünsün); Excel varsayılan eşiklerle, detaysız.
+    # Toplu iş olarak sıraya girer; gündüz kalırsa kullanıcıların tek dilli işlerinin önüne geçmez.
+    submit_job(task_id, username, (username, password, {}, languages, True, False))
+    print(f"Önceden kazıma başlatıldı: {task_id} (diller: {', '.join(languages) or 'tümü'})")
+    return task_id